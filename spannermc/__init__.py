@@ -1,3 +1,3 @@
-from . import asgi, cli, utils
+from . import asgi, utils
 
-__all__ = ["asgi", "cli", "utils"]
+__all__ = ["asgi", "utils"]
@@ -19,53 +19,85 @@ def create_app() -> Litestar:
         Litestar: configured database engine
     """
 
-    import uvloop
-    from litestar import Litestar
-    from litestar.contrib.repository.exceptions import RepositoryError
-    from litestar.di import Provide
-    from pydantic import SecretStr
+    from spannermc.lib import startup
+
+    with startup.phase("imports"):
+        import uvloop
+        from litestar import Litestar
+        from litestar.contrib.repository.exceptions import RepositoryError
+        from litestar.di import Provide
+        from pydantic import SecretStr
 
-    from spannermc import domain
-    from spannermc.domain.security import provide_user
-    from spannermc.lib import (
-        constants,
-        cors,
-        db,
-        dependencies,
-        exceptions,
-        log,
-        otel,
-        repository,
-        settings,
-    )
+        from spannermc import domain
+        from spannermc.domain.security import provide_user
+        from spannermc.lib import (
+            admission,
+            constants,
+            cors,
+            db,
+            deadline,
+            dependencies,
+            exceptions,
+            log,
+            loop_monitor,
+            otel,
+            profiler,
+            repository,
+            server_timing,
+            settings,
+            warmup,
+        )
 
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    with startup.phase("configuration"):
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
-    log.get_logger()
-    application_dependencies = {constants.USER_DEPENDENCY_KEY: Provide(provide_user, sync_to_thread=False)}
-    application_dependencies.update(dependencies.create_collection_dependencies())
+        log.get_logger()
+        application_dependencies = {constants.USER_DEPENDENCY_KEY: Provide(provide_user, sync_to_thread=False)}
+        application_dependencies.update(dependencies.create_collection_dependencies())
 
-    return Litestar(
-        cors_config=cors.config,
-        dependencies=application_dependencies,
-        exception_handlers={
-            exceptions.ApplicationError: exceptions.exception_to_http_response,  # type: ignore[dict-item]
-            RepositoryError: exceptions.exception_to_http_response,  # type: ignore[dict-item]
-        },
-        debug=settings.app.DEBUG,
-        before_send=[log.controller.BeforeSendHandler()],
-        middleware=[log.controller.middleware_factory, otel.config.middleware],
-        logging_config=log.config,
-        openapi_config=domain.openapi.config,
-        type_encoders={SecretStr: str, BaseModel: _base_model_encoder},
-        route_handlers=[*domain.routes],
-        plugins=[db.plugin],
-        on_startup=[lambda: log.configure(log.default_processors)],  # type: ignore[arg-type]
-        on_app_init=[domain.security.auth.on_app_init, repository.on_app_init],
-        signature_namespace={
-            **domain.signature_namespace,
-        },
-    )
+    with startup.phase("application"):
+        return Litestar(
+            cors_config=cors.config,
+            dependencies=application_dependencies,
+            exception_handlers={
+                exceptions.ApplicationError: exceptions.exception_to_http_response,  # type: ignore[dict-item]
+                RepositoryError: exceptions.exception_to_http_response,  # type: ignore[dict-item]
+            },
+            debug=settings.app.DEBUG,
+            before_send=[log.controller.BeforeSendHandler()],
+            middleware=[
+                db.tags.middleware_factory,
+                log.controller.middleware_factory,
+                db.budget.middleware_factory,
+                profiler.middleware_factory,
+                otel.config.middleware,
+            ],
+            logging_config=log.config,
+            openapi_config=domain.openapi.config,
+            type_encoders={SecretStr: str, BaseModel: _base_model_encoder},
+            route_handlers=[*domain.routes],
+            plugins=[db.get_plugin()],
+            on_startup=[
+                otel.on_startup,
+                loop_monitor.on_startup,
+                db.on_startup,
+                domain.kv.key_filter.on_startup,
+                warmup.on_startup,
+            ],
+            on_shutdown=[domain.kv.key_filter.on_shutdown, db.on_shutdown, loop_monitor.on_shutdown, otel.on_shutdown],
+            # each of the last three installs its middleware outside those before it, and all of them outside the
+            # authentication middleware: server_timing, then admission, then the deadline, then authentication
+            on_app_init=[
+                domain.security.auth.on_app_init,
+                repository.on_app_init,
+                deadline.on_app_init,
+                admission.on_app_init,
+                server_timing.on_app_init,
+            ],
+            signature_namespace={
+                **domain.signature_namespace,
+            },
+        )
 
 
 def _base_model_encoder(value: BaseModel) -> dict[str, Any]:
@@ -1,4 +1,7 @@
+import json
+import os
 import sys
+from pathlib import Path
 from typing import Any
 
 import click
@@ -6,10 +9,11 @@ from click import echo
 from pydantic import EmailStr
 from rich import get_console
 from rich.prompt import Confirm
+from rich.table import Table
 
 from spannermc.domain.accounts.dtos import UserCreate, UserUpdate
 from spannermc.domain.accounts.services import UserService
-from spannermc.lib import db, log
+from spannermc.lib import db, log, server, settings, startup
 
 __all__ = [
     "create_database",
@@ -17,8 +21,12 @@ __all__ = [
     "database_management_app",
     "promote_to_superuser",
     "purge_database",
+    "refresh_settings_snapshot",
     "reset_database",
+    "serve_application",
+    "settings_management_app",
     "show_database_revision",
+    "startup_profile",
     "upgrade_database",
     "user_management_app",
 ]
@@ -36,6 +44,12 @@ def database_management_app(_: dict[str, Any]) -> None:
     """Manage the configured database backend."""
 
 
+@click.group(name="settings", invoke_without_command=False, help="Manage the settings snapshot.")
+@click.pass_context
+def settings_management_app(_: dict[str, Any]) -> None:
+    """Manage the settings snapshot."""
+
+
 @click.group(name="users", invoke_without_command=False, help="Manage application users.")
 @click.pass_context
 def user_management_app(_: dict[str, Any]) -> None:
@@ -213,3 +227,65 @@ def purge_database(no_prompt: bool) -> None:
 def show_database_revision() -> None:
     """Show current database revision."""
     db.utils.show_database_revision()
+
+
+@settings_management_app.command(
+    name="snapshot",
+    help="Loads the settings from the environment and rewrites the snapshot workers start from.",
+)
+@click.option(
+    "--path",
+    help="Snapshot file. Defaults to the SETTINGS_SNAPSHOT environment variable.",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=lambda: os.environ.get(settings.SNAPSHOT_ENV),
+    required=True,
+)
+def refresh_settings_snapshot(path: Path) -> None:
+    """Regenerate the settings snapshot."""
+    settings.refresh_snapshot(path)
+    console.print(f"Settings snapshot written to {path}")
+
+
+@click.command(name="startup-profile", help="Profiles a cold start of the application in a fresh interpreter.")
+@click.option(
+    "--limit",
+    help="Number of slowest module imports to show.",
+    type=click.INT,
+    default=25,
+    show_default=True,
+)
+@click.option(
+    "--no-hooks",
+    help="Do not run the lifespan startup hooks, which connect to the database.",
+    is_flag=True,
+    default=False,
+)
+@click.option("--json", "as_json", help="Print the full profile as JSON.", is_flag=True, default=False)
+@click.option("--budget", help="Exit with status 1 if the cold start takes longer (seconds).", type=click.FLOAT)
+def startup_profile(limit: int, no_hooks: bool, as_json: bool, budget: float | None) -> None:
+    """Report import time per module, `create_app` phases, startup hooks and resident memory."""
+    profile = startup.profile(run_hooks=not no_hooks)
+    if as_json:
+        echo(json.dumps(profile.as_dict(), indent=2))
+    else:
+        imports = Table("module", "self (ms)", "cumulative (ms)", title=f"Slowest {limit} imports")
+        for item in profile.imports[:limit]:
+            imports.add_row(item.module, f"{item.self_time * 1000:.1f}", f"{item.cumulative_time * 1000:.1f}")
+        boot = Table("step", "time (ms)", title="Boot")
+        boot.add_row("import spannermc.asgi", f"{profile.import_time * 1000:.1f}")
+        for name, elapsed in profile.phases.items():
+            boot.add_row(f"create_app: {name}", f"{elapsed * 1000:.1f}")
+        for name, elapsed in profile.hooks.items():
+            boot.add_row(f"startup: {name}", f"{elapsed * 1000:.1f}")
+        boot.add_row("total", f"{profile.total * 1000:.1f}")
+        console.print(imports, boot)
+        console.print(f"Resident memory after boot: {profile.resident_memory / 2**20:.1f} MiB")
+    if budget is not None and profile.total > budget:
+        console.print(f"[red]Cold start took {profile.total:.2f}s, over the {budget:.2f}s budget")
+        sys.exit(1)
+
+
+@click.command(name="serve", help="Starts the pre-fork HTTP server configured by the SERVER_ settings.")
+def serve_application() -> None:
+    """Run the production HTTP server."""
+    sys.exit(server.serve())
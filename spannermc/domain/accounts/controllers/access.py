@@ -8,6 +8,7 @@ from litestar.contrib.jwt import OAuth2Login
 from litestar.di import Provide
 from litestar.enums import RequestEncodingType
 from litestar.params import Body
+from litestar.status_codes import HTTP_201_CREATED
 
 from spannermc.domain import security, urls
 from spannermc.domain.accounts.dependencies import provides_user_service
@@ -15,7 +16,7 @@ from spannermc.domain.accounts.dtos import AccountLogin, AccountLoginDTO, Accoun
 from spannermc.domain.accounts.guards import requires_active_user
 from spannermc.domain.accounts.models import User
 from spannermc.domain.accounts.services import UserService
-from spannermc.lib import log
+from spannermc.lib import constants, etag, log
 
 if TYPE_CHECKING:
     from litestar.dto import DTOData
@@ -41,6 +42,7 @@ class AccessController(Controller):
         cache=False,
         summary="Login",
         sync_to_thread=False,
+        opt={constants.ADMISSION_CLASS_OPT_KEY: "auth"},
         dto=AccountLoginDTO,
         return_dto=None,
     )
@@ -62,12 +64,17 @@ class AccessController(Controller):
         summary="Create User",
         description="Register a new account.",
         sync_to_thread=False,
+        opt={constants.ADMISSION_CLASS_OPT_KEY: "auth"},
         dto=AccountRegisterDTO,
     )
-    def signup(self, users_service: UserService, data: DTOData[AccountRegister]) -> User:
+    def signup(self, users_service: UserService, data: DTOData[AccountRegister]) -> Response[User]:
         """User Signup."""
         user = users_service.create(data.as_builtins())
-        return users_service.to_dto(user)
+        return Response(
+            content=users_service.to_dto(user),
+            status_code=HTTP_201_CREATED,
+            headers={"ETag": etag.compute_etag(user)},
+        )
 
     @get(
         operation_id="AccountProfile",
@@ -76,8 +83,9 @@ class AccessController(Controller):
         guards=[requires_active_user],
         summary="User Profile",
         description="User profile information.",
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
     )
-    def profile(self, current_user: User, users_service: UserService) -> User:
+    def profile(self, current_user: User, users_service: UserService) -> Response[User]:
         """User Profile."""
-        return users_service.to_dto(current_user)
+        return Response(content=users_service.to_dto(current_user), headers={"ETag": etag.compute_etag(current_user)})
@@ -3,16 +3,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Response, delete, get, patch, post
 from litestar.di import Provide
 from litestar.params import Dependency, Parameter
+from litestar.status_codes import HTTP_201_CREATED
 
 from spannermc.domain import urls
 from spannermc.domain.accounts.dependencies import provides_user_service
 from spannermc.domain.accounts.dtos import UserCreate, UserCreateDTO, UserDTO, UserUpdate, UserUpdateDTO
 from spannermc.domain.accounts.guards import requires_superuser
 from spannermc.domain.accounts.services import UserService
-from spannermc.lib import log
+from spannermc.lib import etag, log
 
 __all__ = ["AccountController"]
 
@@ -59,6 +60,7 @@ class AccountController(Controller):
         name="users:get",
         path=urls.ACCOUNT_DETAIL,
         summary="Retrieve the details of a user.",
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
     )
     def get_user(
@@ -68,10 +70,10 @@ class AccountController(Controller):
             title="User ID",
             description="The user to retrieve.",
         ),
-    ) -> User:
+    ) -> Response[User]:
         """Get a user."""
         db_obj = users_service.get(user_id)
-        return users_service.to_dto(db_obj)
+        return Response(content=users_service.to_dto(db_obj), headers={"ETag": etag.compute_etag(db_obj)})
 
     @post(
         operation_id="CreateUser",
@@ -87,15 +89,20 @@ class AccountController(Controller):
         self,
         users_service: UserService,
         data: DTOData[UserCreate],
-    ) -> User:
+    ) -> Response[User]:
         """Create a new user."""
         db_obj = users_service.create(data.as_builtins())
-        return users_service.to_dto(db_obj)
+        return Response(
+            content=users_service.to_dto(db_obj),
+            status_code=HTTP_201_CREATED,
+            headers={"ETag": etag.compute_etag(db_obj)},
+        )
 
     @patch(
         operation_id="UpdateUser",
         name="users:update",
         path=urls.ACCOUNT_UPDATE,
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
         dto=UserUpdateDTO,
     )
@@ -107,10 +114,10 @@ class AccountController(Controller):
             title="User ID",
             description="The user to update.",
         ),
-    ) -> User:
+    ) -> Response[User]:
         """Create a new user."""
         db_obj = users_service.update(user_id, data.as_builtins())
-        return users_service.to_dto(db_obj)
+        return Response(content=users_service.to_dto(db_obj), headers={"ETag": etag.compute_etag(db_obj)})
 
     @delete(
         operation_id="DeleteUser",
@@ -118,6 +125,7 @@ class AccountController(Controller):
         path=urls.ACCOUNT_DELETE,
         summary="Remove User",
         description="Removes a user and all associated data from the system.",
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
         return_dto=None,
     )
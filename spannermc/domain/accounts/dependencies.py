@@ -18,11 +18,10 @@ __all__ = ["provides_user_service"]
 
 logger = log.get_logger()
 
+_statement = select(User).order_by(User.email).options(noload("*"))
+
 
 def provides_user_service(db_session: Session) -> Generator[UserService, None, None]:
     """Construct repository and service objects for the request."""
-    with UserService.new(
-        session=db_session,
-        statement=select(User).order_by(User.email).options(noload("*")),
-    ) as service:
+    with UserService.new(session=db_session, statement=_statement) as service:
         yield service
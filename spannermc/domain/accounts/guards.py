@@ -4,6 +4,8 @@ from typing import TYPE_CHECKING
 
 from litestar.exceptions import PermissionDeniedException
 
+from spannermc.lib import server_timing
+
 if TYPE_CHECKING:
     from litestar.connection import ASGIConnection
     from litestar.handlers.base import BaseRouteHandler
@@ -12,6 +14,7 @@ if TYPE_CHECKING:
 __all__ = ["requires_superuser", "requires_active_user", "requires_verified_user"]
 
 
+@server_timing.timed("guards")
 def requires_active_user(connection: ASGIConnection, _: BaseRouteHandler) -> None:
     """Request requires active user.
 
@@ -29,6 +32,7 @@ def requires_active_user(connection: ASGIConnection, _: BaseRouteHandler) -> Non
     raise PermissionDeniedException("Inactive account")
 
 
+@server_timing.timed("guards")
 def requires_superuser(connection: ASGIConnection, _: BaseRouteHandler) -> None:
     """Request requires active superuser.
 
@@ -47,6 +51,7 @@ def requires_superuser(connection: ASGIConnection, _: BaseRouteHandler) -> None:
     raise PermissionDeniedException(detail="Insufficient privileges")
 
 
+@server_timing.timed("guards")
 def requires_verified_user(connection: ASGIConnection, _: BaseRouteHandler) -> None:
     """Verify the connection user is a superuser.
 
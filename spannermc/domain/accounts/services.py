@@ -2,11 +2,11 @@ from __future__ import annotations
 
 from typing import Any
 
-from litestar.contrib.sqlalchemy.repository import SQLAlchemySyncRepository
 from litestar.exceptions import PermissionDeniedException
 from pydantic import SecretStr
 
 from spannermc.lib import crypt
+from spannermc.lib.repository import SQLAlchemySyncRepository
 from spannermc.lib.service.sqlalchemy import SQLAlchemySyncRepositoryService
 
 from .models import User
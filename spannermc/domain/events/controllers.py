@@ -3,9 +3,10 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Response, delete, get, patch, post
 from litestar.di import Provide
 from litestar.params import Dependency, Parameter
+from litestar.status_codes import HTTP_201_CREATED
 
 from spannermc.domain import urls
 from spannermc.domain.accounts.models import User
@@ -14,7 +15,7 @@ from spannermc.domain.events.dtos import EventDTO, EventModifyDTO
 from spannermc.domain.events.guards import requires_event_ownership
 from spannermc.domain.events.models import Event
 from spannermc.domain.events.services import EventService
-from spannermc.lib import log
+from spannermc.lib import etag, log
 
 __all__ = ["EventController"]
 
@@ -58,6 +59,7 @@ class EventController(Controller):
         name="events:get",
         path=urls.EVENT_DETAIL,
         summary="Retrieve the details of a event.",
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
     )
     def get_event(
@@ -67,10 +69,10 @@ class EventController(Controller):
             title="Event ID",
             description="The event to retrieve.",
         ),
-    ) -> Event:
+    ) -> Response[Event]:
         """Get a event."""
         db_obj = events_service.get(event_id)
-        return events_service.to_dto(db_obj)
+        return Response(content=events_service.to_dto(db_obj), headers={"ETag": etag.compute_etag(db_obj)})
 
     @post(
         operation_id="CreateEvent",
@@ -87,18 +89,23 @@ class EventController(Controller):
         events_service: EventService,
         current_user: User,
         data: DTOData[Event],
-    ) -> Event:
+    ) -> Response[Event]:
         """Create a new event."""
         obj = data.as_builtins()
         obj.update({"user_id": current_user.id})
         db_obj = events_service.create(obj)
-        return events_service.to_dto(db_obj)
+        return Response(
+            content=events_service.to_dto(db_obj),
+            status_code=HTTP_201_CREATED,
+            headers={"ETag": etag.compute_etag(db_obj)},
+        )
 
     @patch(
         operation_id="UpdateEvent",
         name="events:update",
         path=urls.EVENT_UPDATE,
         guards=[requires_event_ownership],
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
         dto=EventModifyDTO,
     )
@@ -110,10 +117,11 @@ class EventController(Controller):
             title="Event ID",
             description="The event to update.",
         ),
-    ) -> Event:
+        if_match: str | None = Parameter(header="If-Match", required=False),
+    ) -> Response[Event]:
         """Create a new event."""
-        db_obj = events_service.update(event_id, data.as_builtins())
-        return events_service.to_dto(db_obj)
+        db_obj = events_service.update(event_id, data.as_builtins(), if_match=if_match)
+        return Response(content=events_service.to_dto(db_obj), headers={"ETag": etag.compute_etag(db_obj)})
 
     @delete(
         operation_id="DeleteEvent",
@@ -122,6 +130,7 @@ class EventController(Controller):
         summary="Remove Event",
         description="Removes a event and all associated data from the system.",
         guards=[requires_event_ownership],
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
         return_dto=None,
     )
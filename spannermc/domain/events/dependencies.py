@@ -19,11 +19,10 @@ __all__ = ["provides_event_service"]
 
 logger = log.get_logger()
 
+_statement = select(Event).order_by(Event.created_at)
+
 
 def provides_event_service(db_session: Session) -> Generator[EventService, None, None]:
     """Construct repository and service objects for the request."""
-    with EventService.new(
-        session=db_session,
-        statement=select(Event).order_by(Event.created_at),
-    ) as service:
+    with EventService.new(session=db_session, statement=_statement) as service:
         yield service
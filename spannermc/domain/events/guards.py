@@ -4,9 +4,12 @@ from litestar.connection import ASGIConnection
 from litestar.exceptions import PermissionDeniedException
 from litestar.handlers.base import BaseRouteHandler
 
+from spannermc.lib import server_timing
+
 __all__ = ["requires_event_ownership"]
 
 
+@server_timing.timed("guards")
 def requires_event_ownership(connection: ASGIConnection, _: BaseRouteHandler) -> None:
     """Verify that the connection user is the event owner.
 
@@ -2,8 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from litestar.contrib.sqlalchemy.repository import SQLAlchemySyncRepository
-
+from spannermc.lib.repository import SQLAlchemySyncRepository
 from spannermc.lib.service.sqlalchemy import SQLAlchemySyncRepositoryService
 
 from .models import Event
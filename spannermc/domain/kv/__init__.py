@@ -1,4 +1,4 @@
 """KV domain logic."""
-from . import controllers, dependencies, dtos, models, services
+from . import controllers, dependencies, dtos, key_filter, models, services
 
-__all__ = ["models", "services", "controllers", "dependencies", "dtos"]
+__all__ = ["models", "services", "controllers", "dependencies", "dtos", "key_filter"]
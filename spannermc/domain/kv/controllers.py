@@ -3,16 +3,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from litestar import Controller, delete, get, patch, post
+from litestar import Controller, Response, delete, get, patch, post
 from litestar.di import Provide
 from litestar.params import Dependency, Parameter
+from litestar.status_codes import HTTP_201_CREATED
 
 from spannermc.domain import urls
 from spannermc.domain.kv.dependencies import provides_kv_service
 from spannermc.domain.kv.dtos import KeyValueStoreDTO, KVStoreCreateDTO, KVStoreUpdateDTO
 from spannermc.domain.kv.models import KVStore
 from spannermc.domain.kv.services import KVStoreService
-from spannermc.lib import log
+from spannermc.lib import etag, log
 
 __all__ = ["KVStoreController"]
 
@@ -58,6 +59,7 @@ class KVStoreController(Controller):
         name="kv:get",
         path=urls.KV_DETAIL,
         summary="Retrieve the details of a kv.",
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
     )
     def get_kv(
@@ -67,10 +69,10 @@ class KVStoreController(Controller):
             title="Key",
             description="The key to retrieve.",
         ),
-    ) -> KVStore:
+    ) -> Response[KVStore]:
         """Get a kv."""
         db_obj = kv_service.get(kv_key, id_attribute="key")
-        return kv_service.to_dto(db_obj)
+        return Response(content=kv_service.to_dto(db_obj), headers={"ETag": etag.compute_etag(db_obj)})
 
     @post(
         operation_id="CreateKeyValueStore",
@@ -87,17 +89,22 @@ class KVStoreController(Controller):
         self,
         kv_service: KVStoreService,
         data: DTOData[KVStore],
-    ) -> KVStore:
+    ) -> Response[KVStore]:
         """Create a new kv."""
         obj = data.create_instance()
         db_obj = kv_service.create(obj)
-        return kv_service.to_dto(db_obj)
+        return Response(
+            content=kv_service.to_dto(db_obj),
+            status_code=HTTP_201_CREATED,
+            headers={"ETag": etag.compute_etag(db_obj)},
+        )
 
     @patch(
         operation_id="UpdateKeyValueStore",
         title="Update Key",
         name="kv:update",
         path=urls.KV_UPDATE,
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
         dto=KVStoreUpdateDTO,
     )
@@ -109,10 +116,11 @@ class KVStoreController(Controller):
             title="Key value",
             description="The kv key to update.",
         ),
-    ) -> KVStore:
+        if_match: str | None = Parameter(header="If-Match", required=False),
+    ) -> Response[KVStore]:
         """Create a new kv."""
-        db_obj = kv_service.update(kv_key, data.create_instance(), id_attribute="key")
-        return kv_service.to_dto(db_obj)
+        db_obj = kv_service.update(kv_key, data.create_instance(), id_attribute="key", if_match=if_match)
+        return Response(content=kv_service.to_dto(db_obj), headers={"ETag": etag.compute_etag(db_obj)})
 
     @delete(
         operation_id="DeleteKeyValueStore",
@@ -121,6 +129,7 @@ class KVStoreController(Controller):
         path=urls.KV_DELETE,
         summary="Remove KeyValueStore",
         description="Removes a kv and all associated data from the system.",
+        middleware=[etag.middleware_factory],
         sync_to_thread=False,
         return_dto=None,
     )
@@ -19,11 +19,10 @@ __all__ = ["provides_kv_service"]
 
 logger = log.get_logger()
 
+_statement = select(KVStore).with_hint(KVStore.__table__, text="@{FORCE_INDEX=uk_kv_key}")
+
 
 def provides_kv_service(db_session: Session) -> Generator[KVStoreService, None, None]:
     """Construct repository and service objects for the request."""
-    with KVStoreService.new(
-        session=db_session,
-        statement=select(KVStore).with_hint(KVStore.__table__, text="@{FORCE_INDEX=uk_kv_key}"),
-    ) as service:
+    with KVStoreService.new(session=db_session, statement=_statement) as service:
         yield service
@@ -0,0 +1,187 @@
+"""Negative lookup cache for KeyValueStore keys.
+
+An in-memory Bloom filter over every stored key lets `GET /api/kv/{key}`
+answer a definite miss with a `404` without querying Spanner.
+
+The filter is built from a key-only scan of `uk_kv_key` at startup, keys
+created by this process are added as they are written, and the whole filter
+is rebuilt periodically to drop deleted keys.  Keys created by *other*
+processes only become visible after the next rebuild, so keep
+`KV_BLOOM_FILTER_REBUILD_INTERVAL` short when several instances write.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+from sqlalchemy import select
+
+from spannermc.domain.kv.models import KVStore
+from spannermc.lib import db, log, settings
+from spannermc.lib.bloom import BloomFilter
+
+__all__ = ["KeyFilter", "key_filter", "on_shutdown", "on_startup"]
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from opentelemetry.metrics import CallbackOptions
+
+
+logger = log.get_logger()
+meter = metrics.get_meter(__name__)
+
+
+class KeyFilter:
+    """Thread safe holder for the current key Bloom filter and its statistics."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """Configure the key filter.
+
+        Args:
+            capacity: Expected number of keys.
+            error_rate: Target false positive probability.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom: BloomFilter | None = None
+        self.negatives = 0
+        self.false_positives = 0
+        self._lock = threading.Lock()
+        self._pending: list[str] | None = None
+
+    @property
+    def ready(self) -> bool:
+        """`True` once a filter has been built."""
+        return self.bloom is not None
+
+    def might_contain(self, key: str) -> bool:
+        """Return `False` only if `key` is definitely not stored.
+
+        Before the first build every key is reported as possibly present.
+        """
+        bloom = self.bloom
+        if bloom is None or key in bloom:
+            return True
+        self.negatives += 1
+        return False
+
+    def add(self, key: str) -> None:
+        """Record a newly created key."""
+        with self._lock:
+            if self.bloom is not None:
+                self.bloom.add(key)
+            if self._pending is not None:
+                self._pending.append(key)
+
+    def record_false_positive(self) -> None:
+        """Record a lookup the filter let through that did not exist."""
+        if self.bloom is not None:
+            self.false_positives += 1
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Observed share of absent keys the filter failed to reject."""
+        absent = self.false_positives + self.negatives
+        return self.false_positives / absent if absent else 0.0
+
+    def rebuild(self) -> int:
+        """Replace the filter with one built from a key-only index scan.
+
+        Returns:
+            The number of keys loaded.
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            statement = (
+                select(KVStore.key)
+                .with_hint(KVStore.__table__, text="@{FORCE_INDEX=uk_kv_key}")
+                .execution_options(yield_per=10_000)
+            )
+            with db.session() as session:
+                bloom = BloomFilter.from_iterable(
+                    session.execute(statement).scalars(),
+                    capacity=self.capacity,
+                    error_rate=self.error_rate,
+                )
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for key in self._pending:
+                bloom.add(key)
+            self._pending = None
+            self.bloom = bloom
+            self.negatives = 0
+            self.false_positives = 0
+        return len(bloom)
+
+    async def run_periodic_rebuild(self, interval: float) -> None:
+        """Rebuild the filter every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                count = await asyncio.to_thread(self.rebuild)
+            except Exception as exc:  # noqa: BLE001
+                await logger.awarning("KV key filter rebuild failed", exc_info=exc)
+            else:
+                await logger.adebug("KV key filter rebuilt", keys=count)
+
+    def observe(self, _: CallbackOptions) -> Iterable[Observation]:
+        """OpenTelemetry callback reporting the false positive rates."""
+        if self.bloom is None:
+            return []
+        return [
+            Observation(self.false_positive_rate, {"kind": "observed"}),
+            Observation(self.bloom.estimated_false_positive_rate, {"kind": "estimated"}),
+        ]
+
+
+key_filter = KeyFilter(
+    capacity=settings.app.KV_BLOOM_FILTER_CAPACITY,
+    error_rate=settings.app.KV_BLOOM_FILTER_ERROR_RATE,
+)
+"""Process wide key filter.  Only consulted when `KV_BLOOM_FILTER_ENABLED` is set."""
+
+meter.create_observable_gauge(
+    "kv.key_filter.false_positive_rate",
+    callbacks=[key_filter.observe],
+    unit="1",
+    description="Share of absent KV keys not rejected by the Bloom filter.",
+)
+
+_rebuild_task: asyncio.Task[None] | None = None
+
+
+async def on_startup() -> None:
+    """Build the key filter and schedule periodic rebuilds."""
+    global _rebuild_task  # noqa: PLW0603
+    if not settings.app.KV_BLOOM_FILTER_ENABLED:
+        return
+    try:
+        count = await asyncio.to_thread(key_filter.rebuild)
+    except Exception as exc:  # noqa: BLE001
+        await logger.awarning("KV key filter could not be built, lookups fall through", exc_info=exc)
+    else:
+        await logger.ainfo("KV key filter built", keys=count)
+    _rebuild_task = asyncio.create_task(
+        key_filter.run_periodic_rebuild(settings.app.KV_BLOOM_FILTER_REBUILD_INTERVAL),
+    )
+
+
+async def on_shutdown() -> None:
+    """Stop the periodic rebuild."""
+    global _rebuild_task  # noqa: PLW0603
+    if _rebuild_task is None:
+        return
+    _rebuild_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _rebuild_task
+    _rebuild_task = None
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from typing import Any
 
-from litestar.contrib.sqlalchemy.repository import SQLAlchemySyncRepository
+from litestar.contrib.repository.exceptions import NotFoundError
 
+from spannermc.lib import settings
+from spannermc.lib.repository import SQLAlchemySyncRepository
 from spannermc.lib.service.sqlalchemy import SQLAlchemySyncRepositoryService
 
+from .key_filter import key_filter
 from .models import KVStore
 
 __all__ = ["KVStoreService", "KeyValueStoreRepository"]
@@ -25,3 +28,39 @@ class KVStoreService(SQLAlchemySyncRepositoryService[KVStore]):
     def __init__(self, **repo_kwargs: Any) -> None:
         self.repository: KeyValueStoreRepository = self.repository_type(**repo_kwargs)
         self.model_type = self.repository.model_type
+
+    def get(self, item_id: Any, **kwargs: Any) -> KVStore:
+        """Get a key value, rejecting definite misses from the key filter.
+
+        Args:
+            item_id: Identifier of instance to be retrieved.
+            **kwargs: Keyword arguments for attribute based filtering.
+
+        Raises:
+            NotFoundError: The key does not exist.
+
+        Returns:
+            The matching instance.
+        """
+        if not settings.app.KV_BLOOM_FILTER_ENABLED or kwargs.get("id_attribute") != "key":
+            return super().get(item_id, **kwargs)
+        if not key_filter.might_contain(item_id):
+            raise NotFoundError(f"No item found when filtering by key={item_id}")
+        try:
+            return super().get(item_id, **kwargs)
+        except NotFoundError:
+            key_filter.record_false_positive()
+            raise
+
+    def create(self, data: KVStore | dict[str, Any]) -> KVStore:
+        """Create a key value and register its key with the key filter.
+
+        Args:
+            data: Representation to be created.
+
+        Returns:
+            Representation of created instance.
+        """
+        db_obj = super().create(data)
+        key_filter.add(db_obj.key)
+        return db_obj
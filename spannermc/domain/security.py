@@ -9,13 +9,15 @@ from sqlalchemy.orm import noload
 from spannermc.domain import urls
 from spannermc.domain.accounts.models import User
 from spannermc.domain.accounts.services import UserService
-from spannermc.lib import constants, db, settings
+from spannermc.lib import constants, db, server_timing, settings
 
 if TYPE_CHECKING:
     from litestar.connection import ASGIConnection, Request
 
 __all__ = ["current_user_from_token", "auth"]
 
+_user_statement = select(User).options(noload("*"))
+
 
 def provide_user(request: Request[User, Token, Any]) -> User:
     """Get the user from the connection.
@@ -29,6 +31,7 @@ def provide_user(request: Request[User, Token, Any]) -> User:
     return request.user
 
 
+@server_timing.timed("auth")
 def current_user_from_token(token: Token, connection: ASGIConnection[Any, Any, Any, Any]) -> User | None:
     """Lookup current user from local JWT token.
 
@@ -43,9 +46,9 @@ def current_user_from_token(token: Token, connection: ASGIConnection[Any, Any, A
     Returns:
         User: User record mapped to the JWT identifier
     """
-    with UserService.new(
-        session=db.config.provide_session(connection.app.state, connection.scope),
-        statement=select(User).options(noload("*")),
+    with db.tags.route(connection.scope), UserService.new(
+        session=db.get_config().provide_session(connection.app.state, connection.scope),
+        statement=_user_statement,
     ) as service:
         user = service.get_one_or_none(email=token.sub)
         if user and user.is_active:
@@ -59,6 +62,7 @@ auth = OAuth2PasswordBearerAuth[User](
     token_url=urls.ACCOUNT_LOGIN,
     exclude=[
         urls.OPENAPI_SCHEMA,
+        urls.METRICS,
         constants.SYSTEM_HEALTH_URL,
         urls.ACCOUNT_LOGIN,
         urls.ACCOUNT_REGISTER,
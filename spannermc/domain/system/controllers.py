@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Literal, TypeVar
 
-from litestar import Controller, MediaType, get
+from litestar import Controller, MediaType, delete, get
+from litestar.exceptions import NotFoundException, ServiceUnavailableException
+from litestar.params import Parameter
 from litestar.response import Response
 from sqlalchemy import text
 
-from spannermc.domain.system.dtos import SystemHealth
-from spannermc.lib import constants, log
+from spannermc.domain import urls
+from spannermc.domain.accounts.guards import requires_superuser
+from spannermc.domain.system.dtos import (
+    ProfiledFunction,
+    ProfileReport,
+    ProfileSummary,
+    StatementReport,
+    StatementStatistic,
+    SystemHealth,
+)
+from spannermc.lib import constants, db, log, otel, profiler, prometheus
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
@@ -22,7 +34,12 @@ OnlineOffline = TypeVar("OnlineOffline", bound=Literal["online", "offline"])
 
 class SystemController(Controller):
     tags = ["System"]
-    signature_namespace = {"SystemHealth": SystemHealth}
+    signature_namespace = {
+        "ProfileReport": ProfileReport,
+        "ProfileSummary": ProfileSummary,
+        "StatementReport": StatementReport,
+        "SystemHealth": SystemHealth,
+    }
 
     @get(
         operation_id="SystemHealth",
@@ -34,6 +51,7 @@ class SystemController(Controller):
         summary="Health Check",
         description="Execute a health check against backend components.  Returns system information including database status.",
         sync_to_thread=False,
+        opt={constants.ADMISSION_CLASS_OPT_KEY: "health"},
     )
     def check_system_health(self, db_session: Session) -> Response[SystemHealth]:
         """Check database available and returns app config info."""
@@ -55,3 +73,134 @@ class SystemController(Controller):
             status_code=200 if db_ping else 500,
             media_type=MediaType.JSON,
         )
+
+    @get(
+        operation_id="Metrics",
+        name="system:metrics",
+        path=urls.METRICS,
+        media_type=prometheus.CONTENT_TYPE,
+        cache=False,
+        include_in_schema=False,
+        sync_to_thread=False,
+        opt={constants.ADMISSION_CLASS_OPT_KEY: "health"},
+    )
+    def get_metrics(self) -> Response[str]:
+        """Serve the worker's metrics in the Prometheus text format."""
+        telemetry = otel.telemetry
+        if telemetry is None or telemetry.prometheus_reader is None:
+            raise ServiceUnavailableException(detail="Prometheus metrics are not configured")
+        return Response(content=telemetry.prometheus_reader.render(), media_type=prometheus.CONTENT_TYPE)
+
+    @get(
+        operation_id="StatementStatistics",
+        name="system:statements",
+        path=urls.SYSTEM_STATEMENTS,
+        guards=[requires_superuser],
+        cache=False,
+        summary="Statement Statistics",
+        description="Latency and row statistics of the statements run by the worker serving the request, "
+        "by normalized SQL, most total time first.",
+        sync_to_thread=False,
+    )
+    def list_statement_statistics(
+        self, limit: int = Parameter(query="limit", default=50, ge=1, le=500)
+    ) -> StatementReport:
+        """Report the statements with the most total time."""
+        statistics = db.statistics.statistics
+        return StatementReport(
+            since=datetime.fromtimestamp(statistics.since, tz=UTC),
+            dropped=statistics.dropped,
+            statements=[StatementStatistic(**stats) for stats in statistics.snapshot(limit)],
+        )
+
+    @delete(
+        operation_id="ResetStatementStatistics",
+        name="system:statements-reset",
+        path=urls.SYSTEM_STATEMENTS,
+        guards=[requires_superuser],
+        summary="Reset Statement Statistics",
+        description="Forget the statement statistics of the worker serving the request.",
+        sync_to_thread=False,
+    )
+    def reset_statement_statistics(self) -> None:
+        """Reset the statement statistics."""
+        db.statistics.statistics.reset()
+
+    @get(
+        operation_id="ListProfiles",
+        name="system:profiles",
+        path=urls.SYSTEM_PROFILES,
+        guards=[requires_superuser],
+        cache=False,
+        summary="List Request Profiles",
+        description="Requests profiled by the worker serving the request, newest first.",
+        sync_to_thread=False,
+    )
+    def list_profiles(self) -> list[ProfileSummary]:
+        """List the stored profiles."""
+        return [
+            ProfileSummary(
+                id=profile.id,
+                route=profile.route,
+                method=profile.method,
+                path=profile.path,
+                duration=profile.duration,
+                created=profile.created,
+            )
+            for profile in reversed(profiler.profiles.values())
+        ]
+
+    @get(
+        operation_id="GetProfile",
+        name="system:profile",
+        path=urls.SYSTEM_PROFILE_DETAIL,
+        guards=[requires_superuser],
+        cache=False,
+        summary="Request Profile",
+        description="Functions called by a profiled request, most cumulative time first.",
+        sync_to_thread=False,
+    )
+    def get_profile(
+        self,
+        profile_id: str = Parameter(title="Profile ID", description="The profile to retrieve."),
+        limit: int = Parameter(query="limit", default=100, ge=1),
+    ) -> ProfileReport:
+        """Report a profile."""
+        profile = _get_profile(profile_id)
+        return ProfileReport(
+            id=profile.id,
+            route=profile.route,
+            method=profile.method,
+            path=profile.path,
+            duration=profile.duration,
+            created=profile.created,
+            functions=[ProfiledFunction(**function) for function in profile.functions(limit)],
+        )
+
+    @get(
+        operation_id="DownloadProfile",
+        name="system:profile-download",
+        path=urls.SYSTEM_PROFILE_DOWNLOAD,
+        guards=[requires_superuser],
+        cache=False,
+        summary="Download Request Profile",
+        description="A profile in `pstats` format, for `pstats`, snakeviz and similar tools.",
+        sync_to_thread=False,
+    )
+    def download_profile(
+        self, profile_id: str = Parameter(title="Profile ID", description="The profile to download.")
+    ) -> Response[bytes]:
+        """Download a profile."""
+        profile = _get_profile(profile_id)
+        return Response(
+            content=profile.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile.id}.pstats"'},
+        )
+
+
+def _get_profile(profile_id: str) -> profiler.RequestProfile:
+    profile = profiler.profiles.get(profile_id)
+    if profile is None:
+        raise NotFoundException(detail="Profile not found, or profiled by another worker")
+    return profile
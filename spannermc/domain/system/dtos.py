@@ -1,11 +1,20 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Literal
 
 from litestar.dto import DataclassDTO
 
 from spannermc.lib import dto, settings
 
-__all__ = ["SystemHealth", "SystemHealthDTO"]
+__all__ = [
+    "ProfileReport",
+    "ProfileSummary",
+    "ProfiledFunction",
+    "StatementReport",
+    "StatementStatistic",
+    "SystemHealth",
+    "SystemHealthDTO",
+]
 
 
 @dataclass
@@ -19,3 +28,59 @@ class SystemHealthDTO(DataclassDTO[SystemHealth]):
     """Team Create."""
 
     config = dto.config()
+
+
+@dataclass
+class StatementStatistic:
+    """Aggregated runs of one normalized statement. Times are in seconds."""
+
+    fingerprint: str
+    sql: str
+    calls: int
+    rows: int
+    total_time: float
+    mean_time: float
+    max_time: float
+    p50_time: float
+    p95_time: float
+    p99_time: float
+    histogram: dict[str, int]
+
+
+@dataclass
+class StatementReport:
+    """Statement statistics of the worker that served the request."""
+
+    since: datetime
+    dropped: int
+    statements: list[StatementStatistic]
+
+
+@dataclass
+class ProfileSummary:
+    """A profiled request. `duration` is in seconds."""
+
+    id: str
+    route: str
+    method: str
+    path: str
+    duration: float
+    created: datetime
+
+
+@dataclass
+class ProfiledFunction:
+    """Calls of one function during a profiled request. Times are in seconds."""
+
+    function: str
+    calls: int
+    primitive_calls: int
+    total_time: float
+    cumulative_time: float
+
+
+@dataclass
+class ProfileReport(ProfileSummary):
+    """A profiled request and its functions, most cumulative time first."""
+
+    functions: list[ProfiledFunction]
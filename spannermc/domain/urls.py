@@ -1,6 +1,7 @@
 INDEX = "/"
 SITE_ROOT = "/{path:str}"
 OPENAPI_SCHEMA = "/schema"
+METRICS = "/metrics"
 
 
 ACCOUNT_LOGIN = "/api/access/login"
@@ -25,3 +26,9 @@ KV_DELETE = "/api/kv/{kv_key:str}"
 KV_DETAIL = "/api/kv/{kv_key:str}"
 KV_UPDATE = "/api/kv/{kv_key:str}"
 KV_CREATE = "/api/kv"
+
+
+SYSTEM_STATEMENTS = "/api/system/statements"
+SYSTEM_PROFILES = "/api/system/profiles"
+SYSTEM_PROFILE_DETAIL = "/api/system/profiles/{profile_id:str}"
+SYSTEM_PROFILE_DOWNLOAD = "/api/system/profiles/{profile_id:str}/pstats"
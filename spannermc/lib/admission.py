@@ -0,0 +1,180 @@
+"""Admission control.
+
+Each route belongs to an admission class, named by the `admission_class`
+key of its handler's `opt` and `default` otherwise.  A class admits at most
+`ADMISSION_LIMITS[class]` requests at once.  Further requests wait in a
+queue of at most `ADMISSION_QUEUE_SIZE`, for at most
+`ADMISSION_QUEUE_TIMEOUT` seconds.  A request that finds the queue full, or
+is still queued at the deadline, is shed with `503 Service Unavailable` and
+a `Retry-After` header.
+
+Health checks and authentication have their own classes, so a backlog of
+ordinary requests cannot starve them.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING
+
+from litestar.enums import ScopeType
+from litestar.exceptions import ServiceUnavailableException
+from opentelemetry import metrics
+from opentelemetry.metrics import Observation
+
+from spannermc.lib import constants, settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from litestar.config.app import AppConfig
+    from litestar.types import ASGIApp, Receive, Scope, Send
+    from opentelemetry.metrics import CallbackOptions
+
+__all__ = ["AdmissionClass", "admission_classes", "middleware_factory", "on_app_init"]
+
+
+meter = metrics.get_meter(__name__)
+shed_counter = meter.create_counter(
+    "http.server.admission.shed",
+    unit="{request}",
+    description="Requests rejected with 503 because their admission class was over capacity.",
+)
+
+
+class AdmissionClass:
+    """In-flight limit and bounded wait queue for one class of routes."""
+
+    __slots__ = ("name", "limit", "queue_size", "timeout", "in_flight", "_waiters")
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Wait for a slot.
+
+        Raises:
+            ServiceUnavailableException: The queue is full, or no slot became free before the deadline.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._shed("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # the slot was handed over as the deadline passed
+                return
+            self._waiters.remove(waiter)
+            waiter.cancel()
+            raise self._shed("queue_timeout") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                waiter.cancel()
+            raise
+
+    def release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _shed(self, reason: str) -> ServiceUnavailableException:
+        shed_counter.add(1, {"admission_class": self.name, "reason": reason})
+        return ServiceUnavailableException(
+            detail="Server is over capacity",
+            headers={"Retry-After": str(settings.app.ADMISSION_RETRY_AFTER)},
+        )
+
+
+admission_classes: dict[str, AdmissionClass] = {}
+"""Admission classes of this process, by name, created on first use."""
+
+
+def _admission_class(name: str) -> AdmissionClass:
+    admission_class = admission_classes.get(name)
+    if admission_class is None:
+        limits = settings.app.ADMISSION_LIMITS
+        admission_class = admission_classes[name] = AdmissionClass(
+            name,
+            limit=limits.get(name, limits["default"]),
+            queue_size=settings.app.ADMISSION_QUEUE_SIZE,
+            timeout=settings.app.ADMISSION_QUEUE_TIMEOUT,
+        )
+    return admission_class
+
+
+def _observe(_: CallbackOptions) -> Iterable[Observation]:
+    for admission_class in admission_classes.values():
+        yield Observation(admission_class.queued, {"admission_class": admission_class.name, "state": "queued"})
+        yield Observation(admission_class.in_flight, {"admission_class": admission_class.name, "state": "in_flight"})
+
+
+meter.create_observable_gauge(
+    "http.server.admission.requests",
+    callbacks=[_observe],
+    unit="{request}",
+    description="Requests admitted and waiting for admission, by admission class.",
+)
+
+
+def middleware_factory(app: ASGIApp) -> ASGIApp:
+    """Middleware that admits HTTP requests according to their route's admission class.
+
+    Args:
+        app: The previous ASGI app in the call chain.
+
+    Returns:
+        A new ASGI app that waits for, or sheds, each request before calling `app`.
+    """
+    if not settings.app.ADMISSION_ENABLED:
+        return app
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        """Admit the request, or raise `ServiceUnavailableException`.
+
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive handler.
+            send: ASGI send handler.
+        """
+        if scope["type"] != ScopeType.HTTP:
+            await app(scope, receive, send)
+            return
+        admission_class = _admission_class(scope["route_handler"].opt.get(constants.ADMISSION_CLASS_OPT_KEY, "default"))
+        await admission_class.acquire()
+        try:
+            await app(scope, receive, send)
+        finally:
+            admission_class.release()
+
+    return middleware
+
+
+def on_app_init(app_config: AppConfig) -> AppConfig:
+    """Install the middleware outside those installed so far, so a shed request never reaches authentication.
+
+    Register it after the authentication `on_app_init`, whose middleware looks the user up in the database.
+    """
+    app_config.middleware.insert(0, middleware_factory)
+    return app_config
@@ -0,0 +1,77 @@
+"""A small, dependency free Bloom filter.
+
+Used to answer "definitely absent" membership questions without a database
+round trip.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import TYPE_CHECKING
+
+__all__ = ["BloomFilter"]
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+class BloomFilter:
+    """Probabilistic set of strings.
+
+    `in` returns `False` only when the item was never added; it may return
+    `True` for items that were not added with roughly `error_rate` probability
+    while fewer than `capacity` items are stored.
+    """
+
+    __slots__ = ("capacity", "count", "hash_count", "size", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        """Size the filter.
+
+        Args:
+            capacity: Expected number of items.
+            error_rate: Target false positive probability at `capacity` items.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[str], capacity: int, error_rate: float = 0.01) -> BloomFilter:
+        """Build a filter containing `items`."""
+        bloom = cls(capacity=capacity, error_rate=error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        """Add `item` to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """Theoretical false positive probability for the current fill."""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
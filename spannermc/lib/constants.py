@@ -15,3 +15,9 @@ USER_DEPENDENCY_KEY = "current_user"
 session."""
 SYSTEM_HEALTH_URL = "/api/health"
 """API Health URL"""
+ADMISSION_CLASS_OPT_KEY = "admission_class"
+"""Key of a route handler's `opt` naming the admission class its requests are limited by."""
+REQUEST_TIMEOUT_OPT_KEY = "request_timeout"
+"""Key of a route handler's `opt` with the default deadline of its requests, in seconds."""
+STATEMENT_BUDGET_OPT_KEY = "statement_budget"
+"""Key of a route handler's `opt` with the number of statements its requests may run before being reported."""
@@ -1,7 +1,37 @@
 """Core DB Package."""
 from __future__ import annotations
 
-from spannermc.lib.db import orm, utils
-from spannermc.lib.db.base import config, engine, plugin, session, session_factory
+from spannermc.lib.db import budget, instruments, orm, rows, slow_queries, statistics, tags, utils
+from spannermc.lib.db.base import (
+    get_config,
+    get_engine,
+    get_plugin,
+    get_session_factory,
+    get_spanner_client,
+    get_spanner_pool,
+    on_shutdown,
+    on_startup,
+    session,
+    warm_pool,
+)
 
-__all__ = ["config", "plugin", "engine", "session", "session_factory", "orm", "utils"]
+__all__ = [
+    "get_config",
+    "get_engine",
+    "get_plugin",
+    "get_session_factory",
+    "get_spanner_client",
+    "get_spanner_pool",
+    "session",
+    "warm_pool",
+    "on_startup",
+    "on_shutdown",
+    "budget",
+    "instruments",
+    "orm",
+    "rows",
+    "slow_queries",
+    "statistics",
+    "tags",
+    "utils",
+]
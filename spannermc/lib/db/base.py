@@ -1,63 +1,164 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any
 
 from google.cloud import spanner  # type: ignore[attr-defined, unused-ignore]
+from google.cloud.spanner_v1.pool import AbstractSessionPool, BurstyPool, FixedSizePool, PingingPool
 from litestar.contrib.sqlalchemy.plugins.init.config import (
     SQLAlchemySyncConfig,
 )
 from litestar.contrib.sqlalchemy.plugins.init.config.sync import autocommit_before_send_handler
 from litestar.contrib.sqlalchemy.plugins.init.plugin import SQLAlchemyInitPlugin
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
-from spannermc.lib import constants, settings
+from spannermc.lib import constants, deadline, log, settings
+from spannermc.lib.db import budget, slow_queries, statistics, tags
+from spannermc.lib.db.instruments import InstrumentedQueuePool
 
-__all__ = ["session"]
+__all__ = [
+    "get_config",
+    "get_engine",
+    "get_plugin",
+    "get_session_factory",
+    "get_spanner_client",
+    "get_spanner_pool",
+    "on_shutdown",
+    "on_startup",
+    "session",
+    "warm_pool",
+]
 
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+    from sqlalchemy.engine import Dialect, Engine
     from sqlalchemy.orm import Session
+    from sqlalchemy.pool import ConnectionPoolEntry
 
 
-spanner_client_options: dict[str, Any] = {"project": settings.cloud.GOOGLE_PROJECT}
-if settings.db.API_ENDPOINT is not None:
-    spanner_client_options.update({"client_options": {"api_endpoint": settings.db.API_ENDPOINT}})
-
-spanner_client = spanner.Client(**spanner_client_options)
-engine = create_engine(
-    settings.db.URL,
-    future=True,
-    echo=settings.db.ECHO,
-    echo_pool=True if settings.db.ECHO_POOL == "debug" else settings.db.ECHO_POOL,
-    max_overflow=settings.db.POOL_MAX_OVERFLOW,
-    pool_size=settings.db.POOL_SIZE,
-    pool_timeout=settings.db.POOL_TIMEOUT,
-    pool_recycle=settings.db.POOL_RECYCLE,
-    pool_pre_ping=settings.db.POOL_PRE_PING,
-    pool_use_lifo=True,  # use lifo to reduce the number of idle connections
-    poolclass=NullPool if settings.db.POOL_DISABLE else None,
-    connect_args={"client": spanner_client},
-)
-session_factory: sessionmaker[Session] = sessionmaker(engine, expire_on_commit=False)
-"""Database session factory.
+logger = log.get_logger()
 
-See [`sessionmaker()`][sqlalchemy.orm.sessionmaker].
-"""
 
-config = SQLAlchemySyncConfig(
-    session_dependency_key=constants.DB_SESSION_DEPENDENCY_KEY,
-    engine_instance=engine,
-    session_maker=session_factory,
-    before_send_handler=autocommit_before_send_handler,
-)
+def _create_session_pool() -> AbstractSessionPool | None:
+    """Build the Spanner session pool selected by `DB_SPANNER_POOL_TYPE`.
+
+    Returns:
+        The session pool, or `None` to let the client use its default.
+    """
+    labels = settings.db.SPANNER_SESSION_LABELS or None
+    if settings.db.SPANNER_POOL_TYPE == "fixed":
+        return FixedSizePool(  # type: ignore[no-untyped-call]
+            size=settings.db.SPANNER_POOL_SIZE,
+            default_timeout=settings.db.SPANNER_POOL_TIMEOUT,
+            labels=labels,
+        )
+    if settings.db.SPANNER_POOL_TYPE == "bursty":
+        return BurstyPool(target_size=settings.db.SPANNER_POOL_SIZE, labels=labels)  # type: ignore[no-untyped-call]
+    if settings.db.SPANNER_POOL_TYPE == "pinging":
+        ping_options = (
+            {"ping_interval": settings.db.SPANNER_POOL_PING_INTERVAL} if settings.db.SPANNER_POOL_PING_INTERVAL else {}
+        )
+        return PingingPool(  # type: ignore[no-untyped-call]
+            size=settings.db.SPANNER_POOL_SIZE,
+            default_timeout=settings.db.SPANNER_POOL_TIMEOUT,
+            labels=labels,
+            **ping_options,
+        )
+    return None
+
+
+@lru_cache
+def get_spanner_client() -> spanner.Client:
+    """Build the Spanner client on first use.
+
+    Constructing the client resolves credentials, which can mean network calls
+    to the metadata server, so nothing does this until a connection is opened.
+    """
+    options: dict[str, Any] = {"project": settings.cloud.GOOGLE_PROJECT}
+    if settings.db.API_ENDPOINT is not None:
+        options.update({"client_options": {"api_endpoint": settings.db.API_ENDPOINT}})
+    return spanner.Client(**options)
+
+
+@lru_cache
+def get_spanner_pool() -> AbstractSessionPool | None:
+    """Return the Spanner session pool shared by every connection."""
+    return _create_session_pool()
+
+
+def _provide_spanner_connect_args(
+    dialect: Dialect,
+    connection_record: ConnectionPoolEntry,
+    cargs: list[Any],
+    cparams: dict[str, Any],
+) -> None:
+    """Hand the shared client and session pool to each new DBAPI connection."""
+    cparams["client"] = get_spanner_client()
+    if (pool := get_spanner_pool()) is not None:
+        cparams["pool"] = pool
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """Build the SQLAlchemy engine on first use.
+
+    Creating the engine does not connect.  The Spanner client is only
+    constructed when the pool opens its first connection.
+    """
+    engine = create_engine(
+        settings.db.URL,
+        future=True,
+        echo=settings.db.ECHO,
+        echo_pool=True if settings.db.ECHO_POOL == "debug" else settings.db.ECHO_POOL,
+        max_overflow=settings.db.POOL_MAX_OVERFLOW,
+        pool_size=settings.db.POOL_SIZE,
+        pool_timeout=settings.db.POOL_TIMEOUT,
+        pool_recycle=settings.db.POOL_RECYCLE,
+        pool_pre_ping=settings.db.POOL_PRE_PING,
+        pool_use_lifo=True,  # use lifo to reduce the number of idle connections
+        poolclass=NullPool if settings.db.POOL_DISABLE else InstrumentedQueuePool,
+    )
+    event.listen(engine, "do_connect", _provide_spanner_connect_args)
+    deadline.listen(engine)
+    slow_queries.listen(engine)
+    budget.listen(engine)
+    statistics.listen(engine)
+    return engine
+
+
+@lru_cache
+def get_session_factory() -> sessionmaker[Session]:
+    """Database session factory.
+
+    See [`sessionmaker()`][sqlalchemy.orm.sessionmaker].
+    """
+    session_factory = sessionmaker(get_engine(), expire_on_commit=False)
+    tags.listen(session_factory)
+    return session_factory
+
+
+@lru_cache
+def get_config() -> SQLAlchemySyncConfig:
+    """Litestar SQLAlchemy configuration bound to the shared engine."""
+    return SQLAlchemySyncConfig(
+        session_dependency_key=constants.DB_SESSION_DEPENDENCY_KEY,
+        engine_instance=get_engine(),
+        session_maker=get_session_factory(),
+        before_send_handler=autocommit_before_send_handler,
+    )
 
 
-plugin = SQLAlchemyInitPlugin(config=config)
+@lru_cache
+def get_plugin() -> SQLAlchemyInitPlugin:
+    """Litestar SQLAlchemy plugin for `get_config()`."""
+    return SQLAlchemyInitPlugin(config=get_config())
 
 
 @contextmanager
@@ -67,5 +168,75 @@ def session() -> Iterator[Session]:
     Returns:
         Iterator[Session]
     """
-    with session_factory() as session:
+    with get_session_factory()() as session:
         yield session
+
+
+def warm_pool(size: int | None = None) -> int:
+    """Check out and exercise `size` connections at once.
+
+    Each connection runs a trivial query, which binds the Spanner session pool
+    and creates its sessions, then all are returned to the SQLAlchemy pool.
+
+    Args:
+        size: Number of connections to open.  Defaults to `DB_POOL_SIZE`.
+
+    Returns:
+        The number of connections warmed.
+    """
+    size = size or settings.db.POOL_SIZE
+    with contextlib.ExitStack() as stack:
+        engine = get_engine()
+        connections = [stack.enter_context(engine.connect()) for _ in range(size)]
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+    return len(connections)
+
+
+async def _keep_sessions_alive(pool: PingingPool, interval: float) -> None:
+    """Ping idle Spanner sessions so they are not reclaimed by the server.
+
+    A failed ping is logged, and the sessions are pinged again after the next `interval`.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(pool.ping)
+        except Exception as exc:  # noqa: BLE001
+            await logger.awarning("Spanner session ping failed", exc_info=exc)
+
+
+_keepalive_task: asyncio.Task[None] | None = None
+
+
+async def on_startup() -> None:
+    """Pre-warm the connection and session pools and start session keepalive.
+
+    Startup, and therefore readiness, waits for the warm-up up to
+    `DB_POOL_PREWARM_TIMEOUT` seconds.  Failures are logged and the
+    application starts cold.
+    """
+    global _keepalive_task  # noqa: PLW0603
+    if settings.db.POOL_PREWARM:
+        try:
+            warmed = await asyncio.wait_for(asyncio.to_thread(warm_pool), timeout=settings.db.POOL_PREWARM_TIMEOUT)
+        except Exception as exc:  # noqa: BLE001
+            await logger.awarning("Database pool pre-warm failed", exc_info=exc)
+        else:
+            await logger.ainfo("Database pool pre-warmed", connections=warmed)
+    spanner_pool = get_spanner_pool()
+    if isinstance(spanner_pool, PingingPool) and settings.db.SPANNER_POOL_PING_INTERVAL > 0:
+        _keepalive_task = asyncio.create_task(
+            _keep_sessions_alive(spanner_pool, settings.db.SPANNER_POOL_PING_INTERVAL),
+        )
+
+
+async def on_shutdown() -> None:
+    """Stop the session keepalive."""
+    global _keepalive_task  # noqa: PLW0603
+    if _keepalive_task is None:
+        return
+    _keepalive_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _keepalive_task
+    _keepalive_task = None
@@ -0,0 +1,155 @@
+"""Per-request statement budget.
+
+Every HTTP request counts the statements it runs, the rows they return or
+affect and the time spent in the database.  The counts are bound into the
+structlog context as `db`, so they appear on the request's HTTP log line.
+
+A request is reported when it runs more statements than its budget, the
+`statement_budget` key of its route handler's `opt` or
+`DB_STATEMENT_BUDGET`, or runs the same statement shape
+`DB_STATEMENT_REPEAT_LIMIT` times, the usual sign of a lazy load per row.
+Reports are logged as warnings, or raised as `StatementBudgetError` when
+`APP_DEBUG` is set, so they fail tests and local requests loudly.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from litestar.enums import ScopeType
+from sqlalchemy import event
+
+from spannermc.lib import constants, exceptions, log, settings
+from spannermc.lib.db import rows, slow_queries
+
+if TYPE_CHECKING:
+    from litestar.types import ASGIApp, Receive, Scope, Send
+    from sqlalchemy.engine import Connection, Engine, ExecutionContext
+
+__all__ = ["RequestStatements", "StatementBudgetError", "current", "listen", "middleware_factory"]
+
+logger = log.get_logger()
+
+
+class StatementBudgetError(exceptions.ApplicationError):
+    """A request ran more statements than its budget, or repeated one statement shape too often."""
+
+
+class RequestStatements:
+    """Statements run by one request."""
+
+    __slots__ = ("route", "budget", "counts", "shapes", "_reported")
+
+    def __init__(self, route: str, budget: int) -> None:
+        self.route = route
+        self.budget = budget
+        self.counts: dict[str, Any] = {"statements": 0, "rows": 0, "time": 0.0}
+        """Bound into the structlog context, so log lines show the counts at the time they are written."""
+        self.shapes: Counter[str] = Counter()
+        self._reported: set[str] = set()
+
+    def record(self, statement: str) -> None:
+        """Count a statement about to run, and report the request if it is over budget."""
+        self.counts["statements"] += 1
+        statements = self.counts["statements"]
+        if self.budget and statements > self.budget and "budget" not in self._reported:
+            self._report("budget", "Statement budget exceeded", statements=statements, budget=self.budget)
+        repeat_limit = settings.db.STATEMENT_REPEAT_LIMIT
+        if not repeat_limit:
+            return
+        shape = slow_queries.normalize(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] >= repeat_limit and shape not in self._reported:
+            self._report(shape, "Repeated statement", sql=shape, repeats=self.shapes[shape])
+
+    def add_rows(self, rows: int) -> None:
+        """Count rows fetched or affected by the request's statements."""
+        self.counts["rows"] += rows
+
+    def _report(self, key: str, message: str, **details: Any) -> None:
+        self._reported.add(key)
+        if settings.app.DEBUG:
+            raise StatementBudgetError(f"{message} in {self.route}: {details}")
+        logger.warning(message, route=self.route, **details)
+
+
+current: ContextVar[RequestStatements | None] = ContextVar("request_statements", default=None)
+"""Statements of the request being handled, if any."""
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    statements = current.get()
+    if statements is None:
+        return
+    statements.record(statement)
+    context._budget_started = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    statements = current.get()
+    started = getattr(context, "_budget_started", None)
+    if statements is None or started is None:
+        return
+    statements.counts["time"] = round(statements.counts["time"] + time.perf_counter() - started, 4)
+    rows.count(context, cursor, statements.add_rows)
+
+
+def listen(engine: Engine) -> None:
+    """Count the statements run on `engine` against the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def middleware_factory(app: ASGIApp) -> ASGIApp:
+    """Middleware that counts the statements of each HTTP request.
+
+    Must run inside the structlog middleware, which clears the context the counts are bound into.
+
+    Args:
+        app: The previous ASGI app in the call chain.
+
+    Returns:
+        A new ASGI app that sets `current` before calling `app`.
+    """
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        """Count the statements run by the request.
+
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive handler.
+            send: ASGI send handler.
+        """
+        if scope["type"] != ScopeType.HTTP:
+            await app(scope, receive, send)
+            return
+        route_handler = scope["route_handler"]
+        statements = RequestStatements(
+            route_handler.name or route_handler.handler_name,
+            route_handler.opt.get(constants.STATEMENT_BUDGET_OPT_KEY, settings.db.STATEMENT_BUDGET),
+        )
+        structlog.contextvars.bind_contextvars(db=statements.counts)
+        token = current.set(statements)
+        try:
+            await app(scope, receive, send)
+        finally:
+            current.reset(token)
+
+    return middleware
@@ -0,0 +1,141 @@
+"""OpenTelemetry instruments for the connection and session pools.
+
+The SQLAlchemy `QueuePool` reports connections in use, idle and in overflow
+as observable gauges, plus a histogram of how long each checkout waited and a
+counter of checkouts that timed out.  The Spanner session pool reports its
+idle sessions, and its sessions in use when the pool has a fixed size, which
+includes the `pinging` pool.  The Spanner pools have no public accessor for
+their queue of idle sessions, so its size is read from the private queue.
+With `DB_SPANNER_POOL_TYPE="default"` no pool is shared with the engine, and
+sessions are not reported.
+
+Instruments are created by `register` on the meter of the application's
+`MeterProvider`.  Until then the pool records nothing.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from google.cloud.spanner_v1.pool import BurstyPool, FixedSizePool
+from opentelemetry.metrics import Observation
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+__all__ = ["InstrumentedQueuePool", "PoolInstruments", "register"]
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from google.cloud.spanner_v1.pool import AbstractSessionPool
+    from opentelemetry.metrics import Counter, Histogram, Meter
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.pool import ConnectionPoolEntry
+
+
+@dataclass
+class PoolInstruments:
+    """Synchronous instruments recorded from the pool itself."""
+
+    wait_time: Histogram
+    timeouts: Counter
+
+
+_instruments: PoolInstruments | None = None
+
+
+class InstrumentedQueuePool(QueuePool):
+    """`QueuePool` that records checkout wait times and timeouts."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        instruments = _instruments
+        if instruments is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            instruments.timeouts.add(1)
+            raise
+        finally:
+            instruments.wait_time.record((time.perf_counter() - started) * 1000)
+
+
+def _observe_connections(engine: Engine) -> Iterable[Observation]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return []
+    return [
+        Observation(pool.checkedout(), {"state": "used"}),
+        Observation(pool.checkedin(), {"state": "idle"}),
+    ]
+
+
+def _observe_overflow(engine: Engine) -> Iterable[Observation]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return []
+    return [Observation(max(pool.overflow(), 0))]
+
+
+def _observe_sessions(spanner_pool: AbstractSessionPool) -> Iterable[Observation]:
+    # `PingingPool` is a `FixedSizePool` whose queue holds (ping time, session) pairs
+    if isinstance(spanner_pool, FixedSizePool):
+        idle = spanner_pool._sessions.qsize()
+        return [
+            Observation(spanner_pool.size - idle, {"state": "used"}),
+            Observation(idle, {"state": "idle"}),
+        ]
+    if isinstance(spanner_pool, BurstyPool):
+        # sessions beyond the target size are created on demand and never queued, so usage is unknown
+        return [Observation(spanner_pool._sessions.qsize(), {"state": "idle"})]
+    return []
+
+
+def register(meter: Meter, engine: Engine, spanner_pool: AbstractSessionPool | None = None) -> PoolInstruments:
+    """Create the pool instruments on `meter`.
+
+    Args:
+        meter: Meter of the application's `MeterProvider`.
+        engine: Engine whose connection pool is observed.
+        spanner_pool: Spanner session pool passed to the engine, if one was configured.
+
+    Returns:
+        The synchronous instruments, which the pool records into from now on.
+    """
+    global _instruments  # noqa: PLW0603
+    meter.create_observable_gauge(
+        "db.client.connections.usage",
+        callbacks=[lambda _: _observe_connections(engine)],
+        unit="{connection}",
+        description="Connections in the pool, by state.",
+    )
+    meter.create_observable_gauge(
+        "db.client.connections.overflow",
+        callbacks=[lambda _: _observe_overflow(engine)],
+        unit="{connection}",
+        description="Connections open beyond the pool size.",
+    )
+    if spanner_pool is not None:
+        sessions = spanner_pool
+        meter.create_observable_gauge(
+            "db.spanner.sessions.usage",
+            callbacks=[lambda _: _observe_sessions(sessions)],
+            unit="{session}",
+            description="Sessions in the Spanner session pool, by state.",
+        )
+    _instruments = PoolInstruments(
+        wait_time=meter.create_histogram(
+            "db.client.connections.wait_time",
+            unit="ms",
+            description="Time taken to obtain a connection from the pool.",
+        ),
+        timeouts=meter.create_counter(
+            "db.client.connections.timeouts",
+            unit="{timeout}",
+            description="Connection checkouts that timed out waiting for the pool.",
+        ),
+    )
+    return _instruments
@@ -0,0 +1,102 @@
+"""Rows returned or affected by statements.
+
+Spanner's DBAPI cursor has no row count for a `SELECT` (`rowcount` is -1),
+and the rows of a statement are fetched after its execute events.  `count`
+wraps the cursor of a statement that returns rows, so the rows are counted as
+the result fetches them; for a statement that does not, the rows it affected
+are counted at once.  `total` reports all the rows of a statement once its
+result is closed, which the result does when its last row is fetched.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.engine import ExecutionContext
+
+__all__ = ["count", "total"]
+
+
+class _RowCountingCursor:
+    """DBAPI cursor that reports the rows fetched through it."""
+
+    __slots__ = ("cursor", "rows", "counted", "closed")
+
+    def __init__(self, cursor: Any) -> None:
+        self.cursor = cursor
+        self.rows = 0
+        self.counted: list[Callable[[int], None]] = []
+        self.closed: list[Callable[[int], None]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.cursor, name)
+
+    def _count(self, rows: int) -> None:
+        self.rows += rows
+        for counted in self.counted:
+            counted(rows)
+
+    def close(self) -> None:
+        self.cursor.close()
+        closed, self.closed = self.closed, []
+        for counted in closed:
+            counted(self.rows)
+
+    def fetchone(self) -> Any:
+        row = self.cursor.fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, *args: Any) -> list[Any]:
+        rows: list[Any] = self.cursor.fetchmany(*args)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        rows: list[Any] = self.cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+
+def count(context: ExecutionContext, cursor: Any, counted: Callable[[int], None]) -> None:
+    """Call `counted` with the rows of the statement of `context`, as they are fetched or once affected.
+
+    Call from an `after_cursor_execute` listener.
+
+    Args:
+        context: Execution context of the statement.
+        cursor: DBAPI cursor the statement ran on.
+        counted: Called with each number of rows counted.
+    """
+    if cursor.description is None:
+        if cursor.rowcount > 0:
+            counted(cursor.rowcount)
+        return
+    _wrap(context, cursor).counted.append(counted)
+
+
+def total(context: ExecutionContext, cursor: Any, counted: Callable[[int], None]) -> None:
+    """Call `counted` once with all the rows of the statement of `context`, when its result is closed.
+
+    Call from an `after_cursor_execute` listener.  A result closed before its last row is fetched reports the
+    rows fetched so far.
+
+    Args:
+        context: Execution context of the statement.
+        cursor: DBAPI cursor the statement ran on.
+        counted: Called with the number of rows.
+    """
+    if cursor.description is None:
+        counted(max(cursor.rowcount, 0))
+        return
+    _wrap(context, cursor).closed.append(counted)
+
+
+def _wrap(context: ExecutionContext, cursor: Any) -> _RowCountingCursor:
+    wrapper = context.cursor
+    if not isinstance(wrapper, _RowCountingCursor):
+        wrapper = context.cursor = _RowCountingCursor(cursor)
+    return wrapper
@@ -0,0 +1,135 @@
+"""Slow-query log.
+
+Every statement run by the engine is timed.  Statements that take at least
+`DB_SLOW_QUERY_THRESHOLD` seconds are logged with their normalized SQL,
+their parameter types (values are never logged), the rows returned or
+affected and the route that ran them.  The rows of a `SELECT` are counted by
+`rows.total` as they are fetched, so its entry is logged once its result is
+closed.
+
+`DB_SLOW_QUERY_PLAN_SAMPLE_RATE` of the slow `SELECT` statements are run
+again in Spanner's `PLAN` mode, on a background thread, and logged with
+their query plan instead.
+"""
+from __future__ import annotations
+
+import functools
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event
+
+from spannermc.lib import log, settings
+from spannermc.lib.db import rows, tags
+
+if TYPE_CHECKING:
+    from google.cloud.spanner_v1.database import Database
+    from sqlalchemy.engine import Connection, Engine, ExecutionContext
+
+__all__ = ["listen", "normalize", "redact"]
+
+logger = log.get_logger()
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_planner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-plan")
+
+
+def normalize(statement: str) -> str:
+    """Collapse whitespace and replace string and number literals with `?`."""
+    return _LITERALS.sub("?", _WHITESPACE.sub(" ", statement).strip())
+
+
+def redact(parameters: Any) -> Any:
+    """Replace parameter values with their type names."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    context._slow_query_started = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    elapsed = time.perf_counter() - context._slow_query_started  # type: ignore[attr-defined]
+    if elapsed < settings.db.SLOW_QUERY_THRESHOLD:
+        return
+    entry = {
+        "sql": normalize(statement),
+        "parameters": f"{len(parameters)} parameter sets" if executemany else redact(parameters),
+        "duration": round(elapsed, 4),
+        "route": tags.current.get(),
+    }
+    database = getattr(conn.connection.dbapi_connection, "database", None)
+    rows.total(context, cursor, functools.partial(_log, database, statement, parameters, entry))
+
+
+def _log(database: Database | None, statement: str, parameters: Any, entry: dict[str, Any], count: int) -> None:
+    entry["rows"] = count
+    if (
+        database is not None
+        and entry["sql"].upper().startswith(("SELECT", "WITH"))
+        and random.random() < settings.db.SLOW_QUERY_PLAN_SAMPLE_RATE  # noqa: S311
+    ):
+        _planner.submit(_log_with_plan, database, statement, parameters, entry)
+        return
+    logger.warning("Slow query", **entry)
+
+
+def _log_with_plan(database: Database, statement: str, parameters: Any, entry: dict[str, Any]) -> None:
+    try:
+        entry["plan"] = _query_plan(database, statement, parameters)
+    except Exception as exc:  # noqa: BLE001
+        entry["plan_error"] = f"{type(exc).__name__}: {exc}"
+    logger.warning("Slow query", **entry)
+
+
+def _query_plan(database: Database, statement: str, parameters: Any) -> list[dict[str, Any]]:
+    from google.cloud.spanner_dbapi.parse_utils import get_param_types, sql_pyformat_args_to_spanner
+    from google.cloud.spanner_v1 import ExecuteSqlRequest
+
+    sql, params = sql_pyformat_args_to_spanner(statement, parameters or None)
+    with database.snapshot() as snapshot:  # type: ignore[no-untyped-call]
+        results = snapshot.execute_sql(
+            sql,
+            params=params,
+            param_types=get_param_types(params),
+            query_mode=ExecuteSqlRequest.QueryMode.PLAN,
+        )
+        list(results)
+    return [
+        {
+            "index": node.index,
+            "name": node.display_name,
+            "children": [link.child_index for link in node.child_links],
+        }
+        for node in results.stats.query_plan.plan_nodes
+    ]
+
+
+def listen(engine: Engine) -> None:
+    """Time the statements run by `engine` and log the slow ones."""
+    if settings.db.SLOW_QUERY_THRESHOLD < 0:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
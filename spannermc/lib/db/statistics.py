@@ -0,0 +1,160 @@
+"""Statement statistics.
+
+An in-process equivalent of `pg_stat_statements`: every statement run by the
+engine is aggregated under its fingerprint, the normalized SQL of
+`slow_queries.normalize`.  Per fingerprint the calls, total and maximum
+latency, a latency histogram and the rows returned or affected are kept; the
+rows are counted by `rows.count` as the results are fetched.
+
+Statistics are per worker process and start empty.  At most
+`DB_STATEMENT_STATISTICS_SIZE` fingerprints are tracked; statements with a
+new fingerprint past that are only counted in `StatementStatistics.dropped`.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import hashlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event
+
+from spannermc.lib import settings
+from spannermc.lib.db import rows, slow_queries
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Engine, ExecutionContext
+
+__all__ = ["LATENCY_BUCKETS", "StatementStatistics", "listen", "statistics"]
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds, in seconds, of the latency histogram buckets. The last bucket has no upper bound."""
+
+
+class _Statement:
+    __slots__ = ("sql", "calls", "total_time", "max_time", "rows", "buckets")
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile, capped at the maximum latency."""
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_time)
+        return self.max_time
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fingerprint": hashlib.sha1(self.sql.encode(), usedforsecurity=False).hexdigest()[:16],
+            "sql": self.sql,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_time": round(self.total_time, 6),
+            "mean_time": round(self.total_time / self.calls, 6),
+            "max_time": round(self.max_time, 6),
+            "p50_time": round(self.quantile(0.5), 6),
+            "p95_time": round(self.quantile(0.95), 6),
+            "p99_time": round(self.quantile(0.99), 6),
+            "histogram": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.buckets, strict=True)),
+        }
+
+
+class StatementStatistics:
+    """Latency and row statistics of the statements run by this process, by fingerprint."""
+
+    def __init__(self) -> None:
+        self._statements: dict[str, _Statement] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+        """Statements not aggregated because `DB_STATEMENT_STATISTICS_SIZE` fingerprints were already tracked."""
+        self.since = time.time()
+        """Unix time of the last reset."""
+
+    def add(self, statement: str, elapsed: float) -> _Statement | None:
+        """Aggregate one run of `statement`.
+
+        Returns:
+            The statistics of its fingerprint, to pass to `add_rows`, or `None` if it is not tracked.
+        """
+        sql = slow_queries.normalize(statement)
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                if len(self._statements) >= settings.db.STATEMENT_STATISTICS_SIZE:
+                    self.dropped += 1
+                    return None
+                stats = self._statements[sql] = _Statement(sql)
+            stats.add(elapsed)
+            return stats
+
+    def add_rows(self, stats: _Statement, rows: int) -> None:
+        """Aggregate rows returned or affected by a run of the statement of `stats`."""
+        with self._lock:
+            stats.rows += rows
+
+    def snapshot(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Statistics of the statements with the most total time, most first."""
+        with self._lock:
+            statements = sorted(self._statements.values(), key=lambda stats: stats.total_time, reverse=True)
+            return [stats.as_dict() for stats in statements[:limit]]
+
+    def reset(self) -> None:
+        """Forget all statistics."""
+        with self._lock:
+            self._statements.clear()
+            self.dropped = 0
+            self.since = time.time()
+
+
+statistics = StatementStatistics()
+"""Statement statistics of this process."""
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    context._statistics_started = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    elapsed = time.perf_counter() - context._statistics_started  # type: ignore[attr-defined]
+    stats = statistics.add(statement, elapsed)
+    if stats is not None:
+        rows.count(context, cursor, functools.partial(statistics.add_rows, stats))
+
+
+def listen(engine: Engine) -> None:
+    """Aggregate the statements run by `engine` into `statistics`."""
+    if settings.db.STATEMENT_STATISTICS_SIZE <= 0:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -5,7 +5,7 @@ from sqlalchemy.schema import DropTable
 
 from spannermc.lib import log, settings
 
-from .base import engine
+from .base import get_engine
 from .orm import DatabaseModel, orm_registry
 
 __all__ = [
@@ -60,7 +60,7 @@ def show_database_revision() -> None:
 def drop_tables() -> None:
     """Drop all tables from the database."""
     logger.info("Connecting to database backend.")
-    with engine.begin() as db:
+    with get_engine().begin() as db:
         logger.info("Dropping the db")
         DatabaseModel.metadata.drop_all(db)
         logger.info("Dropping the version table")
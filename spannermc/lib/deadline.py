@@ -0,0 +1,210 @@
+"""Request deadlines.
+
+Every HTTP request gets a deadline: the `X-Request-Timeout` header, in
+seconds, or the `request_timeout` key of its route handler's `opt`, or
+`REQUEST_TIMEOUT`, capped at `REQUEST_TIMEOUT_MAX`.  The deadline is held in
+a context variable, so it follows the request into the worker thread that
+runs a synchronous handler.
+
+The deadline reaches Spanner in two places.  A gRPC interceptor on the
+channel of each Spanner connection's database caps the timeout of every RPC
+at the time remaining, and a `before_cursor_execute` listener refuses to
+start a statement once the deadline has passed.
+
+A client disconnect is not acted on: the route handlers run on the event
+loop (`sync_to_thread=False`), so the disconnect could only be received
+once the handler had already returned.  A request whose client has gone is
+bounded by its deadline instead.
+"""
+from __future__ import annotations
+
+import contextlib
+import time
+from collections import namedtuple
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+import grpc
+from litestar.enums import ScopeType
+
+from spannermc.lib import constants, exceptions, settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from litestar.config.app import AppConfig
+    from litestar.types import ASGIApp, Receive, Scope, Send
+    from sqlalchemy.engine import Engine
+
+__all__ = [
+    "RequestDeadline",
+    "current",
+    "intercept_database",
+    "listen",
+    "middleware_factory",
+    "on_app_init",
+]
+
+
+class RequestDeadline:
+    """When a request's database work must stop."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, timeout: float | None) -> None:
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+
+    def remaining(self) -> float | None:
+        """Seconds left, or `None` without a deadline."""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        """The deadline has passed."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self) -> None:
+        """Raise `RequestTimeoutError` if no more database work should start."""
+        if self.expired:
+            raise exceptions.RequestTimeoutError("request deadline exceeded")
+
+
+current: ContextVar[RequestDeadline | None] = ContextVar("request_deadline", default=None)
+"""Deadline of the request being handled, if any."""
+
+
+class _CallDetails(
+    namedtuple("_CallDetails", ("method", "timeout", "metadata", "credentials", "wait_for_ready", "compression")),
+    grpc.ClientCallDetails,  # type: ignore[misc]
+):
+    """Call details with a replaced timeout."""
+
+
+class _DeadlineInterceptor(
+    grpc.UnaryUnaryClientInterceptor,  # type: ignore[misc]
+    grpc.UnaryStreamClientInterceptor,  # type: ignore[misc]
+    grpc.StreamUnaryClientInterceptor,  # type: ignore[misc]
+    grpc.StreamStreamClientInterceptor,  # type: ignore[misc]
+):
+    """Cap each RPC's timeout at the time left for the current request."""
+
+    def _intercept(self, continuation: Callable[..., Any], details: grpc.ClientCallDetails, request: Any) -> Any:
+        request_deadline = current.get()
+        if request_deadline is None:
+            return continuation(details, request)
+        request_deadline.check()
+        remaining = request_deadline.remaining()
+        if remaining is not None:
+            details = _CallDetails(
+                details.method,
+                remaining if details.timeout is None else min(details.timeout, remaining),
+                details.metadata,
+                details.credentials,
+                getattr(details, "wait_for_ready", None),
+                getattr(details, "compression", None),
+            )
+        return continuation(details, request)
+
+    intercept_unary_unary = _intercept
+    intercept_unary_stream = _intercept
+    intercept_stream_unary = _intercept
+    intercept_stream_stream = _intercept
+
+
+_interceptor = _DeadlineInterceptor()
+
+
+def intercept_database(database: Any) -> None:
+    """Send the RPCs of a Spanner `Database` through the deadline interceptor.
+
+    The database builds its API client on first use, on a channel of its own.  That client is replaced by one on
+    the same channel, intercepted, the way the Spanner client itself builds one for the emulator.
+
+    That sets the private `_spanner_api` of the database and reads the private client info of its client;
+    `test_database_rpcs_go_through_the_interceptor` fails if a Spanner client upgrade changes either.
+    """
+    from google.cloud.spanner_v1 import SpannerClient
+    from google.cloud.spanner_v1.services.spanner.transports.grpc import SpannerGrpcTransport
+
+    channel = grpc.intercept_channel(database.spanner_api.transport.grpc_channel, _interceptor)
+    transport = SpannerGrpcTransport(channel=channel)
+    database._spanner_api = SpannerClient(client_info=database._instance._client._client_info, transport=transport)
+
+
+def _check_deadline(*_: Any) -> None:
+    request_deadline = current.get()
+    if request_deadline is not None:
+        request_deadline.check()
+
+
+def _intercept_connection(dbapi_connection: Any, _: Any) -> None:
+    database = getattr(dbapi_connection, "database", None)
+    if database is not None:
+        intercept_database(database)
+
+
+def listen(engine: Engine) -> None:
+    """Cap the RPCs of `engine`'s Spanner connections at the request deadline, and refuse statements past it."""
+    from sqlalchemy import event
+
+    event.listen(engine, "connect", _intercept_connection)
+    event.listen(engine, "before_cursor_execute", _check_deadline)
+
+
+def _timeout(scope: Scope) -> float | None:
+    timeout: float | None = scope["route_handler"].opt.get(
+        constants.REQUEST_TIMEOUT_OPT_KEY, settings.app.REQUEST_TIMEOUT
+    )
+    header = settings.app.REQUEST_TIMEOUT_HEADER.lower().encode()
+    for name, value in scope["headers"]:
+        if name == header:
+            with contextlib.suppress(ValueError):
+                requested = float(value)
+                if requested > 0:
+                    timeout = requested
+            break
+    if not timeout or timeout <= 0:
+        return None
+    return min(timeout, settings.app.REQUEST_TIMEOUT_MAX)
+
+
+def middleware_factory(app: ASGIApp) -> ASGIApp:
+    """Middleware that sets the request deadline.
+
+    Args:
+        app: The previous ASGI app in the call chain.
+
+    Returns:
+        A new ASGI app that runs `app` under a deadline.
+    """
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request under its deadline.
+
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive handler.
+            send: ASGI send handler.
+        """
+        if scope["type"] != ScopeType.HTTP:
+            await app(scope, receive, send)
+            return
+        token = current.set(RequestDeadline(_timeout(scope)))
+        try:
+            await app(scope, receive, send)
+        finally:
+            current.reset(token)
+
+    return middleware
+
+
+def on_app_init(app_config: AppConfig) -> AppConfig:
+    """Install the middleware outside those installed so far, so the authentication user lookup has a deadline.
+
+    Register it after the authentication `on_app_init`.
+    """
+    app_config.middleware.insert(0, middleware_factory)
+    return app_config
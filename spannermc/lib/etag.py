@@ -0,0 +1,267 @@
+"""HTTP conditional request support.
+
+Entity tags are derived from `id` and `updated_at` for audited models, or from
+a hash of the column values for models without a timestamp (e.g. `KVStore`).
+
+The route middleware keeps a small, short-lived cache of the last tag served
+for each resource so that a matching `If-None-Match` can be answered with
+`304 Not Modified` once the route guards pass, before any dependency (and
+therefore any database session) is resolved.  Entries are kept per user and
+query string, and dropped by entity when the entity is modified, so a change
+through `/api/users/{user_id}` also drops that user's `/api/me` entry.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from litestar.connection import ASGIConnection
+from litestar.datastructures import MutableScopeHeaders
+from litestar.enums import ScopeType
+from litestar.status_codes import (
+    HTTP_200_OK,
+    HTTP_300_MULTIPLE_CHOICES,
+    HTTP_304_NOT_MODIFIED,
+)
+
+from spannermc.lib import serialization, settings
+
+__all__ = [
+    "ETagCache",
+    "cache",
+    "compute_etag",
+    "etag_matches",
+    "middleware_factory",
+]
+
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from litestar.types import ASGIApp, Message, Receive, Scope, Send
+
+IF_NONE_MATCH_HEADER = "if-none-match"
+ETAG_HEADER = "etag"
+_CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+_MODIFYING_METHODS = frozenset({"PATCH", "PUT", "DELETE"})
+
+
+def compute_etag(obj: Any) -> str:
+    """Generate a strong entity tag for a model instance.
+
+    Args:
+        obj: A database model instance.
+
+    Returns:
+        The quoted entity tag.
+    """
+    updated_at = getattr(obj, "updated_at", None)
+    if updated_at is not None:
+        seed = f"{obj.id}:{updated_at.isoformat()}".encode()
+    else:
+        seed = serialization.to_json(obj.to_dict())
+    return f'"{hashlib.blake2b(seed, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(header_value: str | None, etag: str | None, weak: bool = True) -> bool:
+    """Compare an `If-None-Match` / `If-Match` header value to an entity tag.
+
+    `*` matches any current representation.  With the weak comparison used for
+    `If-None-Match`, weak validators (`W/"..."`) are compared on their opaque
+    value.  With the strong comparison `If-Match` requires (RFC 7232, 3.1), a
+    weak validator never matches.
+
+    Args:
+        header_value: Raw header value, possibly a comma separated list.
+        etag: The current entity tag for the resource.
+        weak: Use the weak comparison function.
+
+    Returns:
+        `True` if any of the listed tags match.
+    """
+    if not header_value or etag is None:
+        return False
+    for candidate in header_value.split(","):
+        tag = candidate.strip()
+        if weak:
+            tag = tag.removeprefix("W/")
+        if tag in {"*", etag}:
+            return True
+    return False
+
+
+class ETagCache:
+    """Bounded, time limited map of resource key to the last entity tag served.
+
+    Entries are per process, so a change made through another worker is only
+    observed here once the entry expires.
+    """
+
+    __slots__ = ("max_size", "ttl", "_entries", "_keys")
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Configure the cache.
+
+        Args:
+            max_size: Maximum number of resources tracked.
+            ttl: Seconds an entry remains valid.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[str, float, str]] = OrderedDict()
+        self._keys: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> str | None:
+        """Return the cached entity tag for `key`, if it has not expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        etag, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self.invalidate(key)
+            return None
+        return etag
+
+    def set(self, key: str, etag: str, entity: str = "") -> None:
+        """Record the entity tag last served for `key`, a representation of `entity`."""
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        self.invalidate(key)
+        self._entries[key] = (etag, time.monotonic() + self.ttl, entity)
+        self._keys.setdefault(entity, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self.invalidate(next(iter(self._entries)))
+
+    def invalidate(self, key: str) -> None:
+        """Forget any entity tag cached for `key`."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys[entry[2]]
+        keys.discard(key)
+        if not keys:
+            del self._keys[entry[2]]
+
+    def invalidate_entity(self, entity: str) -> None:
+        """Forget the entity tags cached for every representation of `entity`."""
+        for key in list(self._keys.get(entity, ())):
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        self._entries.clear()
+        self._keys.clear()
+
+
+cache = ETagCache(max_size=settings.app.ETAG_CACHE_SIZE, ttl=settings.app.ETAG_CACHE_TTL)
+"""Process wide entity tag cache used by the route middleware."""
+
+
+def _user_id(scope: Scope) -> str:
+    return str(getattr(scope.get("user"), "id", ""))
+
+
+def _cache_key(scope: Scope) -> str:
+    """Build the cache key for a connection.
+
+    The key holds the user, the path and the query string, so users never
+    share an entry, and one user's `If-None-Match` is only compared with the
+    tags served to that user.
+    """
+    return f"{_user_id(scope)} {scope['path']}?{scope['query_string'].decode('latin-1')}"
+
+
+def _entity(scope: Scope) -> str:
+    """Identify the entity the route's representations describe.
+
+    That is the values of the route's path parameters, or for a user relative
+    route such as `/api/me`, the id of the user.
+    """
+    path_params = scope.get("path_params")
+    if path_params:
+        return ":".join(str(value) for value in path_params.values())
+    return _user_id(scope)
+
+
+async def _answer_from_cache(scope: Scope, send: Send, key: str, if_none_match: str) -> bool:
+    """Send `304 Not Modified` if `if_none_match` matches the cached tag and the route guards pass.
+
+    Returns:
+        Whether the response was sent.
+    """
+    cached = cache.get(key)
+    if cached is None or not etag_matches(if_none_match, cached):
+        return False
+    # the guards otherwise only run when the handler is called
+    await scope["route_handler"].authorize_connection(ASGIConnection(scope))
+    await _send_not_modified_start(send, cached)
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return True
+
+
+def middleware_factory(app: ASGIApp) -> ASGIApp:
+    """Route middleware that answers conditional requests.
+
+    Applied to detail routes.  `GET` requests whose `If-None-Match` matches the
+    cached tag are answered with `304 Not Modified` without calling the handler,
+    once the route guards pass.
+    Otherwise the `ETag` set by the handler is recorded on the way out, and a
+    matching `If-None-Match` still receives a body-less `304`.  Modifying
+    requests refresh or drop the cached tag.
+
+    Args:
+        app: The next ASGI app in the call chain.
+
+    Returns:
+        The wrapped ASGI app.
+    """
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != ScopeType.HTTP:
+            await app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        key = _cache_key(scope)
+        entity = _entity(scope)
+        if_none_match = MutableScopeHeaders(scope).get(IF_NONE_MATCH_HEADER)
+        if method in _CACHEABLE_METHODS and if_none_match and await _answer_from_cache(scope, send, key, if_none_match):
+            return
+        if method in _MODIFYING_METHODS:
+            cache.invalidate(key)
+            cache.invalidate_entity(entity)
+
+        not_modified = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal not_modified
+            if message["type"] == "http.response.start":
+                etag = MutableScopeHeaders.from_message(message).get(ETAG_HEADER)
+                if etag is not None and HTTP_200_OK <= message["status"] < HTTP_300_MULTIPLE_CHOICES:
+                    if method != "DELETE":
+                        cache.set(key, etag, entity)
+                    if method in _CACHEABLE_METHODS and etag_matches(if_none_match, etag):
+                        not_modified = True
+                        await _send_not_modified_start(send, etag)
+                        return
+            elif not_modified:
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+            await send(message)
+
+        await app(scope, receive, send_wrapper)
+
+    return middleware
+
+
+async def _send_not_modified_start(send: Send, etag: str) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": HTTP_304_NOT_MODIFIED,
+            "headers": [(ETAG_HEADER.encode(), etag.encode())],
+        }
+    )
@@ -8,6 +8,7 @@ from __future__ import annotations
 import sys
 from typing import TYPE_CHECKING
 
+from google.api_core.exceptions import Cancelled, DeadlineExceeded
 from litestar.contrib.repository.exceptions import ConflictError, NotFoundError, RepositoryError
 from litestar.exceptions import (
     HTTPException,
@@ -15,12 +16,21 @@ from litestar.exceptions import (
     NotFoundException,
 )
 from litestar.middleware.exceptions.middleware import create_exception_response
-from litestar.status_codes import HTTP_409_CONFLICT, HTTP_500_INTERNAL_SERVER_ERROR
+from litestar.status_codes import (
+    HTTP_409_CONFLICT,
+    HTTP_412_PRECONDITION_FAILED,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_504_GATEWAY_TIMEOUT,
+)
 from structlog.contextvars import bind_contextvars
 
+from spannermc.lib import deadline
+
 __all__ = [
     "ApplicationError",
     "MissingDependencyError",
+    "PreconditionFailedException",
+    "RequestTimeoutError",
     "after_exception_hook_handler",
     "exception_to_http_response",
 ]
@@ -56,12 +66,28 @@ class MissingDependencyError(ApplicationError, ValueError):
         )
 
 
+class RequestTimeoutError(ApplicationError):
+    """The request's deadline passed before its database work finished."""
+
+
 class _HTTPConflictException(HTTPException):
     """Request conflict with the current state of the target resource."""
 
     status_code = HTTP_409_CONFLICT
 
 
+class PreconditionFailedException(HTTPException):
+    """A conditional request header did not match the current state of the target resource."""
+
+    status_code = HTTP_412_PRECONDITION_FAILED
+
+
+class _HTTPGatewayTimeoutException(HTTPException):
+    """The request did not complete before its deadline."""
+
+    status_code = HTTP_504_GATEWAY_TIMEOUT
+
+
 async def after_exception_hook_handler(exc: Exception, _scope: Scope) -> None:
     """Binds `exc_info` key with exception instance as value to structlog
     context vars.
@@ -94,6 +120,12 @@ def exception_to_http_response(
         Exception response appropriate to the type of original exception.
     """
     http_exc: type[HTTPException]
+    if isinstance(exc, RequestTimeoutError):
+        return create_exception_response(_HTTPGatewayTimeoutException(detail=str(exc)))
+    request_deadline = deadline.current.get()
+    if request_deadline is not None and request_deadline.expired and _is_deadline_error(exc):
+        # the driver reports a cancelled or timed out RPC as a database error
+        return create_exception_response(_HTTPGatewayTimeoutException(detail="request deadline exceeded"))
     if isinstance(exc, NotFoundError):
         http_exc = NotFoundException
     elif isinstance(exc, ConflictError | RepositoryError):
@@ -101,3 +133,15 @@ def exception_to_http_response(
     else:
         http_exc = InternalServerException
     return create_exception_response(http_exc(detail=str(exc.__cause__)))
+
+
+def _is_deadline_error(exc: BaseException) -> bool:
+    """Whether `exc` was raised from an RPC that ran out of time or was cancelled."""
+    seen: set[int] = set()
+    error: BaseException | None = exc
+    while error is not None and id(error) not in seen:
+        if isinstance(error, DeadlineExceeded | Cancelled):
+            return True
+        seen.add(id(error))
+        error = getattr(error, "orig", None) or error.__cause__ or error.__context__
+    return False
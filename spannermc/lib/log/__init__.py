@@ -3,24 +3,30 @@
 from __future__ import annotations
 
 import logging
+import os
+import queue
 import sys
+import threading
 from typing import TYPE_CHECKING
 
 import structlog
 from litestar.logging.config import LoggingConfig
+from litestar.logging.standard import QueueListenerHandler
 
 from spannermc.lib import settings
-from spannermc.lib.log import controller
-from spannermc.lib.log.utils import EventFilter, msgspec_json_renderer
+from spannermc.lib.log import controller, writer
+from spannermc.lib.log.utils import EventFilter
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
+    from logging.handlers import QueueListener
     from typing import Any
 
+    from litestar.types.callable_types import GetLogger
     from structlog import BoundLogger as Logger
     from structlog.types import Processor
 
-__all__ = ("default_processors", "config", "configure", "controller")
+__all__ = ("default_processors", "config", "configure", "controller", "stop_queue_listeners", "writer")
 
 
 default_processors = [
@@ -45,13 +51,13 @@ if sys.stderr.isatty() or "pytest" in sys.modules:  # pragma: no cover
     stdlib_processors.extend([console_processor])
 
 else:
-    LoggerFactory = structlog.BytesLoggerFactory
+    LoggerFactory = writer.BufferedBytesLoggerFactory
     default_processors.extend(
         [
             # controller.add_open_telemetry_spans,
             controller.add_google_cloud_attributes,
             structlog.processors.EventRenamer("message"),
-            msgspec_json_renderer,
+            writer.json_renderer,
         ],
     )
     stdlib_processors.extend(
@@ -79,7 +85,26 @@ def configure(processors: Sequence[Processor]) -> None:
     )
 
 
-config = LoggingConfig(
+class _LoggingConfig(LoggingConfig):
+    """`LoggingConfig` that applies the stdlib configuration the first time it is asked to only.
+
+    Reapplying it would replace the handlers, and start another queue listener thread, each time.
+    """
+
+    def configure(self) -> GetLogger:
+        """Apply the configuration once, and return a `logging.getLogger` like function."""
+        global _get_stdlib_logger  # noqa: PLW0603
+        with _lock:
+            if _get_stdlib_logger is None:
+                _get_stdlib_logger = super().configure()
+        return _get_stdlib_logger
+
+
+_lock = threading.Lock()
+_get_stdlib_logger: GetLogger | None = None
+_configured = False
+
+config = _LoggingConfig(
     root={"level": logging.getLevelName(settings.log.LEVEL), "handlers": ["queue_listener"]},
     formatters={"standard": {"()": structlog.stdlib.ProcessorFormatter, "processors": stdlib_processors}},
     loggers={
@@ -121,12 +146,54 @@ blocking manner.
 def get_logger(**kwargs: Any) -> Logger:
     """Return a configured logger for the given name.
 
+    The stdlib and `structlog` configuration is applied by the first call only.
+
     Args:
         kwargs: arguments to pass to the the bound logger instance
 
     Returns:
         Logger: A configured logger instance
     """
-    config.configure()
-    configure(default_processors)  # type: ignore[arg-type]
+    global _configured  # noqa: PLW0603
+    if not _configured:
+        config.configure()
+        with _lock:
+            if not _configured:
+                configure(default_processors)  # type: ignore[arg-type]
+                _configured = True
     return structlog.getLogger(**kwargs)  # type: ignore
+
+
+def _queue_handlers() -> list[QueueListenerHandler]:
+    loggers = [logging.getLogger(), *(logging.getLogger(name) for name in logging.root.manager.loggerDict)]
+    handlers = {handler for logger in loggers for handler in getattr(logger, "handlers", [])}
+    return [handler for handler in handlers if isinstance(handler, QueueListenerHandler)]
+
+
+def _queue_listeners() -> list[QueueListener]:
+    return [handler.listener for handler in _queue_handlers()]
+
+
+def _restart_queue_listeners() -> None:
+    """Start new queue listener threads in a forked child, where the parent's threads do not exist.
+
+    The queues are replaced too, as the parent's listener threads stay registered as waiters on the old ones.
+    """
+    for handler in _queue_handlers():
+        handler.queue = handler.listener.queue = queue.Queue(-1)
+        handler.listener._thread = None  # type: ignore[attr-defined]
+        handler.listener.start()
+
+
+def stop_queue_listeners() -> None:
+    """Write out the queued stdlib log records and structlog lines, and stop their threads.
+
+    Call before leaving a process with `os._exit`, which skips the `atexit` hook that normally does this.
+    """
+    for listener in _queue_listeners():
+        if listener._thread is not None:  # type: ignore[attr-defined]
+            listener.stop()
+    writer.close_all()
+
+
+os.register_at_fork(after_in_child=_restart_queue_listeners)
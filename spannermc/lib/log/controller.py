@@ -3,11 +3,19 @@
 Ensures that the app, sqlalchemy, saq and uvicorn loggers all log through the queue listener.
 
 Adds a filter for health check route logs.
+
+HTTP requests are logged once their response completes.  Whether a request
+is logged is decided when its response starts, before any of its data is
+extracted: excluded paths and successful health checks are never logged,
+failed requests and those slower than `LOG_SLOW_REQUEST_THRESHOLD` always
+are, and other requests are sampled at `LOG_SUCCESS_SAMPLE_RATE`.
 """
 from __future__ import annotations
 
 import logging
+import random
 import re
+import time
 from inspect import isawaitable
 from typing import TYPE_CHECKING
 
@@ -18,6 +26,7 @@ from litestar.enums import ScopeType
 from litestar.status_codes import (
     HTTP_200_OK,
     HTTP_300_MULTIPLE_CHOICES,
+    HTTP_400_BAD_REQUEST,
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 from litestar.utils.scope import get_litestar_scope_state
@@ -45,6 +54,8 @@ LOGGER = structlog.getLogger()
 HTTP_RESPONSE_START: Literal["http.response.start"] = "http.response.start"
 HTTP_RESPONSE_BODY: Literal["http.response.body"] = "http.response.body"
 REQUEST_BODY_FIELD: Literal["body"] = "body"
+LOG_STARTED: Literal["log_started"] = "log_started"
+"""Key in the connection state of the `time.perf_counter()` value when the request started."""
 
 
 def add_open_telemetry_spans(_: WrappedLogger, __: str, event_dict: EventDict) -> EventDict:
@@ -104,7 +115,7 @@ def drop_health_logs(_: WrappedLogger, __: str, event_dict: EventDict) -> EventD
 
 
 def middleware_factory(app: ASGIApp) -> ASGIApp:
-    """Middleware to ensure that every request has a clean structlog context.
+    """Middleware to ensure that every request has a clean structlog context, and to note when it started.
 
     Args:
         app: The previous ASGI app in the call chain.
@@ -122,6 +133,7 @@ def middleware_factory(app: ASGIApp) -> ASGIApp:
             send: ASGI send handler.
         """
         structlog.contextvars.clear_contextvars()
+        scope["state"][LOG_STARTED] = time.perf_counter()
         await app(scope, receive, send)
 
     return middleware
@@ -134,15 +146,21 @@ class BeforeSendHandler:
         "do_log_request",
         "do_log_response",
         "exclude_paths",
+        "exclude_paths_exact",
         "include_compressed_body",
         "logger",
         "request_extractor",
         "response_extractor",
+        "slow_request_threshold",
+        "success_sample_rate",
     )
 
     def __init__(self) -> None:
         """Configure the handler."""
-        self.exclude_paths = re.compile(settings.log.EXCLUDE_PATHS)
+        self.exclude_paths = re.compile(settings.log.EXCLUDE_PATHS) if settings.log.EXCLUDE_PATHS else None
+        self.exclude_paths_exact = frozenset(settings.log.EXCLUDE_PATHS_EXACT)
+        self.slow_request_threshold = settings.log.SLOW_REQUEST_THRESHOLD
+        self.success_sample_rate = settings.log.SUCCESS_SAMPLE_RATE
         self.do_log_request = bool(settings.log.REQUEST_FIELDS)
         self.do_log_response = bool(settings.log.RESPONSE_FIELDS)
         self.include_compressed_body = settings.log.INCLUDE_COMPRESSED_BODY
@@ -179,16 +197,17 @@ class BeforeSendHandler:
             message: ASGI response event.
             scope: ASGI connection scope.
         """
-        if scope["type"] == ScopeType.HTTP and self.exclude_paths.findall(scope["path"]):
-            return
-
         if message["type"] == HTTP_RESPONSE_START:
+            if scope["type"] != ScopeType.HTTP or not self.should_log(message["status"], scope):
+                return
             scope["state"]["log_level"] = (
                 logging.ERROR if message["status"] >= HTTP_500_INTERNAL_SERVER_ERROR else logging.INFO
             )
             scope["state"][HTTP_RESPONSE_START] = message
         # ignore intermediate content of streaming responses for now.
         elif message["type"] == HTTP_RESPONSE_BODY and message["more_body"] is False:
+            if "log_level" not in scope["state"]:
+                return
             scope["state"][HTTP_RESPONSE_BODY] = message
             try:
                 if self.do_log_request:
@@ -202,6 +221,49 @@ class BeforeSendHandler:
                 structlog.contextvars.clear_contextvars()
                 await LOGGER.aerror("Error in logging before-send handler!", exc_info=exc)
 
+    def excluded(self, path: str) -> bool:
+        """Whether requests to `path` are never logged.
+
+        Args:
+            path: Path of the request.
+
+        Returns:
+            `True` if the path is in `EXCLUDE_PATHS_EXACT` or matches `EXCLUDE_PATHS`.
+        """
+        if path in self.exclude_paths_exact:
+            return True
+        return self.exclude_paths is not None and self.exclude_paths.search(path) is not None
+
+    def should_log(self, status_code: int, scope: Scope) -> bool:
+        """Decide whether to log a request when its response starts.
+
+        Excluded paths and successful health checks are never logged, even when slow.  Binds `sample_rate` to the log when a sampled request is logged.
+
+        Args:
+            status_code: Status code of the response.
+            scope: The ASGI connection scope.
+
+        Returns:
+            Whether the request is logged.
+        """
+        path = scope["path"]
+        if self.excluded(path):
+            return False
+        # `drop_health_logs` would drop a successful health check however slow it was, so don't extract it.
+        if path == constants.SYSTEM_HEALTH_URL and HTTP_200_OK <= status_code < HTTP_300_MULTIPLE_CHOICES:
+            return False
+        if status_code >= HTTP_400_BAD_REQUEST:
+            return True
+        started = scope["state"].get(LOG_STARTED)
+        if started is not None and time.perf_counter() - started >= self.slow_request_threshold:
+            return True
+        if self.success_sample_rate >= 1:
+            return True
+        if random.random() >= self.success_sample_rate:  # noqa: S311
+            return False
+        structlog.contextvars.bind_contextvars(sample_rate=self.success_sample_rate)
+        return True
+
     async def log_request(self, scope: Scope) -> None:
         """Handle extracting the request data and logging the message.
 
@@ -0,0 +1,231 @@
+"""Buffered log writer.
+
+`BufferedBytesLoggerFactory` is the `structlog` logger factory for JSON
+lines.  Its loggers hand each event to a `LogWriter`, which encodes it
+straight into its buffer, and writes the buffer from a thread, every line
+queued since its last write in a single write.  A slow stdout then delays
+the writer thread, not the event loop.
+
+Lines are added while fewer than `LOG_WRITER_BUFFER_SIZE` bytes are held.
+When the buffer is full, a new line is dropped, and counted in
+`log.writer.dropped_lines`, or with `LOG_WRITER_OVERFLOW="block"` the logging
+thread waits for room.  Held lines are written out at exit, by `close_all()`,
+which `stop_queue_listeners` calls before a forked worker leaves.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import sys
+import threading
+import weakref
+from typing import TYPE_CHECKING, Literal
+
+from opentelemetry import metrics
+
+from spannermc.lib import serialization, settings
+
+if TYPE_CHECKING:
+    from typing import Any, BinaryIO
+
+    from structlog.typing import EventDict, WrappedLogger
+
+__all__ = ["BufferedBytesLogger", "BufferedBytesLoggerFactory", "LogWriter", "close_all", "json_renderer"]
+
+meter = metrics.get_meter(__name__)
+dropped_lines_counter = meter.create_counter(
+    "log.writer.dropped_lines",
+    unit="{line}",
+    description="Log lines not written, by reason.",
+)
+
+_writers: weakref.WeakSet[LogWriter] = weakref.WeakSet()
+
+
+class LogWriter:
+    """Writes lines to a binary file from a thread, in batches."""
+
+    def __init__(self, file: BinaryIO, max_bytes: int, overflow: Literal["drop", "block"] = "drop") -> None:
+        """Configure the writer.
+
+        The thread is started by the first write.
+
+        Args:
+            file: File the lines are written to.
+            max_bytes: Bytes of lines held before the overflow policy applies.
+            overflow: Drop the lines that do not fit, or wait for room.
+        """
+        self.file = file
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self._closed = False
+        self._reset()
+        _writers.add(self)
+
+    def _reset(self) -> None:
+        self._buffer = bytearray()
+        self._writing = False
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+
+    def write(self, line: bytes) -> None:
+        """Queue `line` to be written, or write it now if the writer is closed."""
+        with self._lock:
+            if self._has_room():
+                self._buffer += line
+                self._queued()
+                return
+        dropped_lines_counter.add(1, {"reason": "buffer_full"})
+
+    def write_json(self, value: Any) -> None:
+        """Encode `value` as a JSON line straight into the buffer, or write it now if the writer is closed."""
+        with self._lock:
+            if self._has_room():
+                start = len(self._buffer)
+                try:
+                    serialization.to_json_into(value, self._buffer)
+                except BaseException:
+                    del self._buffer[start:]
+                    raise
+                self._buffer += b"\n"
+                self._queued()
+                return
+        dropped_lines_counter.add(1, {"reason": "buffer_full"})
+
+    def _has_room(self) -> bool:
+        """Start the thread, and apply the overflow policy while the buffer is full. Call with the lock held."""
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+        while not self._closed and len(self._buffer) >= self.max_bytes:
+            if self.overflow == "drop":
+                return False
+            self._not_full.wait()
+        return True
+
+    def _queued(self) -> None:
+        if not self._closed:
+            self._not_empty.notify()
+            return
+        buffer, self._buffer = self._buffer, bytearray()
+        self.file.write(buffer)
+        self.file.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._not_empty.wait()
+                if not self._buffer:
+                    return
+                buffer, self._buffer = self._buffer, bytearray()
+                self._writing = True
+                self._not_full.notify_all()
+            try:
+                self.file.write(buffer)
+                self.file.flush()
+            except Exception:  # noqa: BLE001  # pylint: disable=broad-except
+                dropped_lines_counter.add(buffer.count(b"\n"), {"reason": "write_error"})
+            with self._lock:
+                self._writing = False
+                if not self._buffer:
+                    self._idle.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until the lines queued so far are written.
+
+        Returns:
+            `False` if they were not written within `timeout` seconds.
+        """
+        with self._lock:
+            if self._thread is None:
+                return True
+            return self._idle.wait_for(lambda: not self._buffer and not self._writing, timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Write out the queued lines and stop the thread. Later lines are written as they come."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify()
+            self._not_full.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+def json_renderer(_: WrappedLogger, __: str, event_dict: EventDict) -> tuple[tuple[EventDict], dict[str, Any]]:
+    """Structlog processor that leaves the JSON encoding of the event to `BufferedBytesLogger`.
+
+    Use it last, instead of `msgspec_json_renderer`, for the event to be encoded straight into the writer's buffer.
+    """
+    return (event_dict,), {}
+
+
+class BufferedBytesLogger:
+    """`structlog` logger that hands each line to a `LogWriter`."""
+
+    __slots__ = ("writer",)
+
+    def __init__(self, writer: LogWriter) -> None:
+        self.writer = writer
+
+    def msg(self, message: bytes | EventDict) -> None:
+        """Queue `message` as a line, encoding it as JSON unless it is already rendered."""
+        if isinstance(message, bytes):
+            self.writer.write(message + b"\n")
+        else:
+            self.writer.write_json(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class BufferedBytesLoggerFactory:
+    """`structlog` logger factory whose loggers share one `LogWriter`."""
+
+    def __init__(self, file: BinaryIO | None = None) -> None:
+        """Configure the factory.
+
+        Args:
+            file: File the lines are written to. Defaults to `sys.stdout`.
+        """
+        writer = LogWriter(file or sys.stdout.buffer, settings.log.WRITER_BUFFER_SIZE, settings.log.WRITER_OVERFLOW)
+        self._logger = BufferedBytesLogger(writer)
+
+    def __call__(self, *args: Any) -> BufferedBytesLogger:
+        return self._logger
+
+
+def close_all(timeout: float | None = 5.0) -> None:
+    """Write out the lines queued by every writer and stop their threads."""
+    for writer in list(_writers):
+        writer.close(timeout)
+
+
+_forking: list[LogWriter] = []
+
+
+def _before_fork() -> None:
+    _forking.extend(_writers)
+    for writer in _forking:
+        writer._lock.acquire()
+
+
+def _after_fork_in_parent() -> None:
+    for writer in _forking:
+        writer._lock.release()
+    _forking.clear()
+
+
+def _after_fork_in_child() -> None:
+    # the parent's thread does not exist here, and the parent writes the lines it queued
+    for writer in _forking:
+        writer._reset()
+    _forking.clear()
+
+
+os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent, after_in_child=_after_fork_in_child)
+atexit.register(close_all)
@@ -0,0 +1,124 @@
+"""Event loop lag monitor.
+
+Handlers run their synchronous code on the event loop, so one blocking call
+delays every request on the worker.  A task on the loop sleeps for
+`LOOP_LAG_INTERVAL` seconds at a time and records how late it wakes up in the
+`asyncio.event_loop.lag` histogram.
+
+A watchdog thread checks the task's heartbeat.  When the loop has not run it
+for `LOOP_LAG_THRESHOLD` seconds, the watchdog logs the loop thread's stack,
+and the route being handled, while the blocking call is still running.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+
+from spannermc.lib import log, settings
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+__all__ = ["LoopMonitor", "STACK_LIMIT", "on_shutdown", "on_startup"]
+
+logger = log.get_logger()
+
+STACK_LIMIT = 40
+"""Innermost frames of the loop thread's stack logged for a stall."""
+
+meter = metrics.get_meter(__name__)
+lag_histogram = meter.create_histogram(
+    "asyncio.event_loop.lag",
+    unit="s",
+    description="Delay between when the event loop should have resumed a sleeping task and when it did.",
+)
+
+
+def _route(frame: FrameType | None) -> str | None:
+    """Name of the route whose ASGI `scope` is a local of `frame` or one of its callers."""
+    while frame is not None:
+        if "scope" in frame.f_code.co_varnames:
+            scope = frame.f_locals.get("scope")
+            route_handler = scope.get("route_handler") if isinstance(scope, dict) else None
+            if route_handler is not None:
+                name: str = route_handler.name or route_handler.handler_name
+                return name
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    """Lag sampler for the running event loop, and the watchdog that logs where it is blocked."""
+
+    __slots__ = ("interval", "threshold", "heartbeat", "_thread_id", "_task", "_watchdog", "_stopped")
+
+    def __init__(self, interval: float, threshold: float) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.heartbeat = time.monotonic()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling. Must be called on the loop thread."""
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling and wait for the watchdog to exit."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+        await asyncio.to_thread(self._watchdog.join)
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self.heartbeat = time.monotonic()
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag_histogram.record(max(loop.time() - started - self.interval, 0.0))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.interval):
+            heartbeat = self.heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._thread_id)
+            logger.warning(
+                "Event loop blocked",
+                lag=round(stalled, 3),
+                route=_route(frame),
+                stack="".join(traceback.format_stack(frame, STACK_LIMIT)) if frame is not None else None,
+            )
+
+
+_monitor: LoopMonitor | None = None
+
+
+async def on_startup() -> None:
+    """Start monitoring the event loop, unless `LOOP_LAG_INTERVAL` is `0`."""
+    global _monitor  # noqa: PLW0603
+    if settings.app.LOOP_LAG_INTERVAL <= 0:
+        return
+    _monitor = LoopMonitor(settings.app.LOOP_LAG_INTERVAL, settings.app.LOOP_LAG_THRESHOLD)
+    _monitor.start()
+
+
+async def on_shutdown() -> None:
+    """Stop monitoring the event loop."""
+    global _monitor  # noqa: PLW0603
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
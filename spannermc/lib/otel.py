@@ -1,64 +1,246 @@
+"""OpenTelemetry configuration.
+
+The middleware is built against the global tracer and meter providers, which
+are proxies until real providers are installed.  `on_startup` installs them
+in a worker thread so that resource detection and exporter set-up never delay
+serving.  Spans and metrics recorded before then are dropped.
+
+`TELEMETRY_EXPORTER` selects where telemetry goes: `none`, `memory`,
+`console`, `file`, `gcp` (Cloud Trace and Cloud Monitoring) or `prometheus`
+(metrics at `/metrics` only).  With `TELEMETRY_PROMETHEUS` set, the metrics
+of the other exporters are served at `/metrics` too.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
 from litestar.contrib.opentelemetry import OpenTelemetryConfig
 from opentelemetry import metrics, trace
-from opentelemetry.exporter.cloud_monitoring import (
-    CloudMonitoringMetricsExporter,
+from opentelemetry.sdk.metrics import Histogram, MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    ConsoleMetricExporter,
+    InMemoryMetricReader,
+    MetricReader,
+    PeriodicExportingMetricReader,
 )
-from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
-from opentelemetry.instrumentation.grpc import GrpcInstrumentorClient
-from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-from opentelemetry.propagate import set_global_textmap
-from opentelemetry.propagators.cloud_trace_propagator import CloudTraceFormatPropagator
-from opentelemetry.resourcedetector.gcp_resource_detector import GoogleCloudResourceDetector
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
 from opentelemetry.sdk.resources import Resource, get_aggregated_resources
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ALWAYS_ON, ParentBasedTraceIdRatio, Sampler
 
-from . import db, settings
+from . import db, log, settings
+from .prometheus import PrometheusMetricReader
+from .tail_sampling import TailSamplingSpanProcessor
 
-__all__ = ["configure_instrumentation"]
+if TYPE_CHECKING:
+    from opentelemetry.sdk.metrics.export import MetricExporter
 
+__all__ = [
+    "SECONDS_BUCKETS",
+    "Telemetry",
+    "build_telemetry",
+    "config",
+    "configure_instrumentation",
+    "on_shutdown",
+    "on_startup",
+]
 
-def configure_instrumentation() -> OpenTelemetryConfig:
-    """Initialize Open Telemetry configuration."""
-    _resources = get_aggregated_resources(
-        [
-            GoogleCloudResourceDetector(),  # type: ignore[no-untyped-call]
-        ],
-        initial_resource=Resource.create(
-            {
-                "service.name": settings.app.NAME,
-                "service.namespace": settings.app.slug,
-                "service.version": settings.app.BUILD_NUMBER,
-            }
-        ),
-        timeout=60,
+logger = log.get_logger()
+
+config = OpenTelemetryConfig()
+"""Middleware configuration. It uses the global providers, installed by `on_startup`."""
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Bucket boundaries of the histograms recorded in seconds; the SDK's default boundaries suit milliseconds."""
+
+
+@dataclass
+class Telemetry:
+    """Providers built for the configured exporter."""
+
+    tracer_provider: TracerProvider
+    meter_provider: MeterProvider
+    span_exporter: SpanExporter | None
+    metric_reader: MetricReader
+    prometheus_reader: PrometheusMetricReader | None = None
+    """Reader serving `/metrics`, if enabled."""
+    streams: list[IO[str]] = field(default_factory=list)
+    """Files opened by the `file` exporter, closed on shutdown."""
+
+    def shutdown(self) -> None:
+        """Flush and stop the providers."""
+        self.tracer_provider.shutdown()
+        self.meter_provider.shutdown()
+        for stream in self.streams:
+            stream.close()
+
+
+telemetry: Telemetry | None = None
+"""Providers installed by `configure_instrumentation`, if any."""
+_configure_task: asyncio.Task[None] | None = None
+
+
+def _resource(exporter: str) -> Resource:
+    resource = Resource.create(
+        {
+            "service.name": settings.app.NAME,
+            "service.namespace": settings.app.slug,
+            "service.version": settings.app.BUILD_NUMBER,
+        }
     )
-    meter_provider = MeterProvider(
-        metric_readers=[
-            PeriodicExportingMetricReader(
-                CloudMonitoringMetricsExporter(add_unique_identifier=True),
+    if exporter != "gcp":
+        return resource
+    from opentelemetry.resourcedetector.gcp_resource_detector import GoogleCloudResourceDetector
+
+    return get_aggregated_resources(
+        [GoogleCloudResourceDetector()],
+        initial_resource=resource,
+        timeout=settings.telemetry.RESOURCE_DETECTION_TIMEOUT,
+    )
+
+
+def _exporters(exporter: str) -> tuple[SpanExporter | None, MetricReader, list[IO[str]]]:
+    interval = settings.telemetry.METRIC_EXPORT_INTERVAL
+    metric_exporter: MetricExporter
+    if exporter == "memory":
+        return InMemorySpanExporter(), InMemoryMetricReader(), []
+    if exporter == "prometheus":
+        return None, PrometheusMetricReader(), []
+    if exporter == "console":
+        span_exporter: SpanExporter = ConsoleSpanExporter()
+        metric_exporter = ConsoleMetricExporter()
+        return span_exporter, PeriodicExportingMetricReader(metric_exporter, interval), []
+    if exporter == "file":
+        stream = Path(settings.telemetry.FILE_PATH).open("a", encoding="utf-8")
+        span_exporter = ConsoleSpanExporter(out=stream, formatter=lambda span: span.to_json(indent=None) + "\n")
+        metric_exporter = ConsoleMetricExporter(out=stream, formatter=lambda data: data.to_json(indent=None) + "\n")
+        return span_exporter, PeriodicExportingMetricReader(metric_exporter, interval), [stream]
+    if exporter == "gcp":
+        from opentelemetry.exporter.cloud_monitoring import CloudMonitoringMetricsExporter
+        from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+
+        metric_exporter = CloudMonitoringMetricsExporter(add_unique_identifier=True)
+        span_exporter = CloudTraceSpanExporter()  # type: ignore[no-untyped-call]
+        return span_exporter, PeriodicExportingMetricReader(metric_exporter, interval), []
+    raise ValueError(f"unknown telemetry exporter {exporter!r}")
+
+
+def build_telemetry(exporter: str) -> Telemetry:
+    """Build tracer and meter providers that export to `exporter`.
+
+    Args:
+        exporter: One of `memory`, `console`, `file`, `gcp` or `prometheus`.
+
+    Returns:
+        The providers, not yet installed globally.
+    """
+    resource = _resource(exporter)
+    span_exporter, metric_reader, streams = _exporters(exporter)
+    tail_sampling = settings.telemetry.TAIL_SAMPLING and span_exporter is not None
+    sampler: Sampler = ALWAYS_ON if tail_sampling else ParentBasedTraceIdRatio(settings.telemetry.SAMPLE_RATIO)
+    tracer_provider = TracerProvider(resource=resource, sampler=sampler)
+    if span_exporter is not None:
+        processor: SpanProcessor
+        if exporter == "memory":
+            processor = SimpleSpanProcessor(span_exporter)
+        else:
+            processor = BatchSpanProcessor(span_exporter, max_queue_size=10000)
+        if tail_sampling:
+            processor = TailSamplingSpanProcessor(
+                processor,
+                latency_threshold=settings.telemetry.TAIL_SAMPLING_LATENCY_THRESHOLD,
+                ratio=settings.telemetry.SAMPLE_RATIO,
+                max_traces=settings.telemetry.TAIL_SAMPLING_MAX_TRACES,
+                max_spans=settings.telemetry.TAIL_SAMPLING_MAX_SPANS,
             )
+        tracer_provider.add_span_processor(processor)
+    metric_readers = [metric_reader]
+    prometheus_reader = metric_reader if isinstance(metric_reader, PrometheusMetricReader) else None
+    if prometheus_reader is None and settings.telemetry.PROMETHEUS:
+        prometheus_reader = PrometheusMetricReader()
+        metric_readers.append(prometheus_reader)
+    meter_provider = MeterProvider(
+        metric_readers=metric_readers,
+        resource=resource,
+        views=[
+            View(
+                instrument_type=Histogram,
+                instrument_unit="s",
+                aggregation=ExplicitBucketHistogramAggregation(SECONDS_BUCKETS),
+            ),
         ],
-        resource=_resources,
     )
-
-    metrics.set_meter_provider(meter_provider)
-    # Create and export one trace every 25 requests
-    _sampler = ParentBasedTraceIdRatio(1 / 25)
-    tracer_provider = TracerProvider(resource=_resources, sampler=_sampler)
-    trace.set_tracer_provider(tracer_provider)
-    trace.get_tracer_provider().add_span_processor(  # type: ignore[attr-defined]
-        BatchSpanProcessor(CloudTraceSpanExporter(), max_queue_size=10000)  # type: ignore
+    return Telemetry(
+        tracer_provider=tracer_provider,
+        meter_provider=meter_provider,
+        span_exporter=span_exporter,
+        metric_reader=metric_reader,
+        prometheus_reader=prometheus_reader,
+        streams=streams,
     )
-    set_global_textmap(CloudTraceFormatPropagator())
+
+
+def configure_instrumentation() -> Telemetry:
+    """Build the providers for `TELEMETRY_EXPORTER` and install them globally.
+
+    Returns:
+        The installed providers.
+    """
+    global telemetry  # noqa: PLW0603
+    telemetry = build_telemetry(settings.telemetry.EXPORTER)
+    trace.set_tracer_provider(telemetry.tracer_provider)
+    metrics.set_meter_provider(telemetry.meter_provider)
+    return telemetry
+
+
+def _instrument_libraries() -> None:
+    from opentelemetry.instrumentation.grpc import GrpcInstrumentorClient
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    if settings.telemetry.EXPORTER == "gcp":
+        from opentelemetry.propagate import set_global_textmap
+        from opentelemetry.propagators.cloud_trace_propagator import CloudTraceFormatPropagator
+
+        set_global_textmap(CloudTraceFormatPropagator())
     GrpcInstrumentorClient().instrument()  # type: ignore[no-untyped-call]
-    SQLAlchemyInstrumentor().instrument(engine=db.engine)
-    return OpenTelemetryConfig(
-        meter=metrics.get_meter(__name__), tracer_provider=tracer_provider, meter_provider=meter_provider
-    )
+    SQLAlchemyInstrumentor().instrument(engine=db.get_engine())
+    db.instruments.register(metrics.get_meter(__name__), db.get_engine(), db.get_spanner_pool())
+
+
+async def _configure_in_background() -> None:
+    try:
+        await asyncio.to_thread(configure_instrumentation)
+    except Exception as exc:  # noqa: BLE001
+        await logger.awarning("Telemetry could not be configured, spans and metrics are dropped", exc_info=exc)
+    else:
+        await logger.ainfo("Telemetry configured", exporter=settings.telemetry.EXPORTER)
+
+
+async def on_startup() -> None:
+    """Instrument gRPC and SQLAlchemy, and configure the exporters in the background.
+
+    The instrumentation records through the global proxy providers, so it is
+    in place before the first request even though the exporters are not.
+    """
+    global _configure_task  # noqa: PLW0603
+    if settings.telemetry.EXPORTER == "none":
+        return
+    _instrument_libraries()
+    _configure_task = asyncio.create_task(_configure_in_background())
 
 
-config = configure_instrumentation()
+async def on_shutdown() -> None:
+    """Wait for the background configuration, then flush and stop the providers."""
+    global _configure_task  # noqa: PLW0603
+    if _configure_task is not None:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_configure_task, timeout=settings.telemetry.RESOURCE_DETECTION_TIMEOUT)
+        _configure_task = None
+    if telemetry is not None:
+        await asyncio.to_thread(telemetry.shutdown)
@@ -0,0 +1,152 @@
+"""On-demand request profiler.
+
+A superuser sends the `APP_PROFILE_HEADER` request header to run that
+request under `cProfile`.  The response carries an `X-Profile-Id` header,
+and the profile is kept by the worker that served the request, among its
+last `APP_PROFILE_STORE_SIZE`, for `GET /api/system/profiles/{profile_id}`.
+
+`cProfile` profiles the thread it is enabled on, the event loop's, so a
+profile also holds the work of other requests the loop ran meanwhile, and
+not the work of handlers run in a worker thread.  Only one request per
+worker is profiled at a time; others with the header run unprofiled.
+"""
+from __future__ import annotations
+
+import cProfile
+import marshal
+import pstats
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, cast
+
+from litestar.datastructures import MutableScopeHeaders
+from litestar.enums import ScopeType
+
+from spannermc.lib import settings
+
+if TYPE_CHECKING:
+    from litestar.types import ASGIApp, HTTPScope, Message, Receive, Scope, Send
+
+__all__ = ["PROFILE_ID_HEADER", "RequestProfile", "middleware_factory", "profiles"]
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+"""Response header with the id of the request's profile."""
+
+
+@dataclass
+class RequestProfile:
+    """Profile of one request."""
+
+    id: str
+    route: str
+    method: str
+    path: str
+    duration: float
+    stats: dict[tuple[str, int, str], tuple[Any, ...]] = field(repr=False)
+    """`pstats` statistics: `(calls, primitive calls, total time, cumulative time, callers)` by function."""
+    created: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def functions(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Profiled functions, most cumulative time first."""
+        rows = sorted(self.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": _function_name(*function),
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "total_time": round(total_time, 6),
+                "cumulative_time": round(cumulative_time, 6),
+            }
+            for function, (primitive_calls, calls, total_time, cumulative_time, _) in rows[:limit]
+        ]
+
+    def dump(self) -> bytes:
+        """The profile in the format of `pstats.Stats.dump_stats`, loadable by `pstats`, snakeviz and others."""
+        return marshal.dumps(self.stats)
+
+
+def _function_name(filename: str, line: int, name: str) -> str:
+    """`filename:line(name)`, or only `name` for a built-in function, as `pstats` prints them."""
+    if (filename, line) == ("~", 0):
+        return name
+    return f"{filename}:{line}({name})"
+
+
+profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+"""Latest profiles of this process, by id, oldest first."""
+
+_profiling = False
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if _profiling or not settings.app.PROFILE_ENABLED:
+        return False
+    header = settings.app.PROFILE_HEADER.lower().encode()
+    if not any(name == header and value not in (b"", b"0") for name, value in scope["headers"]):
+        return False
+    return getattr(scope.get("user"), "is_superuser", False)
+
+
+def _store(profile: RequestProfile) -> None:
+    profiles[profile.id] = profile
+    while len(profiles) > settings.app.PROFILE_STORE_SIZE:
+        profiles.popitem(last=False)
+
+
+def middleware_factory(app: ASGIApp) -> ASGIApp:
+    """Middleware that profiles the requests of superusers who ask for it.
+
+    Must run inside the authentication middleware, which sets the user of the request.
+
+    Args:
+        app: The previous ASGI app in the call chain.
+
+    Returns:
+        A new ASGI app that runs `app` under `cProfile` when asked to.
+    """
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        """Profile the request, if asked to.
+
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive handler.
+            send: ASGI send handler.
+        """
+        global _profiling  # noqa: PLW0603
+        if scope["type"] != ScopeType.HTTP or not _wants_profile(scope):
+            await app(scope, receive, send)
+            return
+        http_scope = cast("HTTPScope", scope)
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableScopeHeaders.from_message(message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        _profiling = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            _profiling = False
+            route_handler = http_scope["route_handler"]
+            _store(
+                RequestProfile(
+                    id=profile_id,
+                    route=route_handler.name or route_handler.handler_name,
+                    method=http_scope["method"],
+                    path=http_scope["path"],
+                    duration=round(time.perf_counter() - started, 6),
+                    stats=pstats.Stats(profiler).stats,  # type: ignore[attr-defined]
+                )
+            )
+
+    return middleware
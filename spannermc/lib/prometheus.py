@@ -0,0 +1,117 @@
+"""Prometheus exposition of the application's metrics.
+
+`PrometheusMetricReader` is a pull reader on the same `MeterProvider` as the
+configured exporter, so every instrument the application records is also
+served, in the Prometheus text format, by `GET /metrics`.
+
+Metric names are the instrument names with `.` replaced by `_`, followed by
+the unit (`_seconds`, `_milliseconds`, `_bytes`, `_ratio`) and, for
+counters, `_total`.  Each worker keeps its own metrics and a scrape reaches
+whichever worker accepts the connection, so where exact totals matter run
+one worker per container (`SERVER_HTTP_WORKERS=1`).
+"""
+from __future__ import annotations
+
+import math
+import re
+from typing import TYPE_CHECKING, Any
+
+from opentelemetry.sdk.metrics.export import Gauge, Histogram, InMemoryMetricReader, Sum
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from opentelemetry.sdk.metrics.export import Metric, MetricsData
+
+__all__ = ["CONTENT_TYPE", "PrometheusMetricReader", "encode"]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Media type of the Prometheus text exposition format."""
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_:]")
+_INVALID_LABEL = re.compile(r"[^a-zA-Z0-9_]")
+_UNITS = {"s": "seconds", "ms": "milliseconds", "By": "bytes", "1": "ratio"}
+
+
+def _name(metric: Metric, suffix: str = "") -> str:
+    name = _INVALID_NAME.sub("_", metric.name)
+    unit = _UNITS.get(metric.unit or "")
+    if unit and not name.endswith(f"_{unit}"):
+        name = f"{name}_{unit}"
+    return name + suffix
+
+
+def _value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(attributes: Mapping[str, Any] | None, **extra: str) -> str:
+    labels = {_INVALID_LABEL.sub("_", key): str(value) for key, value in (attributes or {}).items()}
+    labels.update(extra)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _samples(metric: Metric) -> tuple[str, str, list[str]]:
+    """Name, type and sample lines of one metric. Data of other types, such as exponential histograms, has none."""
+    data: object = metric.data
+    if isinstance(data, Sum):
+        name = _name(metric, "_total" if data.is_monotonic else "")
+        kind = "counter" if data.is_monotonic else "gauge"
+        return name, kind, [f"{name}{_labels(point.attributes)} {_value(point.value)}" for point in data.data_points]
+    if isinstance(data, Gauge):
+        name = _name(metric)
+        return name, "gauge", [f"{name}{_labels(point.attributes)} {_value(point.value)}" for point in data.data_points]
+    if isinstance(data, Histogram):
+        name = _name(metric)
+        lines = []
+        for point in data.data_points:
+            cumulative = 0
+            for bound, count in zip([*point.explicit_bounds, math.inf], point.bucket_counts, strict=True):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(point.attributes, le=_value(float(bound)))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(point.attributes)} {_value(point.sum)}")
+            lines.append(f"{name}_count{_labels(point.attributes)} {point.count}")
+        return name, "histogram", lines
+    return _name(metric), "untyped", []
+
+
+def encode(metrics_data: MetricsData | None) -> str:
+    """Render metrics in the Prometheus text exposition format."""
+    families: dict[str, tuple[str, str, list[str]]] = {}
+    metrics: Iterable[Metric] = (
+        metric
+        for resource_metrics in (metrics_data.resource_metrics if metrics_data else [])
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    )
+    for metric in metrics:
+        name, kind, lines = _samples(metric)
+        if not lines:
+            continue
+        family = families.setdefault(name, (kind, (metric.description or "").replace("\n", " "), []))
+        family[2].extend(lines)
+    output = []
+    for name, (kind, description, lines) in families.items():
+        if description:
+            output.append(f"# HELP {name} {description}")
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(lines)
+    return "\n".join(output) + "\n"
+
+
+class PrometheusMetricReader(InMemoryMetricReader):
+    """Pull metric reader that renders the cumulative state of every instrument on demand."""
+
+    def render(self) -> str:
+        """Collect the metrics and render them in the Prometheus text exposition format."""
+        return encode(self.get_metrics_data())
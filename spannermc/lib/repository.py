@@ -1,15 +1,343 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, ClassVar, Generic
 
+from litestar.contrib.repository.exceptions import RepositoryError
+from litestar.contrib.repository.filters import BeforeAfter, CollectionFilter, LimitOffset, OrderBy, SearchFilter
 from litestar.contrib.repository.handlers import on_app_init as _on_app_init
-from litestar.contrib.sqlalchemy.repository import SQLAlchemySyncRepository
+from litestar.contrib.sqlalchemy.repository import ModelT
+from litestar.contrib.sqlalchemy.repository import SQLAlchemySyncRepository as _SQLAlchemySyncRepository
+from litestar.contrib.sqlalchemy.repository._util import wrap_sqlalchemy_exception
+from opentelemetry import metrics
+from sqlalchemy import String, bindparam, over, select
+from sqlalchemy import func as sql_func
 
-__all__ = ["on_app_init", "SQLAlchemySyncRepository"]
+from spannermc.lib import settings
+
+__all__ = ["on_app_init", "SQLAlchemySyncRepository", "StatementCache"]
 
 
 if TYPE_CHECKING:
+    from collections.abc import Hashable
+
     from litestar.config.app import AppConfig
+    from litestar.contrib.repository.filters import FilterTypes
+    from sqlalchemy import Select
+
+Shape = tuple[tuple[Any, ...], ...]
+
+meter = metrics.get_meter(__name__)
+lookups_counter = meter.create_counter(
+    "db.statement_cache.lookups",
+    unit="{lookup}",
+    description="Repository statement cache lookups, by result.",
+)
+
+
+class StatementCache:
+    """Bounded map of statement shape to the select built for it."""
+
+    __slots__ = ("max_size", "_entries", "_lock")
+
+    def __init__(self, max_size: int) -> None:
+        """Configure the cache.
+
+        Args:
+            max_size: Maximum number of statements kept.  `0` disables caching.
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[Select, Select]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, base: Select) -> Select | None:
+        """Return the statement cached for `key`, provided it was built from `base`."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not base:
+            lookups_counter.add(1, {"result": "miss"})
+            return None
+        lookups_counter.add(1, {"result": "hit"})
+        return entry[1]
+
+    def set(self, key: Hashable, base: Select, statement: Select) -> None:
+        """Cache `statement`, built from `base`, under `key`."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (base, statement)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove every cached statement."""
+        self._entries.clear()
+
+
+class SQLAlchemySyncRepository(_SQLAlchemySyncRepository[ModelT], Generic[ModelT]):
+    """SQLAlchemy repository that reuses the statements it builds.
+
+    Reads are keyed by their *shape*: the operation, the base statement, which
+    filters are present with their field names and sort order, and the names
+    of the attribute filters.  Every value is a bound parameter, so each shape
+    is built once per repository class.  SQLAlchemy then finds the compiled
+    form in its cache without rebuilding the statement, and Spanner sees the
+    same parameterized SQL.
+
+    The cache only recognizes the base statement by identity, so providers
+    should build it once at import time rather than per request.
+    """
+
+    statement_cache: ClassVar[StatementCache] = StatementCache(settings.db.STATEMENT_CACHE_SIZE)
+    _default_statement: ClassVar[Select | None] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.statement_cache = StatementCache(settings.db.STATEMENT_CACHE_SIZE)
+        cls._default_statement = None
+
+    def __init__(self, *, statement: Select | None = None, **kwargs: Any) -> None:
+        """Repository pattern for SQLAlchemy models.
+
+        Args:
+            statement: To facilitate customization of the underlying select query.  Defaults to a select of
+                the model shared by every instance of the repository.
+            **kwargs: Passed to the base repository.
+        """
+        if statement is None:
+            if type(self)._default_statement is None:
+                type(self)._default_statement = select(self.model_type)
+            statement = type(self)._default_statement
+        super().__init__(statement=statement, **kwargs)
+
+    def get(self, item_id: Any, **kwargs: Any) -> ModelT:
+        """Get instance identified by `item_id`.
+
+        Args:
+            item_id: Identifier of the instance to be retrieved.
+            **kwargs: `auto_expunge`, `statement` or `id_attribute` overrides.
+
+        Returns:
+            The retrieved instance.
+
+        Raises:
+            NotFoundError: If no instance found identified by `item_id`.
+        """
+        if kwargs.get("statement") is not None:
+            return super().get(item_id, **kwargs)
+        auto_expunge = _pop_auto_expunge(kwargs, self.auto_expunge)
+        id_attribute = kwargs.pop("id_attribute", None) or self.id_attribute
+        with wrap_sqlalchemy_exception():
+            instance: ModelT | None = self._execute_cached("one", **{id_attribute: item_id}).scalar_one_or_none()
+            instance = self.check_not_found(instance)
+            self._expunge(instance, auto_expunge=auto_expunge)
+            return instance
+
+    def get_one(self, **kwargs: Any) -> ModelT:
+        """Get instance identified by `kwargs`.
+
+        Args:
+            **kwargs: Instance attribute value filters.
+
+        Returns:
+            The retrieved instance.
+
+        Raises:
+            NotFoundError: If no instance found identified by `kwargs`.
+        """
+        if kwargs.get("statement") is not None:
+            return super().get_one(**kwargs)
+        auto_expunge = _pop_auto_expunge(kwargs, self.auto_expunge)
+        with wrap_sqlalchemy_exception():
+            instance: ModelT | None = self._execute_cached("one", **kwargs).scalar_one_or_none()
+            instance = self.check_not_found(instance)
+            self._expunge(instance, auto_expunge=auto_expunge)
+            return instance
+
+    def get_one_or_none(self, **kwargs: Any) -> ModelT | None:
+        """Get instance identified by `kwargs` or None if not found.
+
+        Args:
+            **kwargs: Instance attribute value filters.
+
+        Returns:
+            The retrieved instance or None
+        """
+        if kwargs.get("statement") is not None:
+            return super().get_one_or_none(**kwargs)
+        auto_expunge = _pop_auto_expunge(kwargs, self.auto_expunge)
+        with wrap_sqlalchemy_exception():
+            instance: ModelT | None = self._execute_cached("one", **kwargs).scalar_one_or_none()
+            if instance:
+                self._expunge(instance, auto_expunge=auto_expunge)
+            return instance
+
+    def count(self, *filters: FilterTypes, **kwargs: Any) -> int:
+        """Get the count of records returned by a query.
+
+        Args:
+            *filters: Types for specific filtering operations.
+            **kwargs: Instance attribute value filters.
+
+        Returns:
+            Count of records returned by query, ignoring pagination.
+        """
+        if kwargs.get("statement") is not None:
+            return super().count(*filters, **kwargs)
+        with wrap_sqlalchemy_exception():
+            return self._execute_cached("count", *filters, **kwargs).scalar_one()  # type: ignore[no-any-return]
+
+    def list_and_count(self, *filters: FilterTypes, **kwargs: Any) -> tuple[list[ModelT], int]:
+        """List records with total count.
+
+        Spanner has no analytic window functions, so the page and the total are
+        two statements there.
+
+        Args:
+            *filters: Types for specific filtering operations.
+            **kwargs: Instance attribute value filters.
+
+        Returns:
+            The page of instances and the count of records ignoring pagination.
+        """
+        if kwargs.get("statement") is not None:
+            return super().list_and_count(*filters, **kwargs)
+        force_basic_query_mode = kwargs.pop("force_basic_query_mode", None)
+        auto_expunge = _pop_auto_expunge(kwargs, self.auto_expunge)
+        with wrap_sqlalchemy_exception():
+            if force_basic_query_mode or self._dialect.name in {"spanner", "spanner+spanner"}:
+                count = self._execute_cached("count", *filters, **kwargs).scalar_one()
+                rows = [(instance, count) for instance in self._execute_cached("list", *filters, **kwargs).scalars()]
+            else:
+                rows = [(instance, count) for instance, count in self._execute_cached("window", *filters, **kwargs)]
+                count = rows[0][1] if rows else 0
+            instances = [instance for instance, _ in rows]
+            for instance in instances:
+                self._expunge(instance, auto_expunge=auto_expunge)
+            return instances, count
+
+    def list(self, *filters: FilterTypes, **kwargs: Any) -> list[ModelT]:
+        """Get a list of instances, optionally filtered.
+
+        Args:
+            *filters: Types for specific filtering operations.
+            **kwargs: Instance attribute value filters.
+
+        Returns:
+            The list of instances, after filtering applied.
+        """
+        if kwargs.get("statement") is not None:
+            return super().list(*filters, **kwargs)
+        auto_expunge = _pop_auto_expunge(kwargs, self.auto_expunge)
+        with wrap_sqlalchemy_exception():
+            instances = list(self._execute_cached("list", *filters, **kwargs).scalars())
+            for instance in instances:
+                self._expunge(instance, auto_expunge=auto_expunge)
+            return instances
+
+    def _execute_cached(self, operation: str, *filters: FilterTypes, **kwargs: Any) -> Any:
+        """Execute the cached statement for this operation and filter shape."""
+        shape, params = _shape_of(operation, filters, kwargs)
+        key = (operation, id(self.statement), shape)
+        statement = self.statement_cache.get(key, self.statement)
+        if statement is None:
+            statement = self._build_statement(operation, shape)
+            self.statement_cache.set(key, self.statement, statement)
+        return self.session.execute(statement, params)
+
+    def _build_statement(self, operation: str, shape: Shape) -> Select:
+        """Build the parameterized statement for a filter shape."""
+        statement: Select = self.statement
+        if operation == "count":
+            statement = statement.with_only_columns(
+                sql_func.count(self.get_id_attribute_value(self.model_type)),
+                maintain_column_froms=True,
+            ).order_by(None)
+        elif operation == "window":
+            statement = statement.add_columns(over(sql_func.count(self.get_id_attribute_value(self.model_type))))
+        for index, filter_shape in enumerate(shape):
+            statement = self._apply_filter_shape(statement, f"p{index}", filter_shape)
+        return statement
+
+    def _apply_filter_shape(self, statement: Select, name: str, filter_shape: tuple[Any, ...]) -> Select:
+        """Add the clause of one filter shape, bound to the parameters prefixed `name`."""
+        kind, *args = filter_shape
+        if kind == "limit_offset":
+            return statement.limit(bindparam(f"{name}_limit")).offset(bindparam(f"{name}_offset"))
+        field = getattr(self.model_type, args[0])
+        if kind == "before_after":
+            _, has_before, has_after = args
+            if has_before:
+                statement = statement.where(field < bindparam(f"{name}_before"))
+            if has_after:
+                statement = statement.where(field > bindparam(f"{name}_after"))
+            return statement
+        if kind == "in":
+            return statement.where(field.in_(bindparam(f"{name}_values", expanding=True)))
+        if kind == "order_by":
+            return statement.order_by(field.desc() if args[1] == "desc" else field.asc())
+        if kind == "search":
+            pattern = bindparam(f"{name}_value", type_=String)
+            return statement.where(field.ilike(pattern) if args[1] else field.like(pattern))
+        if kind == "is_null":
+            return statement.where(field.is_(None))
+        return statement.where(field == bindparam(f"{name}_value"))
+
+
+def _pop_auto_expunge(kwargs: dict[str, Any], default: bool) -> bool:
+    auto_expunge: bool | None = kwargs.pop("auto_expunge", None)
+    return default if auto_expunge is None else auto_expunge
+
+
+def _shape_of(operation: str, filters: tuple[FilterTypes, ...], kwargs: dict[str, Any]) -> tuple[Shape, dict[str, Any]]:
+    """Split filters and attribute values into a hashable shape and its bound parameter values.
+
+    An attribute filtered on `None` is compared with `IS NULL`, which has no parameter.
+    """
+    shape: list[tuple[Any, ...]] = []
+    params: dict[str, Any] = {}
+    paginates = operation != "count"
+    for filter_ in filters:
+        if (filter_shape := _filter_shape(filter_, f"p{len(shape)}", params, paginates)) is not None:
+            shape.append(filter_shape)
+    for field_name, value in kwargs.items():
+        if value is None:
+            shape.append(("is_null", field_name))
+            continue
+        params[f"p{len(shape)}_value"] = value
+        shape.append(("eq", field_name))
+    return tuple(shape), params
+
+
+def _filter_shape(filter_: FilterTypes, name: str, params: dict[str, Any], paginates: bool) -> tuple[Any, ...] | None:
+    """Return the shape of one filter, adding its values to `params`, or `None` if it does not apply."""
+    if isinstance(filter_, LimitOffset):
+        if not paginates:
+            return None
+        params[f"{name}_limit"] = filter_.limit
+        params[f"{name}_offset"] = filter_.offset
+        return ("limit_offset",)
+    if isinstance(filter_, BeforeAfter):
+        if filter_.before is not None:
+            params[f"{name}_before"] = filter_.before
+        if filter_.after is not None:
+            params[f"{name}_after"] = filter_.after
+        return ("before_after", filter_.field_name, filter_.before is not None, filter_.after is not None)
+    if isinstance(filter_, CollectionFilter):
+        if not filter_.values:
+            return None
+        params[f"{name}_values"] = list(filter_.values)
+        return ("in", filter_.field_name)
+    if isinstance(filter_, OrderBy):
+        return ("order_by", filter_.field_name, filter_.sort_order) if paginates else None
+    if isinstance(filter_, SearchFilter):
+        params[f"{name}_value"] = f"%{filter_.value}%"
+        return ("search", filter_.field_name, bool(filter_.ignore_case))
+    raise RepositoryError(f"Unexpected filter: {filter_}")
 
 
 def on_app_init(app_config: "AppConfig") -> "AppConfig":
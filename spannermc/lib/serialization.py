@@ -1,6 +1,5 @@
 import datetime
 from typing import Any
-from uuid import UUID
 
 import msgspec
 from pydantic import BaseModel
@@ -11,19 +10,15 @@ __all__ = [
     "from_json",
     "from_msgpack",
     "to_json",
+    "to_json_into",
     "to_msgpack",
 ]
 
 
 def _default(value: Any) -> str:
+    # only called for types msgspec does not encode itself: UUID, datetime and date are encoded natively
     if isinstance(value, BaseModel):
         return str(value.model_dump(by_alias=True))
-    if isinstance(value, UUID):
-        return str(value)
-    if isinstance(value, datetime.datetime):
-        return convert_datetime_to_gmt_iso(value)
-    if isinstance(value, datetime.date):
-        return convert_date_to_iso(value)
     try:
         val = str(value)
     except Exception as exc:  # noqa: BLE001
@@ -45,6 +40,11 @@ def to_json(value: Any) -> bytes:
     return _msgspec_json_encoder.encode(value)
 
 
+def to_json_into(value: Any, buffer: bytearray) -> None:
+    """Encode json with the optimized msgspec package, appending it to `buffer` instead of allocating a new `bytes`."""
+    _msgspec_json_encoder.encode_into(value, buffer, -1)
+
+
 def from_json(value: bytes | str) -> Any:
     """Decode to an object with the optimized msgspec package."""
     return _msgspec_json_decoder.decode(value)
@@ -0,0 +1,187 @@
+"""Pre-fork HTTP server.
+
+The supervisor builds the application, warms everything that does not need
+the database, freezes the garbage collector's view of the heap and then forks
+`SERVER_HTTP_WORKERS` uvicorn workers.  Workers share the pre-imported
+modules and application through copy-on-write pages; `gc.freeze()` keeps the
+collector from touching, and so copying, those pages.
+
+No gRPC channel or database connection may be opened before the fork.  The
+Spanner client and engine are built lazily, so each worker opens its own
+during its lifespan startup.
+
+Workers exit after `SERVER_MAX_REQUESTS` requests, plus a random jitter so
+they do not all restart together, and the supervisor forks a replacement.
+"""
+from __future__ import annotations
+
+import contextlib
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+import uvicorn
+from uvicorn.importer import import_from_string
+
+from spannermc.lib import log, settings, warmup
+
+if TYPE_CHECKING:
+    from litestar import Litestar
+
+__all__ = ["BOOT_GRACE", "bind", "serve", "worker_config"]
+
+logger = log.get_logger()
+
+BOOT_GRACE = 30.0
+"""Seconds after a fork within which a failing worker stops the whole server instead of being replaced."""
+
+
+def bind(host: str, port: int, backlog: int, reuse_port: bool = False) -> socket.socket:
+    """Open a listening TCP socket.
+
+    Args:
+        host: Address to bind.
+        port: Port to bind.
+        backlog: Maximum number of pending connections.
+        reuse_port: Set `SO_REUSEPORT`, so several sockets can bind the same port and the kernel balances
+            connections across them.
+
+    Returns:
+        The listening socket.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def worker_config(app: Litestar) -> uvicorn.Config:
+    """Uvicorn configuration for one worker, from `ServerSettings`."""
+    server = settings.server
+    max_requests = None
+    if server.MAX_REQUESTS > 0:
+        max_requests = server.MAX_REQUESTS + random.randint(0, server.MAX_REQUESTS_JITTER)  # noqa: S311
+    return uvicorn.Config(
+        app,
+        host=server.HOST,
+        port=server.PORT,
+        backlog=server.BACKLOG,
+        limit_concurrency=server.LIMIT_CONCURRENCY,
+        limit_max_requests=max_requests,
+        timeout_keep_alive=server.KEEPALIVE,
+        loop="uvloop",
+        lifespan="on",
+        log_config=None,
+    )
+
+
+def _run_worker(app: Litestar, sock: socket.socket | None) -> None:
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_DFL)
+    if sock is None:
+        sock = bind(settings.server.HOST, settings.server.PORT, settings.server.BACKLOG, reuse_port=True)
+    server = uvicorn.Server(worker_config(app))
+    server.run(sockets=[sock])
+    sys.exit(0 if server.started else 3)
+
+
+def _fork(app: Litestar, sock: socket.socket | None) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            _run_worker(app, sock)
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except BaseException:
+            logger.exception("HTTP worker crashed")
+        finally:
+            log.stop_queue_listeners()
+            os._exit(code)
+    return pid
+
+
+def _prepare(app: Litestar) -> None:
+    """Warm what can be shared with the workers, then freeze the heap."""
+    if settings.app.WARMUP_ENABLED:
+        report = warmup.run(app, warmup.WarmupReport(budget=settings.app.WARMUP_BUDGET), database=False)
+        logger.info("Supervisor warm-up complete", **report.as_dict())
+    gc.collect()
+    if settings.server.GC_FREEZE:
+        gc.freeze()
+
+
+def _supervise(app: Litestar, sock: socket.socket | None, workers: int) -> int:
+    children: dict[int, float] = {}
+    stopping = False
+
+    def _stop(*_: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for _ in range(workers):
+        children[_fork(app, sock)] = time.monotonic()
+    logger.info("HTTP workers started", workers=workers, pids=list(children))
+    exit_code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        forked = children.pop(pid, None)
+        if forked is None or stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0 and time.monotonic() - forked < BOOT_GRACE:
+            logger.error("HTTP worker failed to boot, stopping", pid=pid, exit_code=code)
+            exit_code = code if code > 0 else 1
+            _stop()
+            continue
+        logger.info("Replacing HTTP worker", pid=pid, exit_code=code)
+        children[_fork(app, sock)] = time.monotonic()
+    return exit_code
+
+
+def serve() -> int:
+    """Run the HTTP server described by `ServerSettings`.
+
+    With `SERVER_RELOAD` set, a single reloading uvicorn process is started instead.
+
+    Returns:
+        The exit code of the server.
+    """
+    server = settings.server
+    if server.RELOAD:
+        uvicorn.run(
+            server.APP_LOC,
+            factory=server.APP_LOC_IS_FACTORY,
+            host=server.HOST,
+            port=server.PORT,
+            reload=True,
+            reload_dirs=server.RELOAD_DIRS,
+            timeout_keep_alive=server.KEEPALIVE,
+            log_config=None,
+        )
+        return 0
+    app = import_from_string(server.APP_LOC)
+    if server.APP_LOC_IS_FACTORY:
+        app = app()
+    _prepare(app)
+    sock = None if server.REUSE_PORT else bind(server.HOST, server.PORT, server.BACKLOG)
+    workers = server.HTTP_WORKERS or os.cpu_count() or 1
+    return _supervise(app, sock, workers)
@@ -0,0 +1,222 @@
+"""Server-Timing.
+
+Every HTTP request records how long its phases took, in milliseconds:
+
+- `auth`: looking up the user of the request's token.
+- `guards`: evaluating the route's guards.
+- `db`: running statements, as counted by `db.budget`.
+- `dto`: converting service results for the return DTO.
+- `serialize`: rendering the response body.
+- `total`: from the start of the request to the start of the response.
+
+The timings are bound into the structlog context as `server_timing`, so they
+appear on the HTTP log line.  They are also sent in a `Server-Timing` header
+when `APP_SERVER_TIMING` is set, or when a superuser sends the
+`APP_SERVER_TIMING_HEADER` request header.
+
+The request duration and database time are recorded in histograms by route,
+and the requests in flight in a counter by route.
+"""
+from __future__ import annotations
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from inspect import isawaitable
+from typing import TYPE_CHECKING, ParamSpec, TypeVar, cast
+
+import structlog
+from litestar.datastructures import MutableScopeHeaders
+from litestar.enums import ScopeType
+from opentelemetry import metrics
+
+from spannermc.lib import db, settings
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator
+
+    from litestar.config.app import AppConfig
+    from litestar.response import Response
+    from litestar.types import ASGIApp, HTTPScope, Message, Receive, Scope, Send
+
+__all__ = ["RequestTimings", "after_request", "current", "middleware_factory", "on_app_init", "phase", "timed"]
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+meter = metrics.get_meter(__name__)
+duration_histogram = meter.create_histogram(
+    "http.server.route.duration",
+    unit="s",
+    description="Time from the start of a request to the end of its response, by route, method and status.",
+)
+db_duration_histogram = meter.create_histogram(
+    "http.server.route.db.duration",
+    unit="s",
+    description="Time a request spent running statements, by route.",
+)
+active_requests_counter = meter.create_up_down_counter(
+    "http.server.route.active_requests",
+    unit="{request}",
+    description="Requests being handled, by route.",
+)
+
+
+class RequestTimings:
+    """Time spent in each phase of one request, in seconds."""
+
+    __slots__ = ("started", "rendering", "phases")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.rendering: float | None = None
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add `seconds` to the phase `name`."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def finish(self) -> None:
+        """Record the phases that end when the response starts."""
+        now = time.perf_counter()
+        if self.rendering is not None:
+            self.add("serialize", now - self.rendering)
+        statements = db.budget.current.get()
+        if statements is not None:
+            self.add("db", statements.counts["time"])
+        self.add("total", now - self.started)
+
+    def as_dict(self) -> dict[str, float]:
+        """Phases in milliseconds."""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()}
+
+    def header(self) -> str:
+        """The phases as a `Server-Timing` header value."""
+        return ", ".join(f"{name};dur={duration}" for name, duration in self.as_dict().items())
+
+
+current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+"""Timings of the request being handled, if any."""
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the phase `name` of the current request."""
+    timings = current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Decorate a function to add its run time to the phase `name` of the current request."""
+
+    def decorator(fn: Callable[P, T]) -> Callable[P, T]:
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            with phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def after_request(response: Response) -> Response:
+    """Mark the end of the handler and its return DTO, where rendering the response starts."""
+    timings = current.get()
+    if timings is not None:
+        timings.rendering = time.perf_counter()
+    return response
+
+
+def _expose(scope: Scope) -> bool:
+    if settings.app.SERVER_TIMING:
+        return True
+    header = settings.app.SERVER_TIMING_HEADER.lower().encode()
+    if not any(name == header for name, _ in scope["headers"]):
+        return False
+    return getattr(scope.get("user"), "is_superuser", False)
+
+
+def middleware_factory(app: ASGIApp) -> ASGIApp:
+    """Middleware that times the phases of each HTTP request.
+
+    Args:
+        app: The previous ASGI app in the call chain.
+
+    Returns:
+        A new ASGI app that records the request's timings and reports them when the response starts.
+    """
+
+    async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+        """Time the request.
+
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive handler.
+            send: ASGI send handler.
+        """
+        if scope["type"] != ScopeType.HTTP:
+            await app(scope, receive, send)
+            return
+        method = cast("HTTPScope", scope)["method"]
+        timings = RequestTimings()
+        token = current.set(timings)
+        route_handler = scope["route_handler"]
+        route = {"http.route": route_handler.name or route_handler.handler_name}
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timings.finish()
+                structlog.contextvars.bind_contextvars(server_timing=timings.as_dict())
+                if _expose(scope):
+                    MutableScopeHeaders.from_message(message)["Server-Timing"] = timings.header()
+            await send(message)
+
+        active_requests_counter.add(1, route)
+        try:
+            await app(scope, receive, send_wrapper)
+        finally:
+            current.reset(token)
+            active_requests_counter.add(-1, route)
+            attributes: dict[str, str | int] = {
+                **route,
+                "http.request.method": method,
+                "http.response.status_code": status_code,
+            }
+            duration_histogram.record(time.perf_counter() - timings.started, attributes)
+            if "db" in timings.phases:
+                db_duration_histogram.record(timings.phases["db"], route)
+
+    return middleware
+
+
+def on_app_init(app_config: AppConfig) -> AppConfig:
+    """Install the middleware outside all others, so the authentication middleware is timed too.
+
+    `after_request` runs after the application's own `after_request` hook, if it has one.
+    """
+    app_config.middleware.insert(0, middleware_factory)
+    if app_config.after_request is None:
+        app_config.after_request = after_request
+        return app_config
+    previous = cast("Callable[[Response], Response | Awaitable[Response]]", app_config.after_request)
+
+    async def chained_after_request(response: Response) -> Response:
+        result = previous(response)
+        if isawaitable(result):
+            result = await result
+        return after_request(cast("Response", result))
+
+    app_config.after_request = chained_after_request
+    return app_config
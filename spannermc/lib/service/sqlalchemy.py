@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import contextlib
 from collections.abc import Sequence
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Generic, TypeAlias, TypeVar, cast, overload
 
 from litestar.contrib.repository.filters import FilterTypes, LimitOffset
@@ -15,8 +16,9 @@ from litestar.contrib.sqlalchemy.repository import ModelT, SQLAlchemySyncReposit
 from litestar.pagination import OffsetPagination
 from pydantic import TypeAdapter
 
-from spannermc.lib.db import session_factory
+from spannermc.lib import db, etag, server_timing
 from spannermc.lib.db.orm import model_from_dict
+from spannermc.lib.exceptions import PreconditionFailedException
 
 from .generic import Service
 
@@ -89,17 +91,32 @@ class SQLAlchemySyncRepositoryService(Service[ModelT], Generic[ModelT]):
         data = [(self.to_model(datum, "create")) for datum in data]
         return self.repository.add_many(data)
 
-    def update(self, item_id: Any, data: ModelT | dict[str, Any], id_attribute: str | None = None) -> ModelT:
+    def update(
+        self,
+        item_id: Any,
+        data: ModelT | dict[str, Any],
+        id_attribute: str | None = None,
+        if_match: str | None = None,
+    ) -> ModelT:
         """Wrap repository update operation.
 
         Args:
             item_id: Identifier of item to be updated.
             data: Representation to be updated.
             id_attribute: Optionally override the identity column to use.
+            if_match: Optional `If-Match` header value.  The update is refused unless it matches the
+                entity tag of the stored instance.
+
+        Raises:
+            PreconditionFailedException: `if_match` does not match the current entity tag.
 
         Returns:
             Updated representation.
         """
+        if if_match is not None:
+            current = self.repository.get(item_id, id_attribute=id_attribute)
+            if not etag.etag_matches(if_match, etag.compute_etag(current), weak=False):
+                raise PreconditionFailedException("Resource has been modified since it was last retrieved.")
         data = self.to_model(data, "update")
         return self.repository.update(data, id_attribute=id_attribute)
 
@@ -255,6 +272,7 @@ class SQLAlchemySyncRepositoryService(Service[ModelT], Generic[ModelT]):
     ) -> OffsetPagination[ModelT]:
         ...
 
+    @server_timing.timed("dto")
     def to_dto(
         self, data: ModelT | Sequence[ModelT], total: int | None = None, *filters: FilterTypes
     ) -> ModelT | OffsetPagination[ModelT]:
@@ -294,6 +312,7 @@ class SQLAlchemySyncRepositoryService(Service[ModelT], Generic[ModelT]):
     ) -> OffsetPagination[ModelDTOT]:
         ...
 
+    @server_timing.timed("dto")
     def to_schema(
         self,
         dto: type[ModelDTOT],
@@ -313,12 +332,12 @@ class SQLAlchemySyncRepositoryService(Service[ModelT], Generic[ModelT]):
             The list of instances retrieved from the repository.
         """
         if not isinstance(data, Sequence | list):
-            return TypeAdapter(dto).validate_python(data)
+            return cast("ModelDTOT", _type_adapter(dto).validate_python(data))
         limit_offset = self.find_filter(LimitOffset, *filters)
         total = total if total else len(data)
         limit_offset = limit_offset if limit_offset is not None else LimitOffset(limit=len(data), offset=0)
         return OffsetPagination[dto](  # type: ignore[valid-type]
-            items=TypeAdapter(list[dto]).validate_python(data),  # type: ignore[valid-type]
+            items=_type_adapter(list[dto]).validate_python(data),  # type: ignore[valid-type]
             limit=limit_offset.limit,
             offset=limit_offset.offset,
             total=total,
@@ -341,7 +360,7 @@ class SQLAlchemySyncRepositoryService(Service[ModelT], Generic[ModelT]):
         if session:
             yield cls(statement=statement, session=session)
         else:
-            with session_factory() as db_session:
+            with db.get_session_factory()() as db_session:
                 yield cls(
                     statement=statement,
                     session=db_session,
@@ -374,3 +393,9 @@ class SQLAlchemySyncRepositoryService(Service[ModelT], Generic[ModelT]):
             The list of instances retrieved from the repository.
         """
         return self.repository.list(*filters, **kwargs)
+
+
+@lru_cache(maxsize=256)
+def _type_adapter(type_: Any) -> TypeAdapter[Any]:
+    """Build (once) the pydantic adapter for `type_`; construction compiles a validator."""
+    return TypeAdapter(type_)
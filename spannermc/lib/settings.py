@@ -5,31 +5,54 @@ settings class, except `AppSettings`.
 """
 from __future__ import annotations
 
+import fcntl
+import hashlib
 import importlib
 import io
 import logging
 import os
 import sys
+import time
+from contextlib import contextmanager
 from functools import lru_cache
 from pathlib import Path
-from typing import Final, Literal
+from typing import TYPE_CHECKING, Any, Final, Literal
 
-import google.auth
 from dotenv import load_dotenv
 from litestar.data_extractors import RequestExtractorField, ResponseExtractorField  # noqa: TCH002
-from pydantic import Field, ValidationError, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from spannermc import utils
-from spannermc.lib.cloud import gcp as gcp_secret_manager
-
-__all__ = ["BASE_DIR", "BaseSettings", "app", "openapi", "server", "cloud", "db"]
+from spannermc.lib import serialization
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = [
+    "BASE_DIR",
+    "BaseSettings",
+    "app",
+    "openapi",
+    "server",
+    "cloud",
+    "db",
+    "telemetry",
+    "get_settings",
+    "refresh_snapshot",
+]
 
 logger = logging.getLogger()
 
 DEFAULT_MODULE_NAME = "spannermc"
 BASE_DIR: Final = utils.module_to_os_path(DEFAULT_MODULE_NAME)
 version = importlib.metadata.version(DEFAULT_MODULE_NAME)
+SNAPSHOT_ENV: Final = "SETTINGS_SNAPSHOT"
+"""Environment variable naming the settings snapshot file. Unset disables the snapshot."""
+SNAPSHOT_MAX_AGE_ENV: Final = "SETTINGS_SNAPSHOT_MAX_AGE"
+"""Environment variable with the seconds a snapshot is trusted before it is rebuilt. `0` never expires it."""
+SNAPSHOT_MAX_AGE: Final = 3600
+SNAPSHOT_FORMAT: Final = 1
 
 
 class ServerSettings(BaseSettings):
@@ -52,7 +75,19 @@ class ServerSettings(BaseSettings):
     RELOAD_DIRS: list[str] = [f"{BASE_DIR}"]
     """Directories to watch for reloading."""
     HTTP_WORKERS: int | None = None
-    """Number of HTTP Worker processes to be spawned by Uvicorn."""
+    """Number of HTTP Worker processes forked by `spannermc serve`. Defaults to the CPU count."""
+    BACKLOG: int = 2048
+    """Maximum number of connections waiting to be accepted."""
+    REUSE_PORT: bool = False
+    """Give each worker its own listening socket with `SO_REUSEPORT`, instead of sharing one."""
+    LIMIT_CONCURRENCY: int | None = None
+    """Connections and tasks a worker allows at once before answering `503`."""
+    MAX_REQUESTS: int = 0
+    """Requests a worker serves before it is replaced. `0` disables recycling."""
+    MAX_REQUESTS_JITTER: int = 0
+    """Random extra requests added to `MAX_REQUESTS` per worker, so workers do not restart together."""
+    GC_FREEZE: bool = True
+    """Move the objects built before forking into the permanent generation, so the workers' collections skip them."""
     EXPIRATION: int = 60
 
 
@@ -80,6 +115,54 @@ class AppSettings(BaseSettings):
     """CSRF Secure Cookie enforcement."""
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
     """Backend CORS Origin configuration."""
+    ETAG_CACHE_SIZE: int = 10_000
+    """Number of resource entity tags remembered for answering `If-None-Match`. `0` disables the cache."""
+    ETAG_CACHE_TTL: int = 30
+    """Seconds a cached entity tag is trusted before the handler is consulted again."""
+    KV_BLOOM_FILTER_ENABLED: bool = False
+    """Reject lookups of unknown KV keys from an in-memory Bloom filter instead of querying Spanner."""
+    KV_BLOOM_FILTER_CAPACITY: int = 1_000_000
+    """Expected number of KV keys the filter is sized for."""
+    KV_BLOOM_FILTER_ERROR_RATE: float = 0.01
+    """Target false positive rate of the KV key filter."""
+    KV_BLOOM_FILTER_REBUILD_INTERVAL: int = 300
+    """Seconds between full rebuilds of the KV key filter (picks up deletes and other instances' writes)."""
+    WARMUP_ENABLED: bool = True
+    """Exercise OpenAPI generation, return DTOs and service statements during startup, before serving."""
+    WARMUP_BUDGET: float = 15.0
+    """Seconds the warm-up may take before startup completes without the remaining steps."""
+    WARMUP_DATABASE: bool = True
+    """Include the service statements, which run against Spanner, in the warm-up."""
+    ADMISSION_ENABLED: bool = True
+    """Limit in-flight requests per admission class and shed the excess with `503`."""
+    ADMISSION_LIMITS: dict[str, int] = {"default": 16, "auth": 4, "health": 2}
+    """Requests each admission class admits at once. Classes not listed use the `default` limit."""
+    ADMISSION_QUEUE_SIZE: int = 64
+    """Requests each admission class holds waiting for a slot before shedding new arrivals."""
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    """Seconds a request may wait for a slot before it is shed."""
+    ADMISSION_RETRY_AFTER: int = 1
+    """Seconds sent in the `Retry-After` header of shed requests."""
+    REQUEST_TIMEOUT: float = 30.0
+    """Seconds a request's database work may take, unless its route sets another default. `0` disables it."""
+    REQUEST_TIMEOUT_MAX: float = 60.0
+    """Upper bound on the deadline a client may ask for."""
+    REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout"
+    """Request header in which a client sets its deadline, in seconds."""
+    SERVER_TIMING: bool = False
+    """Send the `Server-Timing` header on every response."""
+    SERVER_TIMING_HEADER: str = "X-Server-Timing"
+    """Request header with which a superuser asks for the `Server-Timing` header when `SERVER_TIMING` is off."""
+    PROFILE_ENABLED: bool = True
+    """Let superusers profile a request by sending `PROFILE_HEADER`."""
+    PROFILE_HEADER: str = "X-Profile"
+    """Request header with which a superuser asks for the request to be profiled."""
+    PROFILE_STORE_SIZE: int = 20
+    """Request profiles kept per worker."""
+    LOOP_LAG_INTERVAL: float = 0.1
+    """Seconds between event loop lag samples. `0` disables the loop monitor."""
+    LOOP_LAG_THRESHOLD: float = 0.25
+    """Seconds the event loop may be blocked before the stack of its thread is logged."""
 
     @property
     def slug(self) -> str:
@@ -169,6 +252,32 @@ class DatabaseSettings(BaseSettings):
     POOL_TIMEOUT: int = 30
     POOL_RECYCLE: int = 300
     POOL_PRE_PING: bool = False
+    POOL_PREWARM: bool = True
+    """Open `POOL_SIZE` connections during startup so the first requests do not pay for session creation."""
+    POOL_PREWARM_TIMEOUT: int = 30
+    """Seconds startup waits for the pool to warm before serving anyway."""
+    SPANNER_POOL_TYPE: Literal["default", "fixed", "bursty", "pinging"] = "default"
+    """Spanner session pool implementation. `default` leaves the choice to the Spanner client."""
+    SPANNER_POOL_SIZE: int = 10
+    """Sessions held by a `fixed` or `pinging` pool, or the target size of a `bursty` pool."""
+    SPANNER_POOL_TIMEOUT: int = 10
+    """Seconds to wait for a free session from a `fixed` or `pinging` pool."""
+    SPANNER_POOL_PING_INTERVAL: int = 300
+    """Seconds between keepalive pings of the idle sessions of a `pinging` pool. `0` disables the keepalive."""
+    SPANNER_SESSION_LABELS: dict[str, str] = {}
+    """Labels attached to every Spanner session created by the pool."""
+    SLOW_QUERY_THRESHOLD: float = 0.5
+    """Seconds at or over which a statement is logged as a slow query. A negative value disables the log."""
+    SLOW_QUERY_PLAN_SAMPLE_RATE: float = 0.1
+    """Fraction of slow `SELECT` statements re-run in Spanner `PLAN` mode to log their query plan."""
+    STATEMENT_BUDGET: int = 25
+    """Statements a request may run before it is reported. `0` disables the budget."""
+    STATEMENT_REPEAT_LIMIT: int = 5
+    """Runs of one statement shape within a request at which it is reported as a likely N+1 query. `0` disables."""
+    STATEMENT_STATISTICS_SIZE: int = 500
+    """Statement fingerprints aggregated per worker for `GET /api/system/statements`. `0` disables the statistics."""
+    STATEMENT_CACHE_SIZE: int = 256
+    """Parameterized select statements kept per repository, keyed by filter shape. `0` disables the cache."""
     URL: str
     MIGRATION_CONFIG: str = f"{BASE_DIR}/lib/db/alembic.ini"
     MIGRATION_PATH: str = f"{BASE_DIR}/lib/db/migrations"
@@ -183,8 +292,8 @@ class CloudSettings(BaseSettings):
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env", extra="ignore")
 
     ACTIVE_CLOUD: str = Field(default="local")
-    GOOGLE_PROJECT: str | None = Field(default=None, validation_alias="GOOGLE_PROJECT_ID")
-    GOOGLE_CREDENTIALS: str | None = Field(default=None, validation_alias="GOOGLE_APPLICATION_CREDENTIALS")
+    GOOGLE_PROJECT: str | None = Field(default=None, alias="GOOGLE_PROJECT_ID")
+    GOOGLE_CREDENTIALS: str | None = Field(default=None, alias="GOOGLE_APPLICATION_CREDENTIALS")
     ENV_SECRETS: str = Field(default="runtime-secrets")
 
 
@@ -193,9 +302,10 @@ class LogSettings(BaseSettings):
 
     model_config = SettingsConfigDict(env_prefix="LOG_", case_sensitive=True, env_file=".env")
 
-    # https://stackoverflow.com/a/1845097/6560549
-    EXCLUDE_PATHS: str = r"\A(?!x)x"
+    EXCLUDE_PATHS: str | None = None
     """Regex to exclude paths from logging."""
+    EXCLUDE_PATHS_EXACT: set[str] = set()
+    """Paths excluded from logging, compared exactly. Cheaper than `EXCLUDE_PATHS`."""
     HTTP_EVENT: str = "HTTP"
     """Log event name for logs from Starlite handlers."""
     INCLUDE_COMPRESSED_BODY: bool = False
@@ -243,35 +353,145 @@ class LogSettings(BaseSettings):
         # "body",
     ]
     """Attributes of the [Response][starlite.response.Response] to be logged."""
+    SLOW_REQUEST_THRESHOLD: float = 1.0
+    """Seconds from the start of a request to the start of its response over which it is always logged."""
+    SUCCESS_SAMPLE_RATE: float = Field(default=1.0, ge=0, le=1)
+    """Fraction of requests answered with a status under 400 that are logged.
+
+    Failed and slow requests are always logged. Sampled log lines carry the rate as `sample_rate`."""
     SQLALCHEMY_LEVEL: int = 30
     """Level to log SAQ logs."""
     UVICORN_ACCESS_LEVEL: int = 30
     """Level to log uvicorn access logs."""
     UVICORN_ERROR_LEVEL: int = 30
     """Level to log uvicorn error logs."""
+    WRITER_BUFFER_SIZE: int = 8 * 1024 * 1024
+    """Bytes of rendered log lines held for the writer thread."""
+    WRITER_OVERFLOW: Literal["drop", "block"] = "drop"
+    """When the writer's buffer is full, drop new lines, or make the logging thread wait for room."""
+
+
+class TelemetrySettings(BaseSettings):
+    """OpenTelemetry exporters and sampling.
+
+    Prefix all environment variables with `TELEMETRY_`, e.g., `TELEMETRY_EXPORTER`.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="TELEMETRY_", case_sensitive=True, env_file=".env", extra="ignore")
+
+    EXPORTER: Literal["none", "memory", "console", "file", "gcp", "prometheus"] = "gcp"
+    """Where spans and metrics are exported. `none` skips instrumentation entirely, `prometheus` drops spans."""
+    PROMETHEUS: bool = True
+    """Also serve the metrics at `/metrics` in the Prometheus text format."""
+    SAMPLE_RATIO: float = Field(default=1 / 25, ge=0, le=1)
+    """Fraction of root traces recorded. Child spans follow their parent's decision.
+
+    With `TAIL_SAMPLING`, the fraction of fast, error-free traces exported instead."""
+    TAIL_SAMPLING: bool = True
+    """Record every trace and decide when its root span ends, always exporting slow and failed traces.
+
+    Propagated trace contexts are then always marked sampled."""
+    TAIL_SAMPLING_LATENCY_THRESHOLD: float = 1.0
+    """Seconds at or over which a trace is always exported."""
+    TAIL_SAMPLING_MAX_TRACES: int = Field(default=1000, ge=1)
+    """Traces held back at once, awaiting their root span. The oldest is dropped to make room."""
+    TAIL_SAMPLING_MAX_SPANS: int = Field(default=500, ge=1)
+    """Spans held back per trace. Further spans of the trace are dropped."""
+    FILE_PATH: str = "telemetry.jsonl"
+    """File the `file` exporter appends JSON lines to."""
+    METRIC_EXPORT_INTERVAL: int = 60_000
+    """Milliseconds between metric exports."""
+    RESOURCE_DETECTION_TIMEOUT: int = 5
+    """Seconds the `gcp` exporter waits for the metadata server to describe the resource."""
+
+
+SettingsTuple = tuple[
+    AppSettings, DatabaseSettings, OpenAPISettings, ServerSettings, CloudSettings, LogSettings, TelemetrySettings
+]
+_SETTINGS_CLASSES: Final[tuple[type[BaseSettings], ...]] = (
+    AppSettings,
+    DatabaseSettings,
+    OpenAPISettings,
+    ServerSettings,
+    CloudSettings,
+    LogSettings,
+    TelemetrySettings,
+)
 
 
 @lru_cache
 def get_settings(
     env: str | None = None,
-) -> tuple[AppSettings, DatabaseSettings, OpenAPISettings, ServerSettings, CloudSettings, LogSettings]:
+) -> SettingsTuple:
     """Load Settings file.
 
+    When `SETTINGS_SNAPSHOT` names a file, the settings are read from that
+    snapshot if it is intact, was taken from the same environment and is no
+    older than `SETTINGS_SNAPSHOT_MAX_AGE` seconds.  Otherwise they are
+    loaded from the environment and the snapshot is rewritten.  Processes
+    starting together take turns on a lock file, so only the first one
+    loads the environment, and reads Secret Manager.
+
+    Google credentials are only resolved here when the environment has to be
+    fetched from Secret Manager and `GOOGLE_PROJECT_ID` is not set.  Otherwise
+    the Spanner client resolves them when the first connection is opened.
+
     Returns:
         Settings: _description_
     """
-    os.environ.get("CLOUD", "local")
-    secret_id = os.environ.get("ENV_SECRETS", None)
-    env_file_exists = Path(f"{os.curdir}/.env").is_file()
+    _prepare_environment()
+    snapshot = os.environ.get(SNAPSHOT_ENV)
+    if not snapshot:
+        return _load_settings()
+    path = Path(snapshot)
+    fingerprint = _environment_fingerprint()
+    max_age = int(os.environ.get(SNAPSHOT_MAX_AGE_ENV, SNAPSHOT_MAX_AGE))
+    loaded = _read_snapshot(path, fingerprint, max_age)
+    if loaded is not None:
+        return loaded
+    with _snapshot_lock(path):
+        loaded = _read_snapshot(path, fingerprint, max_age)
+        if loaded is not None:
+            return loaded
+        loaded = _load_settings()
+        _write_snapshot(path, loaded, fingerprint)
+    return loaded
+
+
+def refresh_snapshot(path: Path) -> None:
+    """Load the settings from the environment and rewrite the snapshot at `path`.
+
+    Args:
+        path: Snapshot file.
+    """
+    _prepare_environment()
+    # taken before the settings are loaded, which adds the Secret Manager values to the environment
+    fingerprint = _environment_fingerprint()
+    with _snapshot_lock(path):
+        _write_snapshot(path, _load_settings(), fingerprint)
+
+
+def _prepare_environment() -> None:
     os.environ["LITESTAR_PORT"] = "8000"
-    local_service_account_exists = Path(f"{os.curdir}/service_account.json").is_file()
-    if local_service_account_exists:
+    if Path(f"{os.curdir}/service_account.json").is_file():
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "service_account.json"
-    project_id = os.environ.get("GOOGLE_PROJECT_ID", None)
-    if project_id is None:
-        _, project_id = google.auth.default()
-        os.environ["GOOGLE_PROJECT_ID"] = project_id
+
+
+def _load_settings() -> SettingsTuple:
+    secret_id = os.environ.get("ENV_SECRETS", None)
+    env_file_exists = Path(f"{os.curdir}/.env").is_file()
     if not env_file_exists and secret_id:
+        import google.auth
+
+        from spannermc.lib.cloud import gcp as gcp_secret_manager
+
+        project_id = os.environ.get("GOOGLE_PROJECT_ID", None)
+        if project_id is None:
+            _, project_id = google.auth.default()
+            if project_id is None:
+                logger.fatal("Could not load settings. Set GOOGLE_PROJECT_ID to read ENV_SECRETS.")
+                sys.exit(1)
+            os.environ["GOOGLE_PROJECT_ID"] = project_id
         logger.info("loading environment from Google Secrets")
         secret = gcp_secret_manager.get_secret(project_id, secret_id)
         load_dotenv(stream=io.StringIO(secret))
@@ -283,10 +503,95 @@ def get_settings(
         server: ServerSettings = ServerSettings(RELOAD_DIRS=[str(BASE_DIR)])
         cloud: CloudSettings = CloudSettings()
         log: LogSettings = LogSettings()
+        telemetry: TelemetrySettings = TelemetrySettings()
     except ValidationError as e:
         logger.fatal("Could not load settings. %s", e)
         sys.exit(1)
-    return (app, db, openapi, server, cloud, log)
+    return (app, db, openapi, server, cloud, log, telemetry)
+
+
+def _environment_fingerprint() -> str:
+    """Digest of everything the settings are loaded from, other than Secret Manager.
+
+    That is the `.env` file, the environment variables the settings classes read and `ENV_SECRETS`.
+    """
+    names = {"ENV_SECRETS"}
+    for cls in _SETTINGS_CLASSES:
+        prefix = cls.model_config.get("env_prefix", "")
+        for name, field in cls.model_fields.items():
+            alias = field.validation_alias
+            names.add(alias if isinstance(alias, str) else f"{prefix}{name}")
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{version}".encode())
+    for name in sorted(names):
+        if name in os.environ:
+            digest.update(f"\0{name}={os.environ[name]}".encode())
+    env_file = Path(f"{os.curdir}/.env")
+    if env_file.is_file():
+        digest.update(b"\0.env\0" + env_file.read_bytes())
+    return digest.hexdigest()
+
+
+def _write_snapshot(path: Path, loaded: SettingsTuple, fingerprint: str) -> None:
+    """Write validated settings to a snapshot file.
+
+    The file is a SHA-256 checksum followed by the msgpack encoded settings.
+    It holds secrets, so it is only readable by its owner, and it is replaced
+    atomically so a concurrent reader never sees a partial file.
+    """
+    payload = serialization.to_msgpack(
+        {
+            "format": SNAPSHOT_FORMAT,
+            "fingerprint": fingerprint,
+            "created": time.time(),
+            "settings": [item.model_dump(mode="json", by_alias=True) for item in loaded],
+        }
+    )
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as stream:
+        stream.write(hashlib.sha256(payload).digest() + payload)
+    partial.replace(path)
+
+
+def _read_snapshot(path: Path, fingerprint: str, max_age: int) -> SettingsTuple | None:
+    try:
+        content = path.read_bytes()
+    except OSError:
+        return None
+    checksum, payload = content[:32], content[32:]
+    if hashlib.sha256(payload).digest() != checksum:
+        logger.warning("Ignoring corrupt settings snapshot %s", path)
+        return None
+    snapshot = serialization.from_msgpack(payload)
+    if snapshot["format"] != SNAPSHOT_FORMAT or snapshot["fingerprint"] != fingerprint:
+        return None
+    if max_age and time.time() - snapshot["created"] > max_age:
+        return None
+    return tuple(  # type: ignore[return-value]
+        _validate_snapshot(cls, data) for cls, data in zip(_SETTINGS_CLASSES, snapshot["settings"], strict=True)
+    )
+
+
+def _validate_snapshot(cls: type[BaseSettings], data: dict[str, Any]) -> BaseSettings:
+    """Validate snapshot `data` as `cls`, without reading the environment or the `.env` file.
+
+    `BaseSettings.__init__`, which `model_validate` calls too, merges the settings sources into
+    its arguments before validating them with `BaseModel.__init__`.
+    """
+    instance = cls.__new__(cls)
+    BaseModel.__init__(instance, **data)
+    return instance
+
+
+@contextmanager
+def _snapshot_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a file next to the snapshot while it is rebuilt."""
+    fd = os.open(path.with_name(f".{path.name}.lock"), os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
 
 
-app, db, openapi, server, cloud, log = get_settings()
+app, db, openapi, server, cloud, log, telemetry = get_settings()
@@ -0,0 +1,154 @@
+"""Cold-start profile.
+
+`create_app` records how long each of its phases takes in `phases`.
+`profile` boots the application in a fresh interpreter with `-X importtime`
+and reports the import time of each module, the `create_app` phases, the
+time taken by each lifespan startup hook and the resident memory after boot.
+"""
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from litestar import Litestar
+
+__all__ = ["ModuleImport", "StartupProfile", "phase", "phases", "profile"]
+
+
+phases: dict[str, float] = {}
+"""Seconds spent in each phase of the latest `create_app` call."""
+
+_IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Record the time spent in the block as the phase `name`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = time.perf_counter() - started
+
+
+@dataclass
+class ModuleImport:
+    """Import time of one module, as reported by `python -X importtime`."""
+
+    module: str
+    self_time: float
+    """Seconds spent executing the module itself."""
+    cumulative_time: float
+    """Seconds including the modules it imported first."""
+
+
+@dataclass
+class StartupProfile:
+    """Where a cold start spends its time and memory."""
+
+    import_time: float
+    """Seconds from the first import in the profiled interpreter until the application module is imported."""
+    imports: list[ModuleImport] = field(default_factory=list)
+    phases: dict[str, float] = field(default_factory=dict)
+    hooks: dict[str, float] = field(default_factory=dict)
+    """Seconds spent in each lifespan startup hook, in call order."""
+    resident_memory: int = 0
+    """Resident set size in bytes after boot."""
+
+    @property
+    def total(self) -> float:
+        """Seconds from interpreter start to a booted application, excluding interpreter start-up itself."""
+        return self.import_time + sum(self.phases.values()) + sum(self.hooks.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile as JSON compatible builtins."""
+        return {**asdict(self), "total": self.total}
+
+
+def _resident_memory() -> int:
+    try:
+        with Path("/proc/self/statm").open(encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def _run_startup_hooks(app: Litestar) -> dict[str, float]:
+    hooks: dict[str, float] = {}
+    for hook in app.on_startup:
+        started = time.perf_counter()
+        result = hook(app) if inspect.signature(hook).parameters else hook()  # type: ignore[call-arg]
+        if inspect.isawaitable(result):
+            await result
+        hooks[f"{hook.__module__}.{hook.__qualname__}"] = time.perf_counter() - started
+    for hook in app.on_shutdown[::-1]:
+        result = hook(app) if inspect.signature(hook).parameters else hook()  # type: ignore[call-arg]
+        if inspect.isawaitable(result):
+            await result
+    return hooks
+
+
+def _boot(run_hooks: bool, output: str, started: float) -> None:
+    """Boot the application and write the phases, hooks and memory as JSON to `output`.
+
+    Runs in the profiled interpreter, whose stdout also carries the application's logs.  Importing this module
+    imports the `spannermc` package, and so the application, so `started` is taken before any import.
+    """
+    import asyncio
+
+    from spannermc import asgi
+
+    import_time = time.perf_counter() - started
+    app = asgi.create_app()
+    hooks = asyncio.run(_run_startup_hooks(app)) if run_hooks else {}
+    booted = {"import_time": import_time, "phases": phases, "hooks": hooks, "resident_memory": _resident_memory()}
+    Path(output).write_text(json.dumps(booted), encoding="utf-8")
+
+
+def _parse_import_times(stderr: str) -> list[ModuleImport]:
+    imports = []
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match is not None:
+            self_us, cumulative_us, _, module = match.groups()
+            imports.append(ModuleImport(module, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return imports
+
+
+def profile(run_hooks: bool = True) -> StartupProfile:
+    """Profile a cold start of the application in a fresh interpreter.
+
+    Args:
+        run_hooks: Also run the lifespan startup and shutdown hooks, which connect to the database.
+
+    Returns:
+        The profile, with imports ordered by self time, slowest first.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory) / "booted.json"
+        code = (
+            "import time; started = time.perf_counter(); "
+            f"from spannermc.lib import startup; startup._boot({run_hooks}, {str(output)!r}, started)"
+        )
+        command = [sys.executable, "-X", "importtime", "-c", code]
+        result = subprocess.run(command, capture_output=True, text=True, check=False)  # noqa: S603
+        if result.returncode != 0:
+            raise RuntimeError(f"application failed to boot:\n{result.stderr[-4000:]}")
+        booted = json.loads(output.read_text(encoding="utf-8"))
+    imports = sorted(_parse_import_times(result.stderr), key=lambda item: item.self_time, reverse=True)
+    return StartupProfile(imports=imports, **booted)
@@ -0,0 +1,131 @@
+"""Tail-based trace sampling.
+
+`TailSamplingSpanProcessor` holds back the spans of each trace until its
+local root span ends, then decides whether to export the whole trace:
+
+- always, when any span errored or the root took at least
+  `TELEMETRY_TAIL_SAMPLING_LATENCY_THRESHOLD` seconds;
+- otherwise with probability `TELEMETRY_SAMPLE_RATIO`, decided from the
+  trace id, so every service keeping a ratio of traces keeps the same ones.
+
+Every span is recorded for this to work, so the tracer provider samples
+all traces.  The `traceparent` propagated to other services is therefore
+always marked sampled, and services that follow their parent's sampling
+decision record every trace too.  At most
+`TELEMETRY_TAIL_SAMPLING_MAX_TRACES` traces, of at most
+`TELEMETRY_TAIL_SAMPLING_MAX_SPANS` spans each, are held back; the oldest
+trace is dropped to make room.  Decisions and dropped spans are counted in
+`otel.tail_sampling.traces` and `otel.tail_sampling.dropped_spans`.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+from opentelemetry.sdk.trace import SpanProcessor
+from opentelemetry.trace import StatusCode
+
+if TYPE_CHECKING:
+    from opentelemetry.context import Context
+    from opentelemetry.sdk.trace import ReadableSpan, Span
+
+__all__ = ["TailSamplingSpanProcessor"]
+
+_TRACE_ID_LIMIT = (1 << 64) - 1
+
+meter = metrics.get_meter(__name__)
+traces_counter = meter.create_counter(
+    "otel.tail_sampling.traces",
+    unit="{trace}",
+    description="Traces whose root span ended, by sampling decision.",
+)
+dropped_spans_counter = meter.create_counter(
+    "otel.tail_sampling.dropped_spans",
+    unit="{span}",
+    description="Spans dropped before a sampling decision because the buffer was full, by reason.",
+)
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """Buffer spans by trace and pass the traces worth keeping to `processor` when their root ends."""
+
+    def __init__(
+        self,
+        processor: SpanProcessor,
+        latency_threshold: float,
+        ratio: float,
+        max_traces: int,
+        max_spans: int,
+    ) -> None:
+        """Configure the processor.
+
+        Args:
+            processor: Processor the kept spans are passed to, usually a `BatchSpanProcessor`.
+            latency_threshold: Seconds at or over which a root span keeps its trace.
+            ratio: Share of the other error-free traces kept.
+            max_traces: Traces held back at once.
+            max_spans: Spans held back per trace.
+        """
+        self.processor = processor
+        self.latency_threshold_ns = int(latency_threshold * 1e9)
+        self.ratio_bound = round(ratio * (_TRACE_ID_LIMIT + 1))
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self._traces: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Context | None = None) -> None:
+        self.processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context is None:
+            return
+        trace_id = span.context.trace_id
+        if span.parent is not None and not span.parent.is_remote:
+            with self._lock:
+                spans = self._buffer(trace_id)
+                if len(spans) < self.max_spans:
+                    spans.append(span)
+                    return
+            dropped_spans_counter.add(1, {"reason": "trace_too_long"})
+            return
+        with self._lock:
+            spans = self._traces.pop(trace_id, [])
+        spans.append(span)
+        decision = self._decide(span, spans)
+        traces_counter.add(1, {"decision": decision})
+        if decision == "dropped":
+            return
+        for buffered in spans:
+            self.processor.on_end(buffered)
+
+    def _buffer(self, trace_id: int) -> list[ReadableSpan]:
+        spans = self._traces.get(trace_id)
+        if spans is not None:
+            return spans
+        while len(self._traces) >= self.max_traces:
+            _, evicted = self._traces.popitem(last=False)
+            dropped_spans_counter.add(len(evicted), {"reason": "buffer_full"})
+        spans = self._traces[trace_id] = []
+        return spans
+
+    def _decide(self, root: ReadableSpan, spans: list[ReadableSpan]) -> str:
+        if any(span.status.status_code is StatusCode.ERROR for span in spans):
+            return "kept_error"
+        if (
+            root.end_time is not None
+            and root.start_time is not None
+            and root.end_time - root.start_time >= self.latency_threshold_ns
+        ):
+            return "kept_slow"
+        if root.context is not None and root.context.trace_id & _TRACE_ID_LIMIT < self.ratio_bound:
+            return "kept_sampled"
+        return "dropped"
+
+    def shutdown(self) -> None:
+        self.processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.processor.force_flush(timeout_millis)
@@ -0,0 +1,221 @@
+"""Application warm-up.
+
+The first request to each route pays one-time costs: OpenAPI generation, DTO
+transfer model construction, pydantic `TypeAdapter` construction, SQL
+compilation and connection setup.  `on_startup` pays them instead, before the
+lifespan startup completes and the server starts accepting traffic.
+
+Each unit of work is a step; the report of what was warmed, how long each
+step took and what failed is logged and kept on `app.state.warmup`.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
+
+from litestar.contrib.repository.filters import LimitOffset
+from litestar.dto.interface import ConnectionContext
+from litestar.enums import RequestEncodingType
+from litestar.pagination import OffsetPagination
+from litestar.response import Response
+from litestar.routes import HTTPRoute
+from litestar.serialization import encode_json, get_serializer
+
+from spannermc.lib import db, log, settings
+from spannermc.lib.service.sqlalchemy import SQLAlchemySyncRepositoryService
+
+__all__ = ["WarmupReport", "WarmupStep", "on_startup", "run"]
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from litestar import Litestar
+    from litestar.handlers import HTTPRouteHandler
+
+
+logger = log.get_logger()
+
+WARMUP_STATE_KEY = "warmup"
+
+
+@dataclass
+class WarmupStep:
+    """A single warmed target."""
+
+    name: str
+    duration: float = 0.0
+    error: str | None = None
+    skipped: bool = False
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of the warm-up phase."""
+
+    budget: float
+    duration: float = 0.0
+    timed_out: bool = False
+    steps: list[WarmupStep] = field(default_factory=list)
+
+    @property
+    def warmed(self) -> list[str]:
+        """Names of the steps that completed successfully."""
+        return [step.name for step in self.steps if not step.skipped and step.error is None]
+
+    @property
+    def failed(self) -> dict[str, str]:
+        """Step name to error message for the steps that raised."""
+        return {step.name: step.error for step in self.steps if step.error is not None}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize the report for logging."""
+        return {
+            "budget": self.budget,
+            "duration": round(self.duration, 4),
+            "timed_out": self.timed_out,
+            "warmed": len(self.warmed),
+            "failed": self.failed,
+            "skipped": [step.name for step in self.steps if step.skipped],
+            "slowest": [
+                (step.name, round(step.duration, 4))
+                for step in sorted(self.steps, key=lambda step: step.duration, reverse=True)[:5]
+            ],
+        }
+
+
+def _http_handlers(app: Litestar) -> Iterator[HTTPRouteHandler]:
+    for route in app.routes:
+        if isinstance(route, HTTPRoute):
+            yield from route.route_handlers
+
+
+def _sample_return_value(handler: HTTPRouteHandler, model_type: type[Any]) -> Any:
+    """Build a representative return value for `handler` around an empty model instance."""
+    instance = model_type()
+    origin = handler.parsed_fn_signature.return_type.origin
+    if origin is OffsetPagination:
+        return OffsetPagination(items=[instance], limit=1, offset=0, total=1)
+    if origin is Response:
+        return Response(content=instance)
+    return instance
+
+
+def _warm_return_dto(handler: HTTPRouteHandler) -> None:
+    """Push a sample value through the handler's return DTO and the JSON encoder."""
+    return_dto = handler.resolve_return_dto()
+    if return_dto is None:
+        return
+    context = ConnectionContext(
+        handler_id=str(handler),
+        request_encoding_type=RequestEncodingType.JSON,
+        default_deserializer=handler.default_deserializer,
+        type_decoders=handler.resolve_type_decoders(),
+    )
+    encodable = return_dto(context).data_to_encodable_type(
+        _sample_return_value(handler, return_dto.model_type),  # type: ignore[attr-defined]
+    )
+    if isinstance(encodable, Response):
+        encodable = encodable.content
+    encode_json(encodable, get_serializer(handler.resolve_type_encoders()))
+
+
+def _service_providers(app: Litestar) -> dict[str, Callable[..., Any]]:
+    """Find the generator dependencies that build a repository service from a database session."""
+    providers: dict[str, Callable[..., Any]] = {}
+    for handler in _http_handlers(app):
+        for provide in handler.resolve_dependencies().values():
+            provider = provide.dependency.value
+            if inspect.isgeneratorfunction(provider) and list(inspect.signature(provider).parameters) == ["db_session"]:
+                providers.setdefault(f"{provider.__module__}.{provider.__name__}", provider)
+    return providers
+
+
+def _warm_service_statements(provider: Callable[..., Any]) -> None:
+    """Run the list, count and lookup statement shapes of a service against a real session."""
+    with db.session() as db_session:
+        dependency = provider(db_session=db_session)
+        try:
+            service = next(dependency)
+            if isinstance(service, SQLAlchemySyncRepositoryService):
+                service.list_and_count(LimitOffset(limit=1, offset=0))
+                service.get_one_or_none(id=uuid4())
+        finally:
+            dependency.close()
+
+
+def _plan(app: Litestar, database: bool) -> list[tuple[str, Callable[[], Any]]]:
+    steps: list[tuple[str, Callable[[], Any]]] = []
+    if app.openapi_config is not None:
+        steps.append(("openapi", lambda: app.openapi_schema))
+    for handler in _http_handlers(app):
+        if handler.resolve_return_dto() is not None:
+            name = f"dto:{handler.name or handler.handler_name}"
+            steps.append((name, functools.partial(_warm_return_dto, handler)))
+    if database:
+        for name, provider in _service_providers(app).items():
+            steps.append((f"sql:{name}", functools.partial(_warm_service_statements, provider)))
+    return steps
+
+
+def run(
+    app: Litestar,
+    report: WarmupReport,
+    database: bool | None = None,
+    stop: threading.Event | None = None,
+) -> WarmupReport:
+    """Run every warm-up step for `app`, stopping once the budget is spent or `stop` is set.
+
+    Args:
+        app: The application to warm.
+        report: Report updated in place as steps complete.
+        database: Include the service statements. Defaults to `WARMUP_DATABASE`.
+        stop: Skip the steps not started yet once set.
+
+    Returns:
+        The completed report.
+    """
+    started = time.perf_counter()
+    if database is None:
+        database = settings.app.WARMUP_DATABASE
+    for name, step in _plan(app, database):
+        step_started = time.perf_counter()
+        if step_started - started > report.budget or (stop is not None and stop.is_set()):
+            report.steps.append(WarmupStep(name=name, skipped=True))
+            continue
+        warm_step = WarmupStep(name=name)
+        try:
+            step()
+        except Exception as exc:  # noqa: BLE001
+            warm_step.error = f"{type(exc).__name__}: {exc}"
+        warm_step.duration = time.perf_counter() - step_started
+        report.steps.append(warm_step)
+    report.duration = time.perf_counter() - started
+    return report
+
+
+async def on_startup(app: Litestar) -> None:
+    """Warm the application before the lifespan startup completes.
+
+    Once the budget is spent, the steps not started yet are skipped, and startup waits for the running step to
+    finish, so no warm-up work overlaps the traffic.
+    """
+    if not settings.app.WARMUP_ENABLED:
+        return
+    report = WarmupReport(budget=settings.app.WARMUP_BUDGET)
+    stop = threading.Event()
+    warming = asyncio.ensure_future(asyncio.to_thread(run, app, report, stop=stop))
+    try:
+        await asyncio.wait_for(asyncio.shield(warming), timeout=report.budget)
+    except asyncio.TimeoutError:
+        report.timed_out = True
+        stop.set()
+        await warming
+    app.state[WARMUP_STATE_KEY] = report
+    await logger.ainfo("Application warm-up complete", **report.as_dict())
@@ -50,12 +50,17 @@ def pytest_addoption(parser: pytest.Parser) -> None:
 
 
 @pytest.fixture(name="app")
-def fx_app(pytestconfig: pytest.Config, monkeypatch: MonkeyPatch) -> Litestar:
+def fx_app(pytestconfig: pytest.Config, monkeypatch: MonkeyPatch, is_unit_test: bool) -> Litestar:
     """Returns:
     An application instance, configured via plugin.
     """
     from spannermc.asgi import create_app
+    from spannermc.lib import settings
 
+    if is_unit_test:
+        monkeypatch.setattr(settings.db, "POOL_PREWARM", False)
+        monkeypatch.setattr(settings.app, "WARMUP_DATABASE", False)
+        monkeypatch.setattr(settings.telemetry, "EXPORTER", "none")
     return create_app()
 
 
@@ -121,7 +126,7 @@ def _patch_sqlalchemy_plugin(is_unit_test: bool, monkeypatch: MonkeyPatch) -> No
         from spannermc.lib import db
 
         monkeypatch.setattr(
-            db.config.SQLAlchemyConfig,  # type:ignore[attr-defined]
+            db.get_config().SQLAlchemyConfig,  # type:ignore[attr-defined]
             "on_shutdown",
             MagicMock(),
         )
@@ -102,12 +102,12 @@ def _patch_db(
     sessionmaker: sessionmaker[Session],
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    monkeypatch.setattr(db, "session_factory", sessionmaker)
-    monkeypatch.setattr(db.base, "session_factory", sessionmaker)
-    monkeypatch.setitem(app.state, db.config.engine_app_state_key, engine)
+    monkeypatch.setattr(db, "get_session_factory", lambda: sessionmaker)
+    monkeypatch.setattr(db.base, "get_session_factory", lambda: sessionmaker)
+    monkeypatch.setitem(app.state, db.get_config().engine_app_state_key, engine)
     monkeypatch.setitem(
         app.state,
-        db.config.session_maker_app_state_key,
+        db.get_config().session_maker_app_state_key,
         sessionmaker(bind=engine, expire_on_commit=False),
     )
 
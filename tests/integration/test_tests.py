@@ -18,7 +18,7 @@ def test_engine_on_app(app: "Litestar", engine: "Engine") -> None:
         app: The test Litestar instance
         engine: The test SQLAlchemy engine instance.
     """
-    assert app.state[db.config.engine_app_state_key] is engine
+    assert app.state[db.get_config().engine_app_state_key] is engine
 
 
 def test_sessionmaker(app: "Litestar", sessionmaker: "sessionmaker[Session]") -> None:
@@ -28,8 +28,8 @@ def test_sessionmaker(app: "Litestar", sessionmaker: "sessionmaker[Session]") ->
         app: The test Litestar instance
         sessionmaker: The test SQLAlchemy sessionmaker factory.
     """
-    assert db.session_factory is sessionmaker
-    assert db.base.session_factory is sessionmaker
+    assert db.get_session_factory() is sessionmaker
+    assert db.base.get_session_factory() is sessionmaker
 
 
 async def test_db_session_dependency(app: "Litestar", engine: "Engine") -> None:
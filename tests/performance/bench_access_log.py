@@ -0,0 +1,99 @@
+"""Cost of the HTTP access log per request.
+
+Runs `BeforeSendHandler` over the response messages of one request, many
+times, for each way a request can be handled, with the application's log
+processors writing to `/dev/null`:
+
+    python tests/performance/bench_access_log.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import Any
+
+import structlog
+from litestar import Litestar, get
+
+from spannermc.lib import constants, log, settings
+
+
+@get("/bench/{item_id:int}", sync_to_thread=False)
+def handler(item_id: int) -> None:
+    """Route the benchmark's requests match."""
+
+
+app = Litestar(route_handlers=[handler])
+
+
+def make_scope(path: str) -> dict[str, Any]:
+    """A scope like those of the application's requests."""
+    return {
+        "type": "http",
+        "app": app,
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"limit=10&offset=0",
+        "headers": [
+            (b"host", b"localhost:8000"),
+            (b"user-agent", b"bench/1.0"),
+            (b"accept", b"application/json"),
+            (b"authorization", b"Bearer token"),
+            (b"cookie", b"session=abc; theme=dark"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+        "path_params": {"item_id": 1},
+        "route_handler": handler,
+        "state": {},
+    }
+
+
+async def run(before_send: log.controller.BeforeSendHandler, path: str, status: int, iterations: int) -> float:
+    """Seconds per request to pass the response messages of a request to `before_send`."""
+    start = {"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]}
+    body = {"type": "http.response.body", "body": b'{"id":1}', "more_body": False}
+    scope = make_scope(path)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        scope["state"] = {log.controller.LOG_STARTED: time.perf_counter()}
+        await before_send(start, scope)  # type: ignore[arg-type]
+        await before_send(body, scope)  # type: ignore[arg-type]
+        structlog.contextvars.clear_contextvars()
+    return (time.perf_counter() - started) / iterations
+
+
+async def main(iterations: int) -> None:
+    """Print the cost of each way of handling a request."""
+    binary = log.LoggerFactory is not structlog.WriteLoggerFactory
+    with open(os.devnull, "wb" if binary else "w") as devnull:  # noqa: PTH123
+        structlog.configure(
+            cache_logger_on_first_use=True,
+            logger_factory=log.LoggerFactory(file=devnull),
+            processors=log.default_processors,  # type: ignore[arg-type]
+            wrapper_class=structlog.make_filtering_bound_logger(settings.log.LEVEL),
+        )
+        settings.log.EXCLUDE_PATHS_EXACT = {"/bench/excluded"}
+        before_send = log.controller.BeforeSendHandler()
+        sampled = log.controller.BeforeSendHandler()
+        sampled.success_sample_rate = 0
+        cases = [
+            ("excluded path", before_send, "/bench/excluded", 200),
+            ("successful health check", before_send, constants.SYSTEM_HEALTH_URL, 200),
+            ("successful request, sampled out", sampled, "/bench/1", 200),
+            ("successful request, logged", before_send, "/bench/1", 200),
+            ("failed request, logged", sampled, "/bench/1", 500),
+        ]
+        for name, handler_, path, status in cases:
+            await run(handler_, path, status, iterations // 10)
+            seconds = await run(handler_, path, status, iterations)
+            print(f"{name:<35} {seconds * 1e6:8.2f} µs/request")  # noqa: T201
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
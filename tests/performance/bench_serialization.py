@@ -0,0 +1,107 @@
+"""Cost of encoding log lines, before and after the buffered writer.
+
+Compares, per line, for a typical HTTP log event:
+
+- encoding: a new `bytes` per line, joined for each write, against
+  `to_json_into` appending to one buffer;
+- logging through `structlog` to `/dev/null`: `msgspec_json_renderer` and
+  `BytesLoggerFactory`, against `json_renderer` and
+  `BufferedBytesLoggerFactory`.
+
+    python tests/performance/bench_serialization.py [iterations]
+"""
+import datetime
+import os
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import structlog
+
+from spannermc.lib import log, serialization, settings
+from spannermc.lib.log.utils import msgspec_json_renderer
+
+BATCH = 64
+"""Lines per write."""
+
+EVENT = {
+    "event": "HTTP",
+    "level": "info",
+    "timestamp": "2026-01-01T00:00:00.000000Z",
+    "request": {
+        "path": "/api/kv/4b1b2c5e-8f7a-4a35-9d3e-1f8f1f0c2b7a",
+        "method": "GET",
+        "content_type": ["", {}],
+        "headers": {"host": "localhost:8000", "user-agent": "bench/1.0", "authorization": "*****"},
+        "cookies": {},
+        "query": "limit=10",
+        "path_params": {"key_id": uuid.UUID("4b1b2c5e-8f7a-4a35-9d3e-1f8f1f0c2b7a")},
+    },
+    "response": {"status_code": 200, "cookies": {}, "headers": {"content-type": "application/json"}},
+    "db": {"statements": 2, "rows": 1, "time": 0.0021},
+    "server_timing": {"auth": 0.31, "db": 2.1, "serialize": 0.05, "total": 3.2},
+    "created": datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC),
+}
+
+
+def per_line(fn: Callable[[], Any], iterations: int) -> float:
+    """Seconds per line to run `fn`, which handles `BATCH` lines."""
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations // BATCH):
+        fn()
+    return (time.perf_counter() - started) / (iterations // BATCH * BATCH)
+
+
+def encode_bytes() -> bytes:
+    """Before: a `bytes` per line, another with the newline, and a join."""
+    return b"".join([serialization.to_json(EVENT) + b"\n" for _ in range(BATCH)])
+
+
+def encode_into() -> bytearray:
+    """After: every line appended to one buffer."""
+    buffer = bytearray()
+    for _ in range(BATCH):
+        serialization.to_json_into(EVENT, buffer)
+        buffer += b"\n"
+    return buffer
+
+
+def logger(renderer: Any, factory: Any) -> Any:
+    """A logger with the application's processors, rendering with `renderer`."""
+    processors = [
+        processor
+        for processor in log.default_processors
+        if not isinstance(processor, structlog.dev.ConsoleRenderer) and processor is not log.writer.json_renderer
+    ]
+    structlog.configure(
+        cache_logger_on_first_use=False,
+        logger_factory=factory,
+        processors=[*processors, renderer],  # type: ignore[list-item]
+        wrapper_class=structlog.make_filtering_bound_logger(settings.log.LEVEL),
+    )
+    return structlog.get_logger()
+
+
+def main(iterations: int) -> None:
+    """Print the cost per line of each path."""
+    fields = {key: value for key, value in EVENT.items() if key not in ("event", "level", "timestamp")}
+    with open(os.devnull, "wb") as devnull:  # noqa: PTH123
+        direct = logger(msgspec_json_renderer, structlog.BytesLoggerFactory(devnull))
+        buffered_factory = log.writer.BufferedBytesLoggerFactory(devnull)
+        buffered = logger(log.writer.json_renderer, buffered_factory)
+        cases = [
+            ("encode, bytes per line", encode_bytes),
+            ("encode, into one buffer", encode_into),
+            ("log, BytesLogger", lambda: [direct.info("HTTP", **fields) for _ in range(BATCH)]),
+            ("log, buffered writer", lambda: [buffered.info("HTTP", **fields) for _ in range(BATCH)]),
+        ]
+        for name, fn in cases:
+            print(f"{name:<25} {per_line(fn, iterations) * 1e6:8.2f} µs/line")  # noqa: T201
+        buffered_factory(None).writer.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
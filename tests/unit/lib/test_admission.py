@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from litestar import Litestar, get
+from litestar.contrib.jwt import OAuth2PasswordBearerAuth
+from litestar.exceptions import ServiceUnavailableException
+from litestar.testing import TestClient
+
+from spannermc.lib import admission, constants, settings
+
+
+async def test_queue_hands_slots_over_in_order() -> None:
+    admission_class = admission.AdmissionClass("default", limit=1, queue_size=2, timeout=1)
+    await admission_class.acquire()
+    waiting = [asyncio.create_task(admission_class.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert admission_class.queued == 2
+    with pytest.raises(ServiceUnavailableException) as exc_info:
+        await admission_class.acquire()
+    assert exc_info.value.headers == {"Retry-After": str(settings.app.ADMISSION_RETRY_AFTER)}
+    admission_class.release()
+    await waiting[0]
+    assert not waiting[1].done()
+    admission_class.release()
+    await waiting[1]
+    admission_class.release()
+    assert (admission_class.in_flight, admission_class.queued) == (0, 0)
+
+
+async def test_queue_deadline_sheds() -> None:
+    admission_class = admission.AdmissionClass("default", limit=1, queue_size=1, timeout=0.01)
+    await admission_class.acquire()
+    with pytest.raises(ServiceUnavailableException):
+        await admission_class.acquire()
+    assert (admission_class.in_flight, admission_class.queued) == (1, 0)
+
+
+def test_reserved_class_is_admitted_while_default_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.app, "ADMISSION_LIMITS", {"default": 0, "health": 1})
+    monkeypatch.setattr(settings.app, "ADMISSION_QUEUE_SIZE", 0)
+    monkeypatch.setattr(admission, "admission_classes", {})
+
+    @get("/work", sync_to_thread=False)
+    def work() -> str:
+        return "done"
+
+    @get("/health", sync_to_thread=False, opt={constants.ADMISSION_CLASS_OPT_KEY: "health"})
+    def health() -> str:
+        return "ok"
+
+    app = Litestar(route_handlers=[work, health], middleware=[admission.middleware_factory])
+    with TestClient(app=app) as client:
+        shed = client.get("/work")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == str(settings.app.ADMISSION_RETRY_AFTER)
+        assert client.get("/health").text == "ok"
+
+
+def test_shed_requests_never_reach_the_user_lookup(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.app, "ADMISSION_LIMITS", {"default": 0})
+    monkeypatch.setattr(settings.app, "ADMISSION_QUEUE_SIZE", 0)
+    monkeypatch.setattr(admission, "admission_classes", {})
+    retrieve_user = MagicMock(return_value=SimpleNamespace(id=1))
+    auth = OAuth2PasswordBearerAuth[SimpleNamespace](
+        retrieve_user_handler=retrieve_user, token_secret="secret", token_url="/login"  # noqa: S106
+    )
+
+    @get("/work", sync_to_thread=False)
+    def work() -> str:
+        return "done"
+
+    app = Litestar(route_handlers=[work], on_app_init=[auth.on_app_init, admission.on_app_init])
+    token = auth.create_token(identifier="user@example.com")
+    with TestClient(app=app) as client:
+        assert client.get("/work", headers={"Authorization": f"Bearer {token}"}).status_code == 503
+    retrieve_user.assert_not_called()
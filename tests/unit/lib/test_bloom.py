@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pytest
+
+from spannermc.domain.kv.key_filter import KeyFilter
+from spannermc.lib.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    keys = [f"key-{i}" for i in range(1_000)]
+    bloom = BloomFilter.from_iterable(keys, capacity=1_000, error_rate=0.01)
+    assert len(bloom) == 1_000
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_false_positive_rate_near_target() -> None:
+    bloom = BloomFilter.from_iterable((f"key-{i}" for i in range(1_000)), capacity=1_000, error_rate=0.01)
+    false_positives = sum(f"missing-{i}" in bloom for i in range(10_000))
+    assert false_positives / 10_000 < 0.03
+    assert 0 < bloom.estimated_false_positive_rate < 0.02
+
+
+@pytest.mark.parametrize(("capacity", "error_rate"), [(0, 0.01), (10, 0), (10, 1)])
+def test_bloom_filter_rejects_invalid_sizing(capacity: int, error_rate: float) -> None:
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=capacity, error_rate=error_rate)
+
+
+def test_key_filter_passes_everything_until_built() -> None:
+    key_filter = KeyFilter(capacity=10, error_rate=0.01)
+    assert not key_filter.ready
+    assert key_filter.might_contain("anything")
+    key_filter.record_false_positive()
+    assert key_filter.false_positive_rate == 0.0
+
+
+def test_key_filter_tracks_added_keys_and_rates() -> None:
+    key_filter = KeyFilter(capacity=10, error_rate=0.01)
+    key_filter.bloom = BloomFilter(capacity=10, error_rate=0.01)
+    key_filter.add("present")
+    assert key_filter.might_contain("present")
+    assert not key_filter.might_contain("absent")
+    key_filter.record_false_positive()
+    assert key_filter.false_positive_rate == 0.5
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from google.cloud.spanner_dbapi import Connection
+from google.cloud.spanner_v1.pool import BurstyPool, FixedSizePool, PingingPool
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from spannermc.lib import settings
+from spannermc.lib.db import base, budget, instruments, slow_queries, statistics, tags
+
+
+@pytest.mark.parametrize(
+    ("pool_type", "expected"),
+    [("default", type(None)), ("fixed", FixedSizePool), ("bursty", BurstyPool), ("pinging", PingingPool)],
+)
+def test_create_session_pool(pool_type: str, expected: type, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.db, "SPANNER_POOL_TYPE", pool_type)
+    monkeypatch.setattr(settings.db, "SPANNER_SESSION_LABELS", {"service": "spannermc"})
+    pool = base._create_session_pool()
+    if pool is not None:
+        assert pool.labels == {"service": "spannermc"}
+    assert isinstance(pool, expected)
+
+
+async def test_startup_keeps_pinging_pool_sessions_alive(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.db, "POOL_PREWARM", False)
+    monkeypatch.setattr(settings.db, "SPANNER_POOL_PING_INTERVAL", 0.01)
+    loop = asyncio.get_running_loop()
+    pinged = asyncio.Event()
+    pool = MagicMock(spec=PingingPool)
+
+    def ping() -> None:
+        if pool.ping.call_count == 1:
+            raise RuntimeError("session not found")
+        loop.call_soon_threadsafe(pinged.set)
+
+    pool.ping.side_effect = ping
+    monkeypatch.setattr(base, "get_spanner_pool", lambda: pool)
+    await base.on_startup()
+    try:
+        await asyncio.wait_for(pinged.wait(), timeout=5)
+    finally:
+        await base.on_shutdown()
+    assert pool.ping.call_count == 2
+
+
+def test_pool_instruments_report_usage_waits_and_timeouts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(instruments, "_instruments", None)
+    reader = InMemoryMetricReader()
+    engine = create_engine(
+        "sqlite://", poolclass=instruments.InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01
+    )
+    instruments.register(MeterProvider(metric_readers=[reader]).get_meter(__name__), engine)
+    with engine.connect(), pytest.raises(PoolTimeoutError):
+        engine.connect()
+    points = _data_points(reader)
+    assert {point.attributes["state"]: point.value for point in points["db.client.connections.usage"]} == {
+        "used": 0,
+        "idle": 1,
+    }
+    assert next(iter(points["db.client.connections.timeouts"])).value == 1
+    assert next(iter(points["db.client.connections.wait_time"])).count == 2
+
+
+@pytest.mark.parametrize("pool_type", ["fixed", "pinging"])
+def test_session_pool_instruments_report_sessions_by_state(pool_type: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(instruments, "_instruments", None)
+    monkeypatch.setattr(settings.db, "SPANNER_POOL_TYPE", pool_type)
+    monkeypatch.setattr(settings.db, "SPANNER_POOL_SIZE", 3)
+    spanner_pool = base._create_session_pool()
+    assert isinstance(spanner_pool, FixedSizePool)
+    spanner_pool._sessions.put_nowait((0, MagicMock()) if pool_type == "pinging" else MagicMock())
+    reader = InMemoryMetricReader()
+    instruments.register(
+        MeterProvider(metric_readers=[reader]).get_meter(__name__), create_engine("sqlite://"), spanner_pool
+    )
+    points = _data_points(reader)
+    assert {point.attributes["state"]: point.value for point in points["db.spanner.sessions.usage"]} == {
+        "used": 2,
+        "idle": 1,
+    }
+
+
+def _data_points(reader: InMemoryMetricReader) -> dict[str, list[Any]]:
+    metrics_data = reader.get_metrics_data()
+    assert metrics_data is not None
+    return {
+        metric.name: list(metric.data.data_points)
+        for resource_metrics in metrics_data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+
+
+def test_sessions_tag_connections_with_the_route_name() -> None:
+    session_factory = sessionmaker(create_engine("sqlite://"))
+    tags.listen(session_factory)
+    token = tags.current.set("kv:get")
+    try:
+        with session_factory() as session:
+            options = session.connection().get_execution_options()
+    finally:
+        tags.current.reset(token)
+    assert options["request_tag"] == options["transaction_tag"] == "kv:get"
+    with session_factory() as session:
+        assert "request_tag" not in session.connection().get_execution_options()
+
+
+def test_spanner_requests_carry_the_route_tag() -> None:
+    database = MagicMock()
+    engine = create_engine(
+        "spanner+spanner:///projects/p/instances/i/databases/d", creator=lambda: Connection(MagicMock(), database)
+    )
+    session_factory = sessionmaker(engine)
+    tags.listen(session_factory)
+    scope = {"route_handler": SimpleNamespace(name="kv:get", handler_name="get_kv")}
+    with tags.route(scope), session_factory() as session:  # type: ignore[arg-type]
+        session.execute(text("select 1"))
+        session.commit()
+    requests = [call for call in database.mock_calls if call[0].endswith(".execute_sql")]
+    assert [request.kwargs["request_options"].request_tag for request in requests] == ["kv:get"]
+
+
+def test_slow_queries_are_logged_without_values(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.db, "SLOW_QUERY_THRESHOLD", 0)
+    logged = MagicMock()
+    monkeypatch.setattr(slow_queries.logger, "warning", logged)
+    engine = create_engine("sqlite://")
+    slow_queries.listen(engine)
+    token = tags.current.set("kv:get")
+    try:
+        with engine.connect() as connection:
+            result = connection.execute(
+                text("select  'secret' as value, :key as key\n where 1 = 1"), {"key": "hunter2"}
+            )
+            logged.assert_not_called()
+            result.all()
+    finally:
+        tags.current.reset(token)
+    logged.assert_called_once()
+    entry = logged.call_args.kwargs
+    assert entry["rows"] == 1
+    assert entry["sql"] == "select ? as value, ? as key where ? = ?"
+    assert entry["parameters"] == ["str"]
+    assert entry["route"] == "kv:get"
+    assert "hunter2" not in str(entry)
+
+
+def test_requests_over_their_statement_budget_are_reported(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.db, "STATEMENT_REPEAT_LIMIT", 3)
+    logged = MagicMock()
+    monkeypatch.setattr(budget.logger, "warning", logged)
+    engine = create_engine("sqlite://")
+    budget.listen(engine)
+    statements = budget.RequestStatements("kv:list", budget=4)
+    token = budget.current.set(statements)
+    try:
+        with engine.connect() as connection:
+            for key in range(5):
+                connection.execute(text("select :key"), {"key": key}).all()
+    finally:
+        budget.current.reset(token)
+    assert statements.counts["statements"] == 5
+    assert statements.counts["rows"] == 5
+    assert [call.args[0] for call in logged.call_args_list] == ["Repeated statement", "Statement budget exceeded"]
+    monkeypatch.setattr(settings.app, "DEBUG", True)
+    token = budget.current.set(budget.RequestStatements("kv:list", budget=1))
+    try:
+        with engine.connect() as connection, pytest.raises(budget.StatementBudgetError):
+            connection.execute(text("select 1"))
+            connection.execute(text("select 2"))
+    finally:
+        budget.current.reset(token)
+
+
+def test_statement_statistics_aggregate_by_fingerprint(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.db, "STATEMENT_STATISTICS_SIZE", 2)
+    monkeypatch.setattr(statistics, "statistics", statistics.StatementStatistics())
+    engine = create_engine("sqlite://")
+    statistics.listen(engine)
+    with engine.connect() as connection:
+        for key in range(3):
+            connection.execute(text("select :key"), {"key": key}).all()
+        connection.execute(text("select 1, 2")).all()
+        connection.execute(text("select 1, 2, 3"))
+    report = statistics.statistics.snapshot()
+    assert {stats["sql"]: stats["calls"] for stats in report} == {"select ?": 3, "select ?, ?": 1}
+    assert {stats["sql"]: stats["rows"] for stats in report} == {"select ?": 3, "select ?, ?": 1}
+    assert statistics.statistics.dropped == 1
+    stats = next(stats for stats in report if stats["calls"] == 3)
+    assert sum(stats["histogram"].values()) == 3
+    assert stats["p50_time"] <= stats["p99_time"] <= stats["max_time"]
+    statistics.statistics.reset()
+    assert statistics.statistics.snapshot() == []
+    assert statistics.statistics.dropped == 0
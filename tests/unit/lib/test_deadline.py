@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import Cancelled, DeadlineExceeded
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.spanner_v1 import Client
+from litestar import Litestar, get
+from litestar.contrib.jwt import OAuth2PasswordBearerAuth
+from litestar.contrib.repository.exceptions import RepositoryError
+from litestar.testing import TestClient
+from sqlalchemy import create_engine, text
+
+from spannermc.lib import constants, deadline, exceptions, settings
+from spannermc.lib.exceptions import RequestTimeoutError
+
+if TYPE_CHECKING:
+    from litestar.types import Scope
+
+
+def _scope(headers: list[tuple[bytes, bytes]] | None = None, /, **opt: Any) -> Scope:
+    return {"type": "http", "headers": headers or [], "route_handler": SimpleNamespace(opt=opt)}  # type: ignore
+
+
+@pytest.mark.parametrize(
+    ("scope", "expected"),
+    [
+        (_scope(), 30.0),
+        (_scope(**{constants.REQUEST_TIMEOUT_OPT_KEY: 5}), 5),
+        (_scope([(b"x-request-timeout", b"2.5")], **{constants.REQUEST_TIMEOUT_OPT_KEY: 5}), 2.5),
+        (_scope([(b"x-request-timeout", b"600")]), 60.0),
+        (_scope([(b"x-request-timeout", b"soon")]), 30.0),
+        (_scope(**{constants.REQUEST_TIMEOUT_OPT_KEY: 0}), None),
+    ],
+)
+def test_timeout_resolution(scope: Scope, expected: float | None) -> None:
+    assert settings.app.REQUEST_TIMEOUT == 30.0
+    assert deadline._timeout(scope) == expected
+
+
+def test_interceptor_caps_rpc_timeout() -> None:
+    interceptor = deadline._DeadlineInterceptor()
+    continuation = MagicMock()
+    details = deadline._CallDetails("/Spanner/ExecuteSql", None, None, None, None, None)
+    request_deadline = deadline.RequestDeadline(5)
+    token = deadline.current.set(request_deadline)
+    try:
+        interceptor.intercept_unary_stream(continuation, details, object())
+        assert 4 < continuation.call_args.args[0].timeout <= 5
+        interceptor.intercept_unary_unary(continuation, details._replace(timeout=1), object())
+        assert continuation.call_args.args[0].timeout == 1
+        request_deadline.expires_at = 0
+        with pytest.raises(RequestTimeoutError):
+            interceptor.intercept_unary_unary(continuation, details, object())
+    finally:
+        deadline.current.reset(token)
+
+
+def test_database_rpcs_go_through_the_interceptor() -> None:
+    client = Client(project="deadline-project", credentials=AnonymousCredentials())  # type: ignore[no-untyped-call]
+    database = client.instance("instance").database("database")  # type: ignore[no-untyped-call]
+    channel = database.spanner_api.transport.grpc_channel
+    deadline.intercept_database(database)
+    intercepted = database.spanner_api.transport.grpc_channel
+    assert intercepted is not channel
+    assert intercepted._interceptor is deadline._interceptor
+
+
+def test_the_user_lookup_runs_under_the_deadline() -> None:
+    deadlines: list[deadline.RequestDeadline | None] = []
+
+    def retrieve_user(*_: Any) -> SimpleNamespace:
+        deadlines.append(deadline.current.get())
+        return SimpleNamespace(id=1)
+
+    auth = OAuth2PasswordBearerAuth[SimpleNamespace](
+        retrieve_user_handler=retrieve_user, token_secret="secret", token_url="/login"  # noqa: S106
+    )
+
+    @get("/work", sync_to_thread=False)
+    def work() -> str:
+        return "done"
+
+    app = Litestar(route_handlers=[work], on_app_init=[auth.on_app_init, deadline.on_app_init])
+    token = auth.create_token(identifier="user@example.com")
+    with TestClient(app=app) as client:
+        assert client.get("/work", headers={"Authorization": f"Bearer {token}"}).text == "done"
+    assert deadlines
+    assert deadlines[0] is not None
+
+
+def test_statements_are_refused_after_the_deadline() -> None:
+    engine = create_engine("sqlite://")
+    deadline.listen(engine)
+    token = deadline.current.set(deadline.RequestDeadline(0))
+    try:
+        with engine.connect() as connection, pytest.raises(RequestTimeoutError):
+            connection.execute(text("select 1"))
+    finally:
+        deadline.current.reset(token)
+
+
+@pytest.mark.parametrize(
+    ("cause", "status_code"),
+    [(DeadlineExceeded("deadline"), 504), (Cancelled("cancelled"), 504), (ValueError("bad value"), 409)],
+)
+def test_only_deadline_errors_after_the_deadline_are_timeouts(cause: Exception, status_code: int) -> None:
+    try:
+        try:
+            raise cause
+        except (DeadlineExceeded, Cancelled, ValueError) as exc:
+            raise RepositoryError("database error") from exc
+    except RepositoryError as exc:
+        error = exc
+    token = deadline.current.set(deadline.RequestDeadline(0))
+    try:
+        response = exceptions.exception_to_http_response(MagicMock(), error)
+    finally:
+        deadline.current.reset(token)
+    assert response.status_code == status_code
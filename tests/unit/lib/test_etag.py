@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, cast
+from uuid import uuid4
+
+import pytest
+from litestar import Response, get
+from litestar.exceptions import PermissionDeniedException
+from litestar.status_codes import HTTP_200_OK, HTTP_304_NOT_MODIFIED, HTTP_403_FORBIDDEN
+from litestar.testing import create_test_client
+
+from spannermc.domain.events.models import Event
+from spannermc.domain.kv.models import KVStore
+from spannermc.lib import etag
+
+if TYPE_CHECKING:
+    from litestar.types import ASGIApp, Receive, Scope, Send
+
+
+@pytest.fixture(autouse=True)
+def _clear_etag_cache() -> None:
+    etag.cache.clear()
+
+
+def test_compute_etag_uses_updated_at() -> None:
+    event = Event(id=uuid4(), message="hello", updated_at=datetime(2023, 1, 1, tzinfo=UTC))
+    first = etag.compute_etag(event)
+    event.message = "changed without touching updated_at"
+    assert etag.compute_etag(event) == first
+    event.updated_at = datetime(2023, 1, 2, tzinfo=UTC)
+    assert etag.compute_etag(event) != first
+
+
+def test_compute_etag_hashes_content_without_timestamp() -> None:
+    kv = KVStore(id=uuid4(), key="a", value="1")
+    first = etag.compute_etag(kv)
+    assert first.startswith('"') and first.endswith('"')
+    kv.value = "2"
+    assert etag.compute_etag(kv) != first
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+    ],
+)
+def test_etag_matches(header: str | None, expected: bool) -> None:
+    assert etag.etag_matches(header, '"abc"') is expected
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ('"abc"', True),
+        ('W/"abc"', False),
+        ('W/"xyz", "abc"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matches_strong(header: str, expected: bool) -> None:
+    assert etag.etag_matches(header, '"abc"', weak=False) is expected
+
+
+def test_cache_key_is_per_user_and_query() -> None:
+    scope = {"path": "/api/me", "query_string": b"", "user": SimpleNamespace(id=1)}
+    other = {"path": "/api/me", "query_string": b"", "user": SimpleNamespace(id=2)}
+    query = {"path": "/api/me", "query_string": b"fields=name", "user": SimpleNamespace(id=1)}
+    keys = {etag._cache_key(cast("Scope", value)) for value in (scope, other, query)}
+    assert len(keys) == 3
+
+
+def test_modifying_an_entity_drops_every_representation_of_it() -> None:
+    user = SimpleNamespace(id=uuid4())
+    profile = {"path": "/api/me", "query_string": b"", "user": user}
+    assert etag._entity(cast("Scope", profile)) == str(user.id)
+    etag.cache.set("profile", '"v1"', str(user.id))
+    etag.cache.set("detail", '"v1"', str(user.id))
+    etag.cache.set("other", '"v1"', str(uuid4()))
+    etag.cache.invalidate_entity(etag._entity(cast("Scope", {"path_params": {"user_id": user.id}})))
+    assert etag.cache.get("profile") is etag.cache.get("detail") is None
+    assert etag.cache.get("other") == '"v1"'
+
+
+def test_middleware_keeps_users_apart() -> None:
+    calls = 0
+    users = {"alice": SimpleNamespace(id=1), "bob": SimpleNamespace(id=2)}
+
+    def user_middleware(app: ASGIApp) -> ASGIApp:
+        async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
+            scope["user"] = users[scope["query_string"].decode()]
+            await app(scope, receive, send)
+
+        return middleware
+
+    @get("/me", middleware=[user_middleware, etag.middleware_factory], sync_to_thread=False)
+    def handler() -> Response[dict]:
+        nonlocal calls
+        calls += 1
+        return Response(content={"a": 1}, headers={"ETag": '"v1"'})
+
+    with create_test_client([handler]) as client:
+        assert client.get("/me?alice").status_code == HTTP_200_OK
+        assert client.get("/me?bob", headers={"If-None-Match": '"v1"'}).status_code == HTTP_304_NOT_MODIFIED
+        assert calls == 2
+
+
+def test_etag_cache_bounded_and_expiring() -> None:
+    cache = etag.ETagCache(max_size=2, ttl=60)
+    cache.set("a", '"1"')
+    cache.set("b", '"2"')
+    cache.set("c", '"3"')
+    assert cache.get("a") is None
+    assert cache.get("c") == '"3"'
+    cache.ttl = -1
+    cache.set("d", '"4"')
+    assert cache.get("d") is None
+
+
+def test_middleware_answers_from_cache() -> None:
+    calls = 0
+
+    @get("/thing", middleware=[etag.middleware_factory], sync_to_thread=False)
+    def handler() -> Response[dict]:
+        nonlocal calls
+        calls += 1
+        return Response(content={"a": 1}, headers={"ETag": '"v1"'})
+
+    with create_test_client([handler]) as client:
+        response = client.get("/thing")
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["etag"] == '"v1"'
+
+        response = client.get("/thing", headers={"If-None-Match": '"v1"'})
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert calls == 1
+
+        etag.cache.clear()
+        response = client.get("/thing", headers={"If-None-Match": '"v1"'})
+        assert response.status_code == HTTP_304_NOT_MODIFIED
+        assert calls == 2
+
+        response = client.get("/thing", headers={"If-None-Match": '"v0"'})
+        assert response.status_code == HTTP_200_OK
+        assert calls == 3
+
+
+def test_middleware_runs_guards_before_answering_from_cache() -> None:
+    allowed = True
+
+    def guard(*_: object) -> None:
+        if not allowed:
+            raise PermissionDeniedException
+
+    @get("/thing", middleware=[etag.middleware_factory], guards=[guard], sync_to_thread=False)
+    def handler() -> Response[dict]:
+        return Response(content={"a": 1}, headers={"ETag": '"v1"'})
+
+    with create_test_client([handler]) as client:
+        assert client.get("/thing").status_code == HTTP_200_OK
+        allowed = False
+        response = client.get("/thing", headers={"If-None-Match": '"v1"'})
+        assert response.status_code == HTTP_403_FORBIDDEN
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import logging
+import logging.config
+import threading
+import time
 from typing import TYPE_CHECKING
 from unittest.mock import AsyncMock, MagicMock
 
@@ -78,14 +81,16 @@ def test_middleware_factory_added_to_app(app: Litestar) -> None:
 async def test_middleware_calls_structlog_contextvars_clear_contextvars(
     monkeypatch: MonkeyPatch,
 ) -> None:
-    """Ensure that we clear the structlog context in the middleware."""
+    """Ensure that we clear the structlog context in the middleware, and note when the request started."""
     clear_ctx_vars_mock = MagicMock()
     monkeypatch.setattr(structlog.contextvars, "clear_contextvars", clear_ctx_vars_mock)
     app_mock = AsyncMock()
     middleware = log.controller.middleware_factory(app_mock)
-    await middleware(1, 2, 3)  # type:ignore[arg-type]
+    scope: dict[str, Any] = {"state": {}}
+    await middleware(scope, 2, 3)  # type:ignore[arg-type]
     clear_ctx_vars_mock.assert_called_once()
-    app_mock.assert_called_once_with(1, 2, 3)
+    app_mock.assert_called_once_with(scope, 2, 3)
+    assert log.controller.LOG_STARTED in scope["state"]
 
 
 @pytest.mark.parametrize(
@@ -128,6 +133,111 @@ async def test_before_send_handler_exclude_paths(
         assert "http.response.start" in scope_state
 
 
+async def test_before_send_handler_exclude_paths_exact(
+    before_send_handler: log.controller.BeforeSendHandler,
+    http_response_start: HTTPResponseStartEvent,
+    http_scope: HTTPScope,
+    state: State,
+) -> None:
+    """Exact exclusions only match the whole path."""
+    before_send_handler.exclude_paths_exact = frozenset({"/a"})
+    for path, logged in (("/a", False), ("/a/b", True), ("/b/a", True)):
+        http_scope["path"] = path
+        http_scope["state"] = {}
+        await before_send_handler(http_response_start, http_scope)
+        assert ("log_level" in http_scope["state"]) is logged
+
+
+@pytest.mark.parametrize(("status", "elapsed"), [(HTTP_200_OK, 10), (HTTP_500_INTERNAL_SERVER_ERROR, 0)])
+async def test_before_send_handler_excludes_slow_and_failed_requests(
+    status: int,
+    elapsed: float,
+    before_send_handler: log.controller.BeforeSendHandler,
+    http_response_start: HTTPResponseStartEvent,
+    http_scope: HTTPScope,
+    state: State,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Excluded paths are not extracted even when the request is slow or failed."""
+    extract_mock = MagicMock()
+    monkeypatch.setattr(log.controller.BeforeSendHandler, "extract_response_data", extract_mock)
+    before_send_handler.exclude_paths = re.compile("^/b")
+    before_send_handler.exclude_paths_exact = frozenset({"/a"})
+    http_response_start["status"] = status
+    for path in ("/a", "/b/c"):
+        http_scope["path"] = path
+        http_scope["state"] = {log.controller.LOG_STARTED: time.perf_counter() - elapsed}
+        await before_send_handler(http_response_start, http_scope)
+        await before_send_handler({"type": "http.response.body", "body": b"", "more_body": False}, http_scope)
+        assert "log_level" not in http_scope["state"]
+    extract_mock.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("path", "status", "elapsed", "logged"),
+    [
+        ("/wherever", HTTP_200_OK, 0, False),
+        ("/wherever", HTTP_400_BAD_REQUEST, 0, True),
+        ("/wherever", HTTP_500_INTERNAL_SERVER_ERROR, 0, True),
+        ("/wherever", HTTP_200_OK, 10, True),
+        (constants.SYSTEM_HEALTH_URL, HTTP_200_OK, 0, False),
+        (constants.SYSTEM_HEALTH_URL, HTTP_200_OK, 10, False),
+        (constants.SYSTEM_HEALTH_URL, HTTP_500_INTERNAL_SERVER_ERROR, 0, True),
+    ],
+)
+async def test_before_send_handler_samples_successful_requests(
+    path: str,
+    status: int,
+    elapsed: float,
+    logged: bool,
+    before_send_handler: log.controller.BeforeSendHandler,
+    http_response_start: HTTPResponseStartEvent,
+    http_scope: HTTPScope,
+    state: State,
+) -> None:
+    """With no successful requests sampled, only failed and slow ones are logged."""
+    before_send_handler.success_sample_rate = 0
+    http_scope["path"] = path
+    http_scope["state"][log.controller.LOG_STARTED] = time.perf_counter() - elapsed
+    http_response_start["status"] = status
+    await before_send_handler(http_response_start, http_scope)
+    assert ("log_level" in http_scope["state"]) is logged
+    assert (http_response_start is http_scope["state"].get("http.response.start")) is logged
+
+
+async def test_before_send_handler_binds_sample_rate(
+    before_send_handler: log.controller.BeforeSendHandler,
+    http_response_start: HTTPResponseStartEvent,
+    http_scope: HTTPScope,
+    state: State,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Sampled requests carry the sample rate, so counts can be scaled back up."""
+    bind_mock = MagicMock()
+    monkeypatch.setattr(structlog.contextvars, "bind_contextvars", bind_mock)
+    monkeypatch.setattr("spannermc.lib.log.controller.random.random", lambda: 0.05)
+    before_send_handler.success_sample_rate = 0.1
+    await before_send_handler(http_response_start, http_scope)
+    assert "log_level" in http_scope["state"]
+    bind_mock.assert_called_once_with(sample_rate=0.1)
+
+
+async def test_before_send_handler_http_response_body_not_logged(
+    before_send_handler: log.controller.BeforeSendHandler,
+    cap_logger: CapturingLogger,
+    http_response_body: HTTPResponseBodyEvent,
+    http_scope: HTTPScope,
+    state: State,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """Nothing is extracted from a request that was not chosen for logging when its response started."""
+    log_request_mock = AsyncMock()
+    monkeypatch.setattr(log.controller.BeforeSendHandler, "log_request", log_request_mock)
+    await before_send_handler(http_response_body, http_scope)
+    log_request_mock.assert_not_called()
+    assert [] == cap_logger.calls
+
+
 @pytest.mark.parametrize(
     ("status", "level"),
     [
@@ -410,3 +520,99 @@ def test_event_filter() -> None:
     log_event = {"a_key": "a_val", "b_key": "b_val"}
     log_event = event_filter(..., "", log_event)  # type:ignore[assignment]
     assert log_event == {"b_key": "b_val"}
+
+
+def test_logging_is_configured_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    dict_config = MagicMock()
+    structlog_configure = MagicMock()
+    monkeypatch.setattr(logging.config, "dictConfig", dict_config)
+    monkeypatch.setattr(structlog, "configure", structlog_configure)
+    monkeypatch.setattr(log, "_get_stdlib_logger", None)
+    monkeypatch.setattr(log, "_configured", False)
+    for _ in range(3):
+        log.get_logger()
+        log.config.configure()
+    dict_config.assert_called_once()
+    structlog_configure.assert_called_once()
+
+
+def test_log_writer_writes_lines_in_batches() -> None:
+    """Lines queued while the thread writes are joined into its next write."""
+    unblocked = threading.Event()
+    file = MagicMock()
+    file.write.side_effect = lambda _: unblocked.wait(5)
+    writer = log.writer.LogWriter(file, max_bytes=1024)
+    logger = log.writer.BufferedBytesLogger(writer)
+    logger.info(b"first")
+    while file.write.call_count == 0:
+        time.sleep(0.001)
+    for number in range(3):
+        logger.info(f"line {number}".encode())
+    unblocked.set()
+    assert writer.flush(timeout=5)
+    writer.close(timeout=5)
+    assert [call.args[0] for call in file.write.call_args_list] == [b"first\n", b"line 0\nline 1\nline 2\n"]
+
+
+def test_log_writer_drops_lines_when_full(monkeypatch: MonkeyPatch) -> None:
+    """Lines logged while the buffer is full because the file is slow are dropped and counted."""
+    unblocked = threading.Event()
+    file = MagicMock()
+    file.write.side_effect = lambda _: unblocked.wait(5)
+    counter_mock = MagicMock()
+    monkeypatch.setattr(log.writer, "dropped_lines_counter", counter_mock)
+    writer = log.writer.LogWriter(file, max_bytes=5)
+    writer.write(b"first\n")
+    while file.write.call_count == 0:
+        time.sleep(0.001)
+    writer.write(b"second\n")
+    writer.write(b"third\n")
+    unblocked.set()
+    writer.close(timeout=5)
+    assert [call.args[0] for call in file.write.call_args_list] == [b"first\n", b"second\n"]
+    counter_mock.add.assert_called_once_with(1, {"reason": "buffer_full"})
+
+
+def test_log_writer_blocks_when_full() -> None:
+    """With the block policy, a line waits for room instead of being dropped."""
+    unblocked = threading.Event()
+    file = MagicMock()
+    file.write.side_effect = lambda _: unblocked.wait(5)
+    writer = log.writer.LogWriter(file, max_bytes=5, overflow="block")
+    writer.write(b"first\n")
+    while file.write.call_count == 0:
+        time.sleep(0.001)
+    writer.write(b"second\n")
+    blocked = threading.Thread(target=writer.write, args=(b"third\n",))
+    blocked.start()
+    blocked.join(0.05)
+    assert blocked.is_alive()
+    unblocked.set()
+    blocked.join(5)
+    writer.close(timeout=5)
+    assert b"".join(call.args[0] for call in file.write.call_args_list) == b"first\nsecond\nthird\n"
+
+
+def test_log_writer_writes_directly_once_closed() -> None:
+    """Lines logged after `close()`, e.g. by other exit hooks, are still written."""
+    file = MagicMock()
+    writer = log.writer.LogWriter(file, max_bytes=1024)
+    writer.close()
+    writer.write(b"late\n")
+    file.write.assert_called_once_with(b"late\n")
+
+
+def test_log_writer_encodes_events_into_buffer() -> None:
+    """Events left unrendered by `json_renderer` are encoded as JSON lines by the logger."""
+    file = MagicMock()
+    writer = log.writer.LogWriter(file, max_bytes=1024)
+    logger = log.writer.BufferedBytesLogger(writer)
+    args, kwargs = log.writer.json_renderer(None, "info", {"event": "a", "n": 1})
+    logger.info(*args, **kwargs)
+    unencodable = MagicMock(__str__=MagicMock(side_effect=ValueError))
+    with pytest.raises(TypeError):
+        writer.write_json({"event": "b", "value": unencodable})
+    logger.info(b'{"event":"c"}')
+    writer.close(timeout=5)
+    written = b"".join(call.args[0] for call in file.write.call_args_list)
+    assert written == b'{"event":"a","n":1}\n{"event":"c"}\n'
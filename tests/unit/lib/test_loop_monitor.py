@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+
+from spannermc.lib import loop_monitor
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def _handle_request(scope: dict) -> None:
+    time.sleep(0.3)
+
+
+async def test_blocked_loop_logs_stack_and_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    logged = MagicMock()
+    monkeypatch.setattr(loop_monitor.logger, "warning", logged)
+    monitor = loop_monitor.LoopMonitor(interval=0.02, threshold=0.1)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    _handle_request({"route_handler": SimpleNamespace(name="kv:get", handler_name="get_kv")})
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    logged.assert_called_once()
+    entry = logged.call_args.kwargs
+    assert entry["route"] == "kv:get"
+    assert entry["lag"] >= 0.1
+    assert "_handle_request" in entry["stack"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from spannermc.lib import otel, settings
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(("ratio", "expected"), [(1.0, 10), (0.0, 0)])
+def test_sample_ratio_is_configurable(ratio: float, expected: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.telemetry, "SAMPLE_RATIO", ratio)
+    telemetry = otel.build_telemetry("memory")
+    tracer = telemetry.tracer_provider.get_tracer(__name__)
+    for _ in range(10):
+        with tracer.start_as_current_span("request"):
+            pass
+    assert isinstance(telemetry.span_exporter, InMemorySpanExporter)
+    assert len(telemetry.span_exporter.get_finished_spans()) == expected
+    telemetry.shutdown()
+
+
+def test_file_exporter_writes_json_lines(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.telemetry, "SAMPLE_RATIO", 1.0)
+    monkeypatch.setattr(settings.telemetry, "FILE_PATH", str(tmp_path / "telemetry.jsonl"))
+    telemetry = otel.build_telemetry("file")
+    with telemetry.tracer_provider.get_tracer(__name__).start_as_current_span("request"):
+        pass
+    telemetry.shutdown()
+    lines = (tmp_path / "telemetry.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["name"] == "request"
+
+
+async def test_none_exporter_skips_instrumentation(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.telemetry, "EXPORTER", "none")
+    await otel.on_startup()
+    assert otel._configure_task is None
+
+
+@pytest.mark.parametrize(
+    ("exporter", "prometheus", "separate_reader"), [("prometheus", False, False), ("memory", True, True)]
+)
+def test_prometheus_reader_serves_the_same_meters(
+    exporter: str, prometheus: bool, separate_reader: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings.telemetry, "PROMETHEUS", prometheus)
+    telemetry = otel.build_telemetry(exporter)
+    assert telemetry.prometheus_reader is not None
+    assert (telemetry.prometheus_reader is not telemetry.metric_reader) is separate_reader
+    meter = telemetry.meter_provider.get_meter(__name__)
+    meter.create_counter("app.requests", unit="{request}").add(2, {"http.route": "kv:get"})
+    meter.create_up_down_counter("app.active").add(1)
+    meter.create_histogram("app.duration", unit="s", description="Request duration.").record(0.2)
+    lines = telemetry.prometheus_reader.render().splitlines()
+    telemetry.shutdown()
+    assert 'app_requests_total{http_route="kv:get"} 2' in lines
+    assert "# TYPE app_active gauge" in lines
+    assert "# HELP app_duration_seconds Request duration." in lines
+    assert 'app_duration_seconds_bucket{le="0.1"} 0' in lines
+    assert 'app_duration_seconds_bucket{le="0.25"} 1' in lines
+    assert 'app_duration_seconds_bucket{le="+Inf"} 1' in lines
+    assert "app_duration_seconds_count 1" in lines
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pstats
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from litestar import Litestar, get
+from litestar.testing import TestClient
+
+from spannermc.lib import profiler, settings
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _work() -> int:
+    return sum(range(1000))
+
+
+@get("/profiled", sync_to_thread=False)
+def profiled_handler() -> dict[str, int]:
+    return {"total": _work()}
+
+
+def _app(is_superuser: bool) -> Litestar:
+    def user_middleware(app):  # type: ignore[no-untyped-def]
+        async def middleware(scope, receive, send):  # type: ignore[no-untyped-def]
+            scope["user"] = SimpleNamespace(is_superuser=is_superuser)
+            await app(scope, receive, send)
+
+        return middleware
+
+    return Litestar(route_handlers=[profiled_handler], middleware=[user_middleware, profiler.middleware_factory])
+
+
+def test_superuser_requests_are_profiled_on_demand(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(profiler, "profiles", profiler.profiles.__class__())
+    monkeypatch.setattr(settings.app, "PROFILE_STORE_SIZE", 1)
+    with TestClient(app=_app(is_superuser=True)) as client:
+        assert profiler.PROFILE_ID_HEADER not in client.get("/profiled").headers
+        first = client.get("/profiled", headers={settings.app.PROFILE_HEADER: "1"}).headers[profiler.PROFILE_ID_HEADER]
+        second = client.get("/profiled", headers={settings.app.PROFILE_HEADER: "1"}).headers[profiler.PROFILE_ID_HEADER]
+    assert list(profiler.profiles) == [second] != [first]
+    profile = profiler.profiles[second]
+    assert profile.route.endswith("profiled_handler")
+    assert any("_work" in function["function"] for function in profile.functions())
+    dump = tmp_path / "request.prof"
+    dump.write_bytes(profile.dump())
+    assert pstats.Stats(str(dump)).stats == profile.stats  # type: ignore[attr-defined]
+
+
+def test_other_users_are_not_profiled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiler, "profiles", profiler.profiles.__class__())
+    with TestClient(app=_app(is_superuser=False)) as client:
+        response = client.get("/profiled", headers={settings.app.PROFILE_HEADER: "1"})
+    assert profiler.PROFILE_ID_HEADER not in response.headers
+    assert not profiler.profiles
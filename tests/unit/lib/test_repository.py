@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from litestar.contrib.repository.filters import CollectionFilter, LimitOffset, OrderBy, SearchFilter
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from spannermc.domain.kv.models import KVStore
+from spannermc.domain.kv.services import KeyValueStoreRepository
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+
+@pytest.fixture(name="statements")
+def fx_statements() -> list[str]:
+    return []
+
+
+@pytest.fixture(name="repository")
+def fx_repository(statements: list[str]) -> Generator[KeyValueStoreRepository, None, None]:
+    engine = create_engine("sqlite://")
+    KVStore.metadata.create_all(engine, tables=[KVStore.__table__])  # type: ignore[list-item]
+    KeyValueStoreRepository.statement_cache.clear()
+    with Session(engine) as session:
+        repository = KeyValueStoreRepository(session=session)
+        repository.add_many([KVStore(key=key, value=key.upper()) for key in ("alpha", "beta", "gamma")])
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        yield repository
+
+
+def test_filter_values_are_bound_parameters(repository: KeyValueStoreRepository, statements: list[str]) -> None:
+    first, first_count = repository.list_and_count(LimitOffset(limit=1, offset=0), OrderBy("key", "asc"))
+    second, second_count = repository.list_and_count(LimitOffset(limit=2, offset=1), OrderBy("key", "asc"))
+    assert [kv.key for kv in first] == ["alpha"]
+    assert [kv.key for kv in second] == ["beta", "gamma"]
+    assert first_count == second_count == 3
+    assert statements[0] == statements[1]
+    assert len(KeyValueStoreRepository.statement_cache) == 1
+
+
+def test_lookups_and_counts_reuse_statements(repository: KeyValueStoreRepository, statements: list[str]) -> None:
+    assert repository.get("beta", id_attribute="key").value == "BETA"
+    assert repository.get_one_or_none(key="missing") is None
+    assert repository.count(CollectionFilter("key", ["alpha", "gamma"])) == 2
+    assert repository.count(SearchFilter("key", "ET", ignore_case=True)) == 1
+    assert repository.count(SearchFilter("key", "a", ignore_case=True)) == 3
+    assert statements[0] == statements[1]
+    assert statements[3] == statements[4]
+    assert len(KeyValueStoreRepository.statement_cache) == 3
+
+
+def test_repositories_share_the_default_statement(repository: KeyValueStoreRepository) -> None:
+    other = KeyValueStoreRepository(session=repository.session)
+    assert other.statement is repository.statement
+
+
+def test_attribute_filters_on_none_compare_with_is_null(
+    repository: KeyValueStoreRepository, statements: list[str]
+) -> None:
+    assert repository.count(value=None) == 0
+    assert repository.count(value="BETA") == 1
+    assert "IS NULL" in statements[0]
+    assert "IS NULL" not in statements[1]
+    assert len(KeyValueStoreRepository.statement_cache) == 2
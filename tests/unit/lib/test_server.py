@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import socket
+from typing import TYPE_CHECKING
+
+from litestar import Litestar
+
+from spannermc.lib import server, settings
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_worker_config_from_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.server, "BACKLOG", 128)
+    monkeypatch.setattr(settings.server, "KEEPALIVE", 7)
+    monkeypatch.setattr(settings.server, "LIMIT_CONCURRENCY", 50)
+    monkeypatch.setattr(settings.server, "MAX_REQUESTS", 1000)
+    monkeypatch.setattr(settings.server, "MAX_REQUESTS_JITTER", 100)
+    config = server.worker_config(Litestar())
+    assert config.backlog == 128
+    assert config.timeout_keep_alive == 7
+    assert config.limit_concurrency == 50
+    assert config.limit_max_requests is not None
+    assert 1000 <= config.limit_max_requests <= 1100
+
+
+def test_recycling_disabled_by_default() -> None:
+    assert server.worker_config(Litestar()).limit_max_requests is None
+
+
+def test_bind_reuse_port() -> None:
+    first = server.bind("127.0.0.1", 0, 16, reuse_port=True)
+    port = first.getsockname()[1]
+    second = server.bind("127.0.0.1", port, 16, reuse_port=True)
+    try:
+        assert second.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT) == 1
+        assert second.getsockname()[1] == port
+    finally:
+        first.close()
+        second.close()
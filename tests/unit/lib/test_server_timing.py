@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from litestar import Litestar, get
+from litestar.testing import TestClient
+
+from spannermc.lib import server_timing, settings
+
+if TYPE_CHECKING:
+    from litestar import Response
+    from litestar.types import Scope
+
+
+@server_timing.timed("guards")
+def _guard(*_: object) -> None:
+    return None
+
+
+@get("/timed", guards=[_guard], sync_to_thread=False)
+def timed_handler() -> dict[str, str]:
+    with server_timing.phase("dto"):
+        return {"status": "ok"}
+
+
+def _app() -> Litestar:
+    return Litestar(route_handlers=[timed_handler], on_app_init=[server_timing.on_app_init])
+
+
+def test_server_timing_header_lists_phases(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.app, "SERVER_TIMING", True)
+    with TestClient(app=_app()) as client:
+        response = client.get("/timed")
+    phases = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert phases == ["guards", "dto", "serialize", "total"]
+
+
+def test_server_timing_runs_after_the_application_after_request_hook(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings.app, "SERVER_TIMING", True)
+
+    async def after_request(response: Response) -> Response:
+        response.headers["X-After-Request"] = "1"
+        return response
+
+    @get("/hooked", sync_to_thread=False)
+    def hooked_handler() -> dict[str, str]:
+        return {"status": "ok"}
+
+    app = Litestar(
+        route_handlers=[hooked_handler], after_request=after_request, on_app_init=[server_timing.on_app_init]
+    )
+    with TestClient(app=app) as client:
+        response = client.get("/hooked")
+    assert response.headers["X-After-Request"] == "1"
+    assert "serialize;dur=" in response.headers["Server-Timing"]
+
+
+def test_server_timing_header_is_off_by_default() -> None:
+    with TestClient(app=_app()) as client:
+        response = client.get("/timed", headers={settings.app.SERVER_TIMING_HEADER: "1"})
+    assert "Server-Timing" not in response.headers
+
+
+@pytest.mark.parametrize(("is_superuser", "expected"), [(True, True), (False, False)])
+def test_superusers_can_ask_for_server_timing(is_superuser: bool, expected: bool) -> None:
+    scope = {
+        "headers": [(settings.app.SERVER_TIMING_HEADER.lower().encode(), b"1")],
+        "user": SimpleNamespace(is_superuser=is_superuser),
+    }
+    assert server_timing._expose(cast("Scope", scope)) is expected
@@ -1,7 +1,80 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
 from spannermc.lib import settings
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
 
 def test_app_slug() -> None:
     """Test app name conversion to slug."""
     settings.app.NAME = "My Application!"
     assert settings.app.slug == "my-application"
+
+
+def test_snapshot_round_trip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "settings.msgpack"
+    monkeypatch.setenv(settings.SNAPSHOT_ENV, str(path))
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("GOOGLE_PROJECT_ID", "snapshot-project")
+    settings.get_settings.cache_clear()
+    try:
+        first = settings.get_settings()
+        reload = patch.object(settings, "_load_settings", side_effect=AssertionError("environment reloaded"))
+        sources = patch.object(
+            settings.BaseSettings, "_settings_build_values", side_effect=AssertionError("settings sources read")
+        )
+        with reload, sources:
+            settings.get_settings.cache_clear()
+            second = settings.get_settings()
+        assert second == first
+        assert second[1].POOL_SIZE == 7
+        assert second[4].GOOGLE_PROJECT == "snapshot-project"
+        assert path.stat().st_mode & 0o777 == 0o600
+
+        monkeypatch.setenv("DB_POOL_SIZE", "8")
+        settings.get_settings.cache_clear()
+        assert settings.get_settings()[1].POOL_SIZE == 8
+    finally:
+        settings.get_settings.cache_clear()
+
+
+def test_refreshed_snapshot_is_read_by_a_fresh_load(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "settings.msgpack"
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+    load_settings = settings._load_settings
+
+    def load_with_secrets() -> settings.SettingsTuple:
+        monkeypatch.setenv("DB_POOL_SIZE", "9")
+        return load_settings()
+
+    with patch.object(settings, "_load_settings", side_effect=load_with_secrets):
+        settings.refresh_snapshot(path)
+    monkeypatch.delenv("DB_POOL_SIZE")
+    monkeypatch.setenv(settings.SNAPSHOT_ENV, str(path))
+    settings.get_settings.cache_clear()
+    try:
+        with patch.object(settings, "_load_settings", side_effect=AssertionError("environment reloaded")):
+            assert settings.get_settings()[1].POOL_SIZE == 9
+    finally:
+        settings.get_settings.cache_clear()
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "settings.msgpack"
+    settings.refresh_snapshot(path)
+    path.write_bytes(path.read_bytes()[:-1] + b"\0")
+    monkeypatch.setenv(settings.SNAPSHOT_ENV, str(path))
+    settings.get_settings.cache_clear()
+    try:
+        with patch.object(settings, "_load_settings", wraps=settings._load_settings) as load:
+            settings.get_settings()
+        load.assert_called_once()
+        assert settings._read_snapshot(path, settings._environment_fingerprint(), 0) is not None
+    finally:
+        settings.get_settings.cache_clear()
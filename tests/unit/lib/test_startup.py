@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from spannermc.lib import startup
+
+_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      2500 |       2620 |   spannermc.lib.settings
+garbage line
+import time:       900 |       3520 | spannermc.asgi
+"""
+
+
+def test_parse_import_times() -> None:
+    imports = startup._parse_import_times(_IMPORTTIME)
+    assert [item.module for item in imports] == ["_io", "spannermc.lib.settings", "spannermc.asgi"]
+    assert imports[1].self_time == 0.0025
+    assert imports[2].cumulative_time == 0.00352
+
+
+def test_create_app_records_phases() -> None:
+    from spannermc.asgi import create_app
+
+    startup.phases.clear()
+    create_app()
+    assert list(startup.phases) == ["imports", "configuration", "application"]
+
+
+def test_profile_reads_the_boot_result_apart_from_stdout() -> None:
+    profile = startup.profile(run_hooks=False)
+    assert list(profile.phases) == ["imports", "configuration", "application"]
+    assert profile.hooks == {}
+    assert profile.resident_memory > 0
+    package = next(item for item in profile.imports if item.module == "spannermc")
+    assert profile.import_time >= package.cumulative_time > 0
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode, use_span
+
+from spannermc.lib.tail_sampling import TailSamplingSpanProcessor
+
+
+def _provider(exporter: InMemorySpanExporter, **options: float) -> TracerProvider:
+    config = {"latency_threshold": 1.0, "ratio": 0.0, "max_traces": 10, "max_spans": 10, **options}
+    provider = TracerProvider()
+    processor = TailSamplingSpanProcessor(SimpleSpanProcessor(exporter), **config)  # type: ignore[arg-type]
+    provider.add_span_processor(processor)
+    return provider
+
+
+def test_failed_and_slow_traces_are_kept_and_others_sampled() -> None:
+    exporter = InMemorySpanExporter()
+    tracer = _provider(exporter).get_tracer(__name__)
+    with tracer.start_as_current_span("fast"), tracer.start_as_current_span("query"):
+        pass
+    assert exporter.get_finished_spans() == ()
+    with tracer.start_as_current_span("failed"), tracer.start_as_current_span("query") as query:
+        query.set_status(Status(StatusCode.ERROR))
+    assert [span.name for span in exporter.get_finished_spans()] == ["query", "failed"]
+    exporter.clear()
+    root = tracer.start_span("slow", start_time=0)
+    root.end(end_time=2_000_000_000)
+    assert [span.name for span in exporter.get_finished_spans()] == ["slow"]
+
+
+def test_buffered_traces_and_spans_are_bounded() -> None:
+    exporter = InMemorySpanExporter()
+    tracer = _provider(exporter, ratio=1.0, max_traces=1, max_spans=2).get_tracer(__name__)
+    evicted, kept = tracer.start_span("evicted"), tracer.start_span("kept")
+    with use_span(evicted), tracer.start_as_current_span("lost"):
+        pass
+    with use_span(kept):
+        for _ in range(3):
+            with tracer.start_as_current_span("query"):
+                pass
+    kept.end()
+    evicted.end()
+    assert [span.name for span in exporter.get_finished_spans()] == ["query", "query", "kept", "evicted"]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from spannermc.lib import settings, warmup
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def _fail() -> None:
+    raise RuntimeError("boom")
+
+
+def test_run_records_failures_and_skips_over_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    steps: list[tuple[str, Any]] = [
+        ("ok", lambda: None),
+        ("failing", _fail),
+        ("slow", lambda: time.sleep(0.05)),
+        ("late", lambda: None),
+    ]
+    monkeypatch.setattr(warmup, "_plan", lambda *_: steps)
+    report = warmup.run(app=None, report=warmup.WarmupReport(budget=0.01))  # type: ignore[arg-type]
+    assert report.warmed == ["ok", "slow"]
+    assert report.failed == {"failing": "RuntimeError: boom"}
+    assert [step.name for step in report.steps if step.skipped] == ["late"]
+    assert report.as_dict()["slowest"][0][0] == "slow"
+
+
+
+async def test_startup_waits_for_the_running_step_after_the_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    ran: list[str] = []
+
+    def slow() -> None:
+        time.sleep(0.2)
+        ran.append("slow")
+
+    steps: list[tuple[str, Any]] = [("slow", slow), ("late", lambda: ran.append("late"))]
+    monkeypatch.setattr(warmup, "_plan", lambda *_: steps)
+    monkeypatch.setattr(settings.app, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings.app, "WARMUP_BUDGET", 0.05)
+    app = SimpleNamespace(state={})
+    await warmup.on_startup(app)  # type: ignore[arg-type]
+    assert ran == ["slow"]
+    report = app.state[warmup.WARMUP_STATE_KEY]
+    assert report.timed_out
+    assert [(step.name, step.skipped) for step in report.steps] == [("slow", False), ("late", True)]
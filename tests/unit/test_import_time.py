@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import textwrap
+
+IMPORT_BUDGET = 5.0
+"""Seconds a cold import of the CLI and application factory may take."""
+
+_PROBE = textwrap.dedent(
+    """
+    import time
+
+    import google.auth
+
+    def _no_auth(*args, **kwargs):
+        raise AssertionError("google.auth.default() called during import")
+
+    google.auth.default = _no_auth
+    started = time.perf_counter()
+
+    import spannermc.asgi
+    import spannermc.cli
+    from spannermc.lib import db
+
+    elapsed = time.perf_counter() - started
+    assert db.get_spanner_client.cache_info().currsize == 0, "Spanner client built during import"
+    assert db.get_engine.cache_info().currsize == 0, "engine built during import"
+    print(elapsed)
+    """
+)
+
+
+def test_import_does_not_authenticate_and_fits_budget() -> None:
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_PROJECT_ID"}
+    command = [sys.executable, "-c", _PROBE]
+    result = subprocess.run(command, capture_output=True, text=True, env=env, check=False, timeout=60)  # noqa: S603
+    assert result.returncode == 0, result.stderr
+    assert float(result.stdout.strip().splitlines()[-1]) < IMPORT_BUDGET